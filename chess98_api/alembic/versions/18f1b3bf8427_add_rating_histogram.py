@@ -0,0 +1,42 @@
+"""add rating histogram
+
+Revision ID: 18f1b3bf8427
+Revises: e91b54bdb28f
+Create Date: 2026-10-19 11:04:27.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '18f1b3bf8427'
+down_revision: Union[str, None] = 'e91b54bdb28f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rating_histogram',
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category', 'bucket')
+    )
+
+    # Carga inicial desde profile_ratings (buckets de 10 puntos)
+    op.execute("""
+        INSERT INTO rating_histogram (category, bucket, count)
+        SELECT category, (rating / 10) * 10, count(*)
+        FROM profile_ratings
+        WHERE category IN ('bullet', 'blitz', 'rapid', 'classical', 'puzzle')
+        GROUP BY category, (rating / 10) * 10
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rating_histogram')
@@ -0,0 +1,54 @@
+"""add rating history
+
+Revision ID: 28a432db28f1
+Revises: 18f1b3bf8427
+Create Date: 2026-10-19 11:52:08.640117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '28a432db28f1'
+down_revision: Union[str, None] = '18f1b3bf8427'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rating_history',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('profile_id', sa.UUID(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('rating_delta', sa.Integer(), nullable=False),
+    sa.Column('ts', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('game_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['game_id'], ['games.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_rating_history_profile_category_ts', 'rating_history', ['profile_id', 'category', 'ts'], unique=False)
+    op.create_table('rating_history_daily',
+    sa.Column('profile_id', sa.UUID(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('open', sa.Integer(), nullable=False),
+    sa.Column('high', sa.Integer(), nullable=False),
+    sa.Column('low', sa.Integer(), nullable=False),
+    sa.Column('close', sa.Integer(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('profile_id', 'category', 'day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rating_history_daily')
+    op.drop_index('idx_rating_history_profile_category_ts', table_name='rating_history')
+    op.drop_table('rating_history')
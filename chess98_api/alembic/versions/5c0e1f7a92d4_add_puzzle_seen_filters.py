@@ -0,0 +1,36 @@
+"""add puzzle_seen_filters
+
+Revision ID: 5c0e1f7a92d4
+Revises: 7eb6a4b31b19
+Create Date: 2026-10-19 15:02:41.537120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e1f7a92d4'
+down_revision: Union[str, None] = '7eb6a4b31b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('puzzle_seen_filters',
+    sa.Column('profile_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('items', sa.Integer(), nullable=False),
+    sa.Column('synced_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('profile_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('puzzle_seen_filters')
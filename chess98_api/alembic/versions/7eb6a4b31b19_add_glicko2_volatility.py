@@ -0,0 +1,37 @@
+"""add glicko2 volatility to profile_ratings
+
+Revision ID: 7eb6a4b31b19
+Revises: 28a432db28f1
+Create Date: 2026-10-19 13:26:55.904412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7eb6a4b31b19'
+down_revision: Union[str, None] = '28a432db28f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('profile_ratings', sa.Column('volatility', sa.Float(), server_default='0.06', nullable=False))
+    op.alter_column('profile_ratings', 'volatility', server_default=None)
+
+    # RD inicial aproximado según partidas jugadas, para que los jugadores con historial
+    # no arranquen con RD 350. scripts/recompute_ratings.py lo calcula exacto desde las partidas.
+    op.execute("""
+        UPDATE profile_ratings
+        SET rating_deviation = GREATEST(60, 350 * power(0.93, games))
+        WHERE games > 0
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('profile_ratings', 'volatility')
@@ -0,0 +1,31 @@
+"""add row_hash and retired to puzzles
+
+Revision ID: a3d5f8e1c6b7
+Revises: 5c0e1f7a92d4
+Create Date: 2026-10-19 16:18:09.614305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d5f8e1c6b7'
+down_revision: Union[str, None] = '5c0e1f7a92d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # row_hash queda NULL: el primer `import_puzzles.py --sync` reescribe todo una vez y lo completa
+    op.add_column('puzzles', sa.Column('row_hash', sa.BigInteger(), nullable=True))
+    op.add_column('puzzles', sa.Column('retired', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('puzzles', 'retired')
+    op.drop_column('puzzles', 'row_hash')
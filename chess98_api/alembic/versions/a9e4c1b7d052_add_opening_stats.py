@@ -0,0 +1,37 @@
+"""add opening_stats
+
+Revision ID: a9e4c1b7d052
+Revises: f3a7c2d85e61
+Create Date: 2026-10-19 19:40:26.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e4c1b7d052'
+down_revision: Union[str, None] = 'f3a7c2d85e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('opening_stats',
+    sa.Column('eco_code', sa.String(), nullable=False),
+    sa.Column('opening', sa.String(), nullable=False),
+    sa.Column('games', sa.Integer(), nullable=False),
+    sa.Column('white_wins', sa.Integer(), nullable=False),
+    sa.Column('draws', sa.Integer(), nullable=False),
+    sa.Column('black_wins', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('eco_code', 'opening')
+    )
+    # Las partidas existentes se clasifican con scripts/backfill_openings.py, que también llena esta tabla
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('opening_stats')
@@ -0,0 +1,37 @@
+"""add explorer_moves
+
+Revision ID: b5d2e8f4a163
+Revises: a9e4c1b7d052
+Create Date: 2026-10-19 20:12:48.730915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e8f4a163'
+down_revision: Union[str, None] = 'a9e4c1b7d052'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('explorer_moves',
+    sa.Column('position_key', sa.BigInteger(), nullable=False),
+    sa.Column('move_uci', sa.String(length=5), nullable=False),
+    sa.Column('games', sa.Integer(), nullable=False),
+    sa.Column('white_wins', sa.Integer(), nullable=False),
+    sa.Column('draws', sa.Integer(), nullable=False),
+    sa.Column('black_wins', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('position_key', 'move_uci')
+    )
+    # Las partidas existentes se cargan con scripts/build_explorer.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('explorer_moves')
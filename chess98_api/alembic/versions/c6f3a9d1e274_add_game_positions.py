@@ -0,0 +1,45 @@
+"""add game_positions
+
+Revision ID: c6f3a9d1e274
+Revises: b5d2e8f4a163
+Create Date: 2026-10-19 20:47:05.182364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f3a9d1e274'
+down_revision: Union[str, None] = 'b5d2e8f4a163'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('game_positions',
+    sa.Column('position_key', sa.BigInteger(), nullable=False),
+    sa.Column('ended_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('game_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('ply', sa.SmallInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['game_id'], ['games.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('position_key', 'ended_at', 'game_id')
+    )
+    # Para el ON DELETE CASCADE (la primary key empieza por la posición)
+    op.create_index('idx_game_positions_game_id', 'game_positions', ['game_id'], unique=False)
+    op.create_index(
+        'idx_games_completed_end_time_id', 'games', ['end_time', 'id'],
+        unique=False, postgresql_where=sa.text("status = 'completed'")
+    )
+    # Las partidas existentes se cargan con scripts/build_game_positions.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_games_completed_end_time_id', table_name='games')
+    op.drop_index('idx_game_positions_game_id', table_name='game_positions')
+    op.drop_table('game_positions')
@@ -0,0 +1,39 @@
+"""puzzle themes as jsonb with gin index
+
+Revision ID: c81f4d2b7e09
+Revises: a3d5f8e1c6b7
+Create Date: 2026-10-19 17:05:52.281946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f4d2b7e09'
+down_revision: Union[str, None] = 'a3d5f8e1c6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('puzzles', 'themes',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=False,
+               postgresql_using='themes::jsonb')
+    op.create_index('idx_puzzles_themes', 'puzzles', ['themes'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_puzzles_themes', table_name='puzzles', postgresql_using='gin')
+    op.alter_column('puzzles', 'themes',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=sa.JSON(),
+               existing_nullable=False,
+               postgresql_using='themes::json')
@@ -0,0 +1,50 @@
+"""add puzzle_solve_stats
+
+Revision ID: d4b9e27a1f53
+Revises: c81f4d2b7e09
+Create Date: 2026-10-19 17:48:30.772014
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b9e27a1f53'
+down_revision: Union[str, None] = 'c81f4d2b7e09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('puzzle_solve_stats',
+    sa.Column('profile_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('solved', sa.Integer(), nullable=False),
+    sa.Column('highest_solved_rating', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('profile_id')
+    )
+
+    # Carga inicial con los mismos criterios que el endpoint (solo solves rateados)
+    op.execute("""
+        INSERT INTO puzzle_solve_stats (profile_id, total, solved, highest_solved_rating)
+        SELECT
+            s.profile_id,
+            count(*) FILTER (WHERE s.status IN ('SOLVED', 'FAILED')),
+            count(*) FILTER (WHERE s.status = 'SOLVED'),
+            max(p.rating) FILTER (WHERE s.status = 'SOLVED')
+        FROM puzzle_solves s
+        JOIN puzzles p ON p.id = s.puzzle_id
+        WHERE s.rating_delta != 0
+        GROUP BY s.profile_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('puzzle_solve_stats')
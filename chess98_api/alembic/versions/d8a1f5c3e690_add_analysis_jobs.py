@@ -0,0 +1,53 @@
+"""add analysis_jobs
+
+Revision ID: d8a1f5c3e690
+Revises: c6f3a9d1e274
+Create Date: 2026-10-19 21:32:41.508217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a1f5c3e690'
+down_revision: Union[str, None] = 'c6f3a9d1e274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE TYPE analysis_job_status AS ENUM ('PENDING', 'RUNNING', 'DONE', 'FAILED')")
+
+    op.create_table('analysis_jobs',
+    sa.Column('game_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='analysis_job_status', create_type=False), nullable=False),
+    sa.Column('priority', sa.Float(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('positions', sa.Integer(), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['game_id'], ['games.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('game_id')
+    )
+    op.create_index(
+        'idx_analysis_jobs_pending_priority', 'analysis_jobs', [sa.text('priority DESC')],
+        unique=False, postgresql_where=sa.text("status = 'PENDING'")
+    )
+    op.create_index('idx_moves_game_id_move_number', 'moves', ['game_id', 'move_number'], unique=False)
+    # Las partidas existentes se encolan con scripts/analyze_games.py --enqueue-existing
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_moves_game_id_move_number', table_name='moves')
+    op.drop_index('idx_analysis_jobs_pending_priority', table_name='analysis_jobs')
+    op.drop_table('analysis_jobs')
+    op.execute("DROP TYPE analysis_job_status")
@@ -0,0 +1,41 @@
+"""add game accuracy summary
+
+Revision ID: e2b7d4a9f381
+Revises: d8a1f5c3e690
+Create Date: 2026-10-19 22:15:08.734920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7d4a9f381'
+down_revision: Union[str, None] = 'd8a1f5c3e690'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ('accuracy', sa.Float()),
+    ('acpl', sa.Integer()),
+    ('inaccuracies', sa.Integer()),
+    ('mistakes', sa.Integer()),
+    ('blunders', sa.Integer()),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for color in ('white', 'black'):
+        for name, type_ in COLUMNS:
+            op.add_column('games', sa.Column(f'{color}_{name}', type_, nullable=True))
+    # Las partidas ya analizadas se completan con scripts/recompute_accuracy.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for color in ('white', 'black'):
+        for name, _ in COLUMNS:
+            op.drop_column('games', f'{color}_{name}')
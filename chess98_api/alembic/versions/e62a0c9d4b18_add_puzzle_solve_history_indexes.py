@@ -0,0 +1,33 @@
+"""add puzzle_solves history indexes
+
+Revision ID: e62a0c9d4b18
+Revises: d4b9e27a1f53
+Create Date: 2026-10-19 18:21:47.093581
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e62a0c9d4b18'
+down_revision: Union[str, None] = 'd4b9e27a1f53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_puzzle_solves_profile_solved_at', 'puzzle_solves', ['profile_id', 'solved_at', 'id'], unique=False)
+    op.create_index(
+        'idx_puzzle_solves_profile_rated_solved_at', 'puzzle_solves', ['profile_id', 'solved_at', 'id'],
+        unique=False, postgresql_where=sa.text('rating_delta != 0')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_puzzle_solves_profile_rated_solved_at', table_name='puzzle_solves')
+    op.drop_index('idx_puzzle_solves_profile_solved_at', table_name='puzzle_solves')
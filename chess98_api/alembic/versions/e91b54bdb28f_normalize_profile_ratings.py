@@ -0,0 +1,100 @@
+"""normalize profile ratings into profile_ratings table
+
+Revision ID: e91b54bdb28f
+Revises: f6fe76a92074
+Create Date: 2026-10-19 10:12:41.502913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b54bdb28f'
+down_revision: Union[str, None] = 'f6fe76a92074'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('profile_ratings',
+    sa.Column('profile_id', sa.UUID(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('rating_deviation', sa.Float(), nullable=False),
+    sa.Column('games', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('profile_id', 'category')
+    )
+    op.create_index('idx_profile_ratings_category_rating', 'profile_ratings', ['category', 'rating'], unique=False)
+
+    # Paso 1: Backfill desde el JSON existente
+    op.execute("""
+        INSERT INTO profile_ratings (profile_id, category, rating, rating_deviation, games)
+        SELECT p.id, r.key, round(r.value::numeric)::int, 350, 0
+        FROM profiles p, jsonb_each_text(p.ratings::jsonb) r
+    """)
+
+    # Paso 2: Categorías que falten en el JSON con su rating por defecto
+    op.execute("""
+        INSERT INTO profile_ratings (profile_id, category, rating, rating_deviation, games)
+        SELECT p.id, d.category, d.rating, 350, 0
+        FROM profiles p
+        CROSS JOIN (VALUES
+            ('bullet', 1200), ('blitz', 1200), ('rapid', 1200), ('classical', 1200), ('puzzle', 500)
+        ) AS d(category, rating)
+        ON CONFLICT (profile_id, category) DO NOTHING
+    """)
+
+    # Paso 3: Contadores de partidas por categoría
+    op.execute("""
+        UPDATE profile_ratings pr
+        SET games = g.n
+        FROM (
+            SELECT p.id AS profile_id, gm.time_control_str AS category, count(*) AS n
+            FROM games gm
+            JOIN profiles p ON p.user_id IN (gm.white_id, gm.black_id)
+            WHERE gm.status = 'completed'
+            GROUP BY p.id, gm.time_control_str
+        ) g
+        WHERE pr.profile_id = g.profile_id AND pr.category = g.category
+    """)
+    op.execute("""
+        UPDATE profile_ratings pr
+        SET games = s.n
+        FROM (
+            SELECT profile_id, count(*) AS n
+            FROM puzzle_solves
+            WHERE rating_delta != 0
+            GROUP BY profile_id
+        ) s
+        WHERE pr.profile_id = s.profile_id AND pr.category = 'puzzle'
+    """)
+
+    op.drop_column('profiles', 'ratings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('profiles', sa.Column('ratings', sa.JSON(), nullable=True))
+    op.execute("""
+        UPDATE profiles p
+        SET ratings = r.ratings
+        FROM (
+            SELECT profile_id, json_object_agg(category, rating) AS ratings
+            FROM profile_ratings
+            GROUP BY profile_id
+        ) r
+        WHERE p.id = r.profile_id
+    """)
+    op.execute("""
+        UPDATE profiles
+        SET ratings = '{"bullet": 1200, "blitz": 1200, "rapid": 1200, "classical": 1200, "puzzle": 500}'::json
+        WHERE ratings IS NULL
+    """)
+    op.alter_column('profiles', 'ratings', nullable=False)
+    op.drop_index('idx_profile_ratings_category_rating', table_name='profile_ratings')
+    op.drop_table('profile_ratings')
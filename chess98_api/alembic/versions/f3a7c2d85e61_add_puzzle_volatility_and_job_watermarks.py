@@ -0,0 +1,45 @@
+"""add puzzle volatility and job_watermarks
+
+Revision ID: f3a7c2d85e61
+Revises: e62a0c9d4b18
+Create Date: 2026-10-19 19:02:13.418227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c2d85e61'
+down_revision: Union[str, None] = 'e62a0c9d4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Con server_default: scripts/import_puzzles.py inserta con SQL directo y no manda volatility
+    op.add_column('puzzles', sa.Column('volatility', sa.Float(), server_default='0.06', nullable=False))
+
+    op.create_table('job_watermarks',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    op.create_index(
+        'idx_puzzle_solves_rated_solved_at', 'puzzle_solves', ['solved_at', 'id'],
+        unique=False, postgresql_where=sa.text('rating_delta != 0')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_puzzle_solves_rated_solved_at', table_name='puzzle_solves')
+    op.drop_table('job_watermarks')
+    op.drop_column('puzzles', 'volatility')
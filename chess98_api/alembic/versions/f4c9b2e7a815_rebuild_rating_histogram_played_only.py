@@ -0,0 +1,42 @@
+"""rebuild rating histogram with played categories only
+
+Revision ID: f4c9b2e7a815
+Revises: e2b7d4a9f381
+Create Date: 2026-10-19 23:02:51.406137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c9b2e7a815'
+down_revision: Union[str, None] = 'e2b7d4a9f381'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Las filas por defecto (categorías sin partidas) ya no cuentan en el histograma
+    op.execute("DELETE FROM rating_histogram")
+    op.execute("""
+        INSERT INTO rating_histogram (category, bucket, count)
+        SELECT category, (rating / 10) * 10, count(*)
+        FROM profile_ratings
+        WHERE category IN ('bullet', 'blitz', 'rapid', 'classical', 'puzzle') AND games > 0
+        GROUP BY category, (rating / 10) * 10
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM rating_histogram")
+    op.execute("""
+        INSERT INTO rating_histogram (category, bucket, count)
+        SELECT category, (rating / 10) * 10, count(*)
+        FROM profile_ratings
+        WHERE category IN ('bullet', 'blitz', 'rapid', 'classical', 'puzzle')
+        GROUP BY category, (rating / 10) * 10
+    """)
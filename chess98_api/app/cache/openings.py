@@ -0,0 +1,19 @@
+import logging
+from pathlib import Path
+
+from app.core.config import OPENINGS_DIR
+from app.utils.openings import OpeningTrie
+
+# Trie de aperturas ECO, se carga una vez al arrancar (ver main.py)
+opening_book = OpeningTrie()
+
+def load_opening_book(directory: str = OPENINGS_DIR):
+    path = Path(directory)
+    files = opening_book.load_dir(path) if path.is_dir() else 0
+    if not files:
+        logging.warning(
+            f"⚠️ No se encontraron los TSV de aperturas en {path.resolve()}, las partidas se guardan sin apertura. "
+            f"Descargarlos de https://github.com/lichess-org/chess-openings (a.tsv ... e.tsv) o configurar OPENINGS_DIR"
+        )
+        return
+    logging.info(f"📖 Libro de aperturas cargado: {len(opening_book)} líneas de {files} archivos (hasta {opening_book.depth} jugadas)")
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import Integer, String, column, update, values
+
+from app.database.connection import AsyncSessionLocal
+from app.models.puzzle import Puzzle
+
+FLUSH_INTERVAL = 5  # segundos
+MAX_PENDING = 1000  # intentos sin escribir antes de forzar un flush
+MAX_BUFFERED = 10 * MAX_PENDING  # tope duro en memoria: con la base caída se descarta lo que pase de acá
+FLUSH_BATCH_SIZE = 5000  # filas por UPDATE (límite de parámetros de Postgres)
+
+class PuzzlePlayCounter:
+    """
+    Acumula los incrementos de times_played en memoria y los escribe en bloque con un solo
+    UPDATE ... FROM (VALUES ...) cada FLUSH_INTERVAL, en vez de un UPDATE por intento sobre
+    la misma fila (los puzzles populares eran un hotspot de locks y WAL).
+
+    Cota de lo que se pierde si el proceso muere: los intentos en memoria, que nunca pasan de MAX_BUFFERED.
+    Con la base andando son los de los últimos FLUSH_INTERVAL segundos y a lo sumo ~MAX_PENDING (a ese número
+    se dispara un flush). Si los flushes fallan, los intentos se reintentan hasta llenar MAX_BUFFERED y los que
+    sobran se descartan (y se loguea cuántos) en vez de crecer sin límite.
+    """
+    def __init__(self, interval: float = FLUSH_INTERVAL, max_pending: int = MAX_PENDING, max_buffered: int = MAX_BUFFERED):
+        self.interval = interval
+        self.max_pending = max_pending
+        self.max_buffered = max_buffered
+        self.pending: Counter[str] = Counter()
+        self.pending_total = 0  # incluye los que está escribiendo el flush en curso
+        self.dropped = 0
+        self.failing = False  # último flush falló: solo reintenta el flush periódico
+        self.lock = asyncio.Lock()
+        self.stopping = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.flush_task: Optional[asyncio.Task] = None
+
+    def _buffer(self, puzzle_id: str, plays: int):
+        room = self.max_buffered - self.pending_total
+        if plays > room:
+            self.dropped += plays - max(room, 0)
+            plays = max(room, 0)
+        if plays:
+            self.pending[puzzle_id] += plays
+            self.pending_total += plays
+
+    def add(self, puzzle_id: str, plays: int = 1):
+        self._buffer(puzzle_id, plays)
+
+        # Un solo flush forzado a la vez; se guarda la referencia para que el task no lo junte el GC
+        if (
+            self.pending_total >= self.max_pending and not self.failing
+            and (self.flush_task is None or self.flush_task.done())
+        ):
+            self.flush_task = asyncio.create_task(self.flush())
+            self.flush_task.add_done_callback(self._flush_done)
+
+    @staticmethod
+    def _flush_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logging.error("❌ Flush de times_played falló", exc_info=task.exception())
+
+    async def flush(self):
+        async with self.lock:
+            if not self.pending:
+                return
+
+            pending, self.pending = self.pending, Counter()
+            written = sum(pending.values())
+
+            # Ordenado por id para que dos flushes concurrentes tomen los locks en el mismo orden
+            rows = sorted(pending.items())
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    for i in range(0, len(rows), FLUSH_BATCH_SIZE):
+                        plays = values(
+                            column("id", String), column("plays", Integer), name="plays"
+                        ).data(rows[i:i + FLUSH_BATCH_SIZE])
+
+                        await db.execute(
+                            update(Puzzle)
+                            .where(Puzzle.id == plays.c.id)
+                            .values(times_played=Puzzle.times_played + plays.c.plays)
+                            .execution_options(synchronize_session=False)
+                        )
+                    await db.commit()
+            except Exception:
+                logging.exception(f"❌ Error guardando times_played de {len(pending)} puzzles, se reintenta en el próximo flush")
+                # Se devuelven al buffer respetando el tope: los intentos nuevos ya ocupan su lugar
+                self.pending_total -= written
+                for puzzle_id, count in pending.items():
+                    self._buffer(puzzle_id, count)
+                self.failing = True
+            else:
+                self.pending_total -= written
+                self.failing = False
+            finally:
+                if self.dropped:
+                    logging.warning(f"⚠️ Se descartaron {self.dropped} intentos de times_played (buffer lleno, tope {self.max_buffered})")
+                    self.dropped = 0
+
+    async def run(self):
+        # stop() no cancela el loop: un flush cortado a la mitad perdería los conteos que ya sacó del buffer
+        while not self.stopping.is_set():
+            try:
+                await asyncio.wait_for(self.stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    def start(self):
+        if self.task is None:
+            self.stopping.clear()
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        # Espera el flush en curso (periódico o forzado) antes del último, que escribe lo que quede
+        self.stopping.set()
+        tasks = [task for task in (self.task, self.flush_task) if task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.task = None
+        await self.flush()
+
+puzzle_play_counter = PuzzlePlayCounter()
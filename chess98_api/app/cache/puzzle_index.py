@@ -0,0 +1,302 @@
+import asyncio
+import logging
+import random
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.connection import AsyncSessionLocal
+from app.models.job_watermark import JobWatermark
+from app.models.puzzle import Puzzle
+
+LOAD_BATCH_SIZE = 50000
+
+# Los scripts que cambian puzzles (import / --sync / --retire-missing, recalibración de ratings) marcan
+# el watermark "puzzle_index"; la API lo consulta cada RELOAD_CHECK_INTERVAL y si cambió rearma el índice.
+INDEX_WATERMARK = "puzzle_index"
+RELOAD_CHECK_INTERVAL = 60  # segundos
+
+# Lo mismo que mark_puzzles_changed() para los scripts que escriben con asyncpg
+MARK_CHANGED_SQL = f"""
+    INSERT INTO job_watermarks (name, last_at, updated_at) VALUES ('{INDEX_WATERMARK}', now(), now())
+    ON CONFLICT (name) DO UPDATE SET last_at = now(), updated_at = now()
+"""
+
+# Radios de búsqueda alrededor del rating del jugador, se amplía si la ventana está agotada
+SEARCH_RADII = (25, 50, 100, 200)
+THEME_SEARCH_RADII = (50, 100, 200, 400, 800)  # con temas hay menos candidatos por ventana
+RANDOM_PROBES = 16
+
+# Peso de cada puzzle según su popularidad de Lichess (-100..100): ((popularity + 100) / 200)^2,
+# con piso para que los poco votados sigan saliendo. Los más populares salen hasta 100x más.
+MIN_POPULARITY_WEIGHT = 0.1
+
+def popularity_weights(popularity: np.ndarray) -> np.ndarray:
+    return np.clip((popularity + 100) / 200, MIN_POPULARITY_WEIGHT, 1.0) ** 2
+
+class PuzzleIndex:
+    """
+    Índice en memoria de todos los puzzles ordenados por rating.
+    Guarda solo ids (bytes de ancho fijo) y ratings (float32) en arrays de NumPy,
+    así 4M de puzzles ocupan ~40MB y elegir el siguiente es una búsqueda binaria.
+    `themes` es el índice invertido: tema -> posiciones (int32, ordenadas, o sea por rating),
+    y `theme_bits` el mismo conjunto como bitmap (1 bit por puzzle) para probar pertenencia en O(1).
+    `cum_weights` es la suma acumulada de los pesos por popularidad en el mismo orden (con un 0 al principio):
+    como los puzzles están ordenados por rating sirve para cualquier ventana, y un sorteo ponderado
+    es un número al azar entre cum_weights[lo] y cum_weights[hi] más una búsqueda binaria.
+    """
+    def __init__(self):
+        self.ids = np.array([], dtype="S1")
+        self.ratings = np.array([], dtype=np.float32)
+        self.cum_weights = np.zeros(1)
+        self.themes: dict[str, np.ndarray] = {}
+        self.theme_bits: dict[str, np.ndarray] = {}
+
+        self.version: Optional[datetime] = None  # updated_at del watermark INDEX_WATERMARK con el que se armó
+        self.on_reload: list[Callable[[], None]] = []
+        self.task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.ratings)
+
+    @property
+    def loaded(self) -> bool:
+        return len(self) > 0
+
+    async def load(self, db: AsyncSession):
+        """
+        Arma un índice nuevo desde la base y lo reemplaza de una vez (ver swap): mientras carga se sigue
+        sirviendo el anterior.
+        """
+        version = await current_version(db)
+        ids, ratings, popularity = [], [], []
+        postings = defaultdict(list)
+
+        stream = await db.stream(
+            select(Puzzle.id, Puzzle.rating, Puzzle.popularity, Puzzle.themes)
+            .where(Puzzle.retired.is_(False))
+            .order_by(Puzzle.rating, Puzzle.id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        position = 0
+        async for puzzle_id, rating, puzzle_popularity, themes in stream:
+            ids.append(puzzle_id.encode())
+            ratings.append(rating)
+            popularity.append(puzzle_popularity)
+            for theme in themes:
+                postings[theme].append(position)
+            position += 1
+
+        fresh = PuzzleIndex()
+        fresh.ids = np.array(ids) if ids else np.array([], dtype="S1")
+        fresh.ratings = np.array(ratings, dtype=np.float32)
+        fresh.set_popularity(np.array(popularity, dtype=np.float32))
+        # Los bitmaps de temas son lo más pesado: en un thread para no frenar los requests durante un reload
+        await asyncio.to_thread(
+            fresh.set_themes, {theme: np.array(positions, dtype=np.int32) for theme, positions in postings.items()}
+        )
+        self.swap(fresh, version)
+
+        logging.info(f"🧩 Índice de puzzles cargado: {len(self)} puzzles ({self.memory_bytes() / 1e6:.1f} MB)")
+
+    def swap(self, other: "PuzzleIndex", version: Optional[datetime]):
+        # Todo en un paso sin awaits: ningún request ve ids de un índice con ratings de otro
+        self.ids, self.ratings, self.cum_weights, self.themes, self.theme_bits, self.version = (
+            other.ids, other.ratings, other.cum_weights, other.themes, other.theme_bits, version
+        )
+
+    async def reload_if_changed(self) -> bool:
+        async with AsyncSessionLocal() as db:
+            if await current_version(db) == self.version:
+                return False
+            await self.load(db)
+
+        for callback in self.on_reload:
+            callback()
+        return True
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(RELOAD_CHECK_INTERVAL)
+            try:
+                await self.reload_if_changed()
+            except Exception:
+                logging.exception("❌ Error recargando el índice de puzzles, se sigue con el anterior")
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def memory_bytes(self) -> int:
+        return (
+            self.ids.nbytes + self.ratings.nbytes + self.cum_weights.nbytes
+            + sum(p.nbytes for p in self.themes.values())
+            + sum(b.nbytes for b in self.theme_bits.values())
+        )
+
+    def set_popularity(self, popularity: np.ndarray):
+        """
+        Recalcula los pesos acumulados (float64: con 4M de puzzles float32 perdería precisión).
+        """
+        self.cum_weights = np.concatenate([[0.0], np.cumsum(popularity_weights(popularity), dtype=np.float64)])
+
+    def weight(self, positions: np.ndarray) -> np.ndarray:
+        return self.cum_weights[positions + 1] - self.cum_weights[positions]
+
+    def weighted_sample(self, lo: int, hi: int, size: int) -> np.ndarray:
+        """
+        `size` posiciones de [lo, hi) sorteadas con reemplazo, proporcional a la popularidad: O(log n) cada una.
+        Sin pesos cargados (índice armado a mano) el sorteo es uniforme.
+        """
+        if len(self.cum_weights) != len(self) + 1:
+            return np.random.randint(lo, hi, size)
+
+        draws = np.random.uniform(self.cum_weights[lo], self.cum_weights[hi], size)
+        positions = np.searchsorted(self.cum_weights, draws, side="right") - 1
+        return positions.clip(lo, hi - 1)
+
+    def set_themes(self, themes: dict[str, np.ndarray]):
+        self.themes = themes
+        self.theme_bits = {}
+        for theme, positions in themes.items():
+            mask = np.zeros(len(self), dtype=bool)
+            mask[positions] = True
+            self.theme_bits[theme] = np.packbits(mask, bitorder="little")
+
+    def window(self, rating: float, radius: float) -> tuple[int, int]:
+        """
+        Rango [lo, hi) de posiciones con rating entre rating - radius y rating + radius.
+        """
+        # Mismo dtype que el array, si no NumPy convierte los 4M ratings en cada búsqueda
+        lo = int(np.searchsorted(self.ratings, np.float32(rating - radius), side="left"))
+        hi = int(np.searchsorted(self.ratings, np.float32(rating + radius), side="right"))
+        return lo, hi
+
+    def puzzle_id(self, position: int) -> str:
+        return self.ids[position].decode()
+
+    def _theme_candidates(self, themes: Sequence[str], rating: float, radius: float) -> tuple[np.ndarray, list[np.ndarray]]:
+        """
+        La posting list más corta recortada a la ventana (con búsqueda binaria) y los bitmaps del resto de los temas.
+        """
+        lo, hi = self.window(rating, radius)
+        lo, hi = np.int32(lo), np.int32(hi)  # mismo dtype que las posting lists, si no NumPy las convierte enteras
+
+        if any(theme not in self.themes for theme in themes):
+            return np.array([], dtype=np.int32), []
+
+        ordered = sorted(themes, key=lambda t: len(self.themes[t]))
+        postings = self.themes[ordered[0]]
+        in_window = postings[np.searchsorted(postings, lo):np.searchsorted(postings, hi)]
+        return in_window, [self.theme_bits[theme] for theme in ordered[1:]]
+
+    @staticmethod
+    def _filter_bits(positions: np.ndarray, bitmaps: list[np.ndarray]) -> np.ndarray:
+        for bits in bitmaps:
+            positions = positions[(bits[positions >> 3] >> (positions & 7)) & 1 == 1]
+        return positions
+
+    def theme_window(self, themes: Sequence[str], rating: float, radius: float) -> np.ndarray:
+        """
+        Posiciones dentro de la ventana de rating que tienen todos los `themes`:
+        la posting list más corta filtrada con los bitmaps de los demás temas.
+        """
+        if not themes:
+            return np.arange(*self.window(rating, radius), dtype=np.int32)
+
+        candidates, bitmaps = self._theme_candidates(themes, rating, radius)
+        return self._filter_bits(candidates, bitmaps)
+
+    def _pick_in(self, positions: Sequence[int], is_seen: Callable[[str], bool]) -> Optional[str]:
+        """
+        Primero posiciones al azar, si todas están vistas recorre todas desde un punto al azar.
+        """
+        size = len(positions)
+        if size <= 0:
+            return None
+
+        for _ in range(min(RANDOM_PROBES, size)):
+            puzzle_id = self.puzzle_id(positions[random.randrange(size)])
+            if not is_seen(puzzle_id):
+                return puzzle_id
+
+        start = random.randrange(size)
+        for offset in range(size):
+            puzzle_id = self.puzzle_id(positions[(start + offset) % size])
+            if not is_seen(puzzle_id):
+                return puzzle_id
+
+        return None
+
+    def pick(self, rating: float, is_seen: Callable[[str], bool]) -> Optional[str]:
+        """
+        Elige un puzzle no visto cerca de `rating`, sorteado según su popularidad; si la ventana se agota amplía el radio.
+        """
+        for radius in SEARCH_RADII:
+            lo, hi = self.window(rating, radius)
+            if hi <= lo:
+                continue
+
+            for position in self.weighted_sample(lo, hi, RANDOM_PROBES):
+                puzzle_id = self.puzzle_id(position)
+                if not is_seen(puzzle_id):
+                    return puzzle_id
+
+            # Ventana casi agotada: recorrido completo sin ponderar
+            puzzle_id = self._pick_in(range(lo, hi), is_seen)
+            if puzzle_id:
+                return puzzle_id
+        return None
+
+    def pick_themed(self, themes: Sequence[str], rating: float, is_seen: Callable[[str], bool]) -> Optional[str]:
+        """
+        Como pick() pero solo entre los puzzles que tienen todos los `themes`.
+        """
+        for radius in THEME_SEARCH_RADII:
+            candidates, bitmaps = self._theme_candidates(themes, rating, radius)
+            if not len(candidates):
+                continue
+
+            # Sin calcular la intersección completa: se prueban candidatos al azar de la lista más corta,
+            # aceptando cada uno con probabilidad proporcional a su peso (muestreo por rechazo)
+            sample = candidates[np.random.randint(0, len(candidates), RANDOM_PROBES * 4)]
+            if len(self.cum_weights) == len(self) + 1:
+                sample = sample[np.random.random(len(sample)) < self.weight(sample)]
+            for position in self._filter_bits(sample, bitmaps):
+                puzzle_id = self.puzzle_id(position)
+                if not is_seen(puzzle_id):
+                    return puzzle_id
+
+            puzzle_id = self._pick_in(self._filter_bits(candidates, bitmaps), is_seen)
+            if puzzle_id:
+                return puzzle_id
+        return None
+
+async def current_version(db: AsyncSession) -> Optional[datetime]:
+    result = await db.execute(select(JobWatermark.updated_at).where(JobWatermark.name == INDEX_WATERMARK))
+    return result.scalar_one_or_none()
+
+async def mark_puzzles_changed(db: AsyncSession):
+    """
+    Avisa a la API que tiene que rearmar el índice (puzzles nuevos, retirados o con otro rating). No hace commit.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(JobWatermark).values(name=INDEX_WATERMARK, last_at=now, updated_at=now)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[JobWatermark.name],
+            set_={"last_at": stmt.excluded.last_at, "updated_at": stmt.excluded.updated_at}
+        )
+    )
+
+puzzle_index = PuzzleIndex()
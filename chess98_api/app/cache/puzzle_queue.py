@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from itertools import cycle
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.cache.puzzle_index import puzzle_index
+from app.cache.puzzle_seen import puzzle_seen_cache
+from app.database.connection import AsyncSessionLocal
+from app.models.puzzle import Puzzle
+from app.schemas.puzzle import PuzzleOut
+
+MAX_PLAYERS = 5000
+QUEUE_SIZE = 8
+REFILL_BELOW = 4
+
+# Los candidatos se reparten alrededor del rating porque éste cambia con cada solve
+BAND_OFFSETS = (0, -25, 25, -50, 50)
+MAX_DISTANCE = 50
+
+class PuzzleQueueCache:
+    """
+    Cola por jugador con los siguientes puzzles ya elegidos y cargados (payload completo de PuzzleOut),
+    para que el solve no tenga que elegir ni leer el siguiente puzzle en el request.
+    Se rellena en segundo plano con su propia sesión cuando baja de REFILL_BELOW.
+    """
+    def __init__(self, max_players: int = MAX_PLAYERS):
+        self.max_players = max_players
+        self.queues: OrderedDict[UUID, list[dict]] = OrderedDict()
+        self.refilling: dict[UUID, asyncio.Task] = {}
+
+    def pop(self, profile_id: UUID, rating: float) -> Optional[dict]:
+        """
+        Saca el candidato más cercano a `rating`. Los que quedaron lejos porque el rating se movió se descartan.
+        """
+        queue = self.queues.get(profile_id)
+        if not queue:
+            return None
+        self.queues.move_to_end(profile_id)
+
+        queue[:] = [puzzle for puzzle in queue if abs(puzzle["rating"] - rating) <= MAX_DISTANCE]
+        if not queue:
+            return None
+
+        best = min(range(len(queue)), key=lambda i: abs(queue[i]["rating"] - rating))
+        return queue.pop(best)
+
+    def schedule_refill(self, profile_id: UUID, rating: float):
+        if not puzzle_index.loaded or profile_id in self.refilling:
+            return
+        if len(self.queues.get(profile_id, ())) >= REFILL_BELOW:
+            return
+
+        task = asyncio.create_task(self.refill(profile_id, rating))
+        self.refilling[profile_id] = task
+        task.add_done_callback(lambda _: self.refilling.pop(profile_id, None))
+
+    async def refill(self, profile_id: UUID, rating: float):
+        try:
+            async with AsyncSessionLocal() as db:
+                seen = await puzzle_seen_cache.get(profile_id, db)
+
+                queue = self.queues.setdefault(profile_id, [])
+                self.queues.move_to_end(profile_id)
+                if len(self.queues) > self.max_players:
+                    self.queues.popitem(last=False)
+
+                taken = {puzzle["id"] for puzzle in queue}
+                is_taken = lambda puzzle_id: puzzle_id in taken or puzzle_id in seen
+
+                offsets = cycle(BAND_OFFSETS)
+                for _ in range(QUEUE_SIZE - len(queue)):
+                    puzzle_id = puzzle_index.pick(rating + next(offsets), is_taken)
+                    if puzzle_id:
+                        taken.add(puzzle_id)
+
+                new_ids = taken - {puzzle["id"] for puzzle in queue}
+                if not new_ids:
+                    return
+
+                result = await db.execute(select(Puzzle).where(Puzzle.id.in_(new_ids)))
+                queue.extend(
+                    PuzzleOut.model_validate(puzzle).model_dump()
+                    for puzzle in result.scalars()
+                )
+        except Exception:
+            logging.exception(f"❌ Error rellenando la cola de puzzles de {profile_id}")
+
+    def clear(self):
+        # Tras recargar el índice: las colas pueden tener puzzles retirados o de otra banda de rating
+        self.queues.clear()
+
+    def discard(self, profile_id: UUID, puzzle_id: str):
+        queue = self.queues.get(profile_id)
+        if queue:
+            queue[:] = [puzzle for puzzle in queue if puzzle["id"] != puzzle_id]
+
+puzzle_queue_cache = PuzzleQueueCache()
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import random
+import uuid
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.puzzle_index import puzzle_index
+from app.database.connection import AsyncSessionLocal
+from app.models.puzzle import Puzzle
+from app.schemas.puzzle import PuzzleOut
+
+RUSH_SIZE = 40
+RUSH_START_RATING = 700
+RUSH_END_RATING = 2500
+POOL_SIZE = 16
+MAX_SERVES = 50  # veces que se sirve un batch antes de reemplazarlo
+
+class PuzzleRushPool:
+    """
+    Batches de puzzle rush ya armados (RUSH_SIZE puzzles de rating creciente con su payload completo),
+    así el endpoint solo elige uno del pool. Cada batch se sirve hasta MAX_SERVES veces y después
+    se reemplaza en segundo plano con su propia sesión.
+    """
+    def __init__(self, pool_size: int = POOL_SIZE, max_serves: int = MAX_SERVES):
+        self.pool_size = pool_size
+        self.max_serves = max_serves
+        self.batches: list[dict] = []
+        self.serves: dict[str, int] = {}
+        self.building: Optional[asyncio.Task] = None
+
+    async def build_batch(self, db: AsyncSession) -> Optional[dict]:
+        targets = np.linspace(RUSH_START_RATING, RUSH_END_RATING, RUSH_SIZE)
+        taken: list[str] = []
+        for rating in targets:
+            puzzle_id = puzzle_index.pick(float(rating), taken.__contains__)
+            if puzzle_id:
+                taken.append(puzzle_id)
+        if not taken:
+            return None
+
+        result = await db.execute(select(Puzzle).where(Puzzle.id.in_(taken)))
+        puzzles = {puzzle.id: PuzzleOut.model_validate(puzzle).model_dump() for puzzle in result.scalars()}
+
+        return {
+            "id": uuid.uuid4().hex,
+            "puzzles": [puzzles[puzzle_id] for puzzle_id in taken if puzzle_id in puzzles],
+        }
+
+    async def fill(self):
+        try:
+            async with AsyncSessionLocal() as db:
+                while len(self.batches) < self.pool_size:
+                    batch = await self.build_batch(db)
+                    if batch is None:
+                        return
+                    self.batches.append(batch)
+                    self.serves[batch["id"]] = 0
+        except Exception:
+            logging.exception("❌ Error armando batches de puzzle rush")
+
+    def schedule_fill(self):
+        if puzzle_index.loaded and (self.building is None or self.building.done()):
+            self.building = asyncio.create_task(self.fill())
+
+    async def take(self, db: AsyncSession) -> Optional[dict]:
+        if not self.batches:
+            # Pool vacío (recién arrancado): se arma uno en el request y el resto en segundo plano
+            if not puzzle_index.loaded:
+                return None
+            batch = await self.build_batch(db)
+            self.schedule_fill()
+            return batch
+
+        batch = random.choice(self.batches)
+        self.serves[batch["id"]] += 1
+        if self.serves[batch["id"]] >= self.max_serves:
+            self.batches.remove(batch)
+            self.serves.pop(batch["id"])
+            self.schedule_fill()
+
+        return batch
+
+    def reset(self):
+        """
+        Descarta los batches armados (p. ej. tras recargar el índice: pueden tener puzzles retirados).
+        """
+        self.batches = []
+        self.serves = {}
+        self.schedule_fill()
+
+puzzle_rush_pool = PuzzleRushPool()
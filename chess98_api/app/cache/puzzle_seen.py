@@ -0,0 +1,107 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.connection import AsyncSessionLocal
+from app.models.puzzle_seen_filter import PuzzleSeenFilter
+from app.models.puzzle_solve import PuzzleSolve
+from app.utils.bloom import ScalableBloomFilter
+
+MAX_PLAYERS = 5000
+
+class PuzzleSeenCache:
+    """
+    Puzzles ya jugados por perfil como Bloom filter escalable, en memoria con desalojo LRU.
+    Al desalojar (y al apagar) el filtro se guarda en puzzle_seen_filters; al cargarlo solo
+    se agregan los solves posteriores a synced_at en vez de leer todo el historial.
+    Un positivo puede ser falso: quien lo use debe tener un fallback exacto contra la base de datos.
+    """
+    def __init__(self, max_players: int = MAX_PLAYERS):
+        self.max_players = max_players
+        self.players: OrderedDict[UUID, ScalableBloomFilter] = OrderedDict()
+        self.synced_at: dict[UUID, datetime] = {}
+        self.dirty: set[UUID] = set()
+
+    async def get(self, profile_id: UUID, db: AsyncSession) -> ScalableBloomFilter:
+        seen = self.players.get(profile_id)
+        if seen is not None:
+            self.players.move_to_end(profile_id)
+            return seen
+
+        synced_at = datetime.now(timezone.utc)
+
+        stored = await db.get(PuzzleSeenFilter, profile_id)
+        query = select(PuzzleSolve.puzzle_id).where(PuzzleSolve.profile_id == profile_id)
+        if stored:
+            seen = ScalableBloomFilter.from_bytes(stored.data)
+            query = query.where(PuzzleSolve.solved_at >= stored.synced_at)
+        else:
+            seen = ScalableBloomFilter()
+
+        result = await db.execute(query)
+        pending = result.scalars().all()
+        seen.update(pending)
+
+        self.players[profile_id] = seen
+        self.synced_at[profile_id] = synced_at
+        if pending or not stored:
+            self.dirty.add(profile_id)
+
+        if len(self.players) > self.max_players:
+            evicted, evicted_seen = self.players.popitem(last=False)
+            await self.save({evicted: evicted_seen})
+
+        return seen
+
+    def mark(self, profile_id: UUID, puzzle_id: str):
+        seen = self.players.get(profile_id)
+        if seen is not None:
+            seen.add(puzzle_id)
+            self.dirty.add(profile_id)
+
+    async def save(self, filters: dict[UUID, ScalableBloomFilter]):
+        """
+        Guarda los filtros modificados en su propia sesión, fuera de la transacción del request.
+        """
+        rows = [
+            {
+                "profile_id": profile_id,
+                "data": seen.to_bytes(),
+                "items": len(seen),
+                "synced_at": self.synced_at[profile_id],
+            }
+            for profile_id, seen in filters.items()
+            if profile_id in self.dirty
+        ]
+        for profile_id in filters:
+            self.dirty.discard(profile_id)
+            if profile_id not in self.players:
+                self.synced_at.pop(profile_id, None)
+
+        if not rows:
+            return
+
+        stmt = pg_insert(PuzzleSeenFilter).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PuzzleSeenFilter.profile_id],
+            set_={
+                "data": stmt.excluded.data,
+                "items": stmt.excluded.items,
+                "synced_at": stmt.excluded.synced_at,
+            }
+        )
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+    async def save_all(self):
+        await self.save(dict(self.players))
+        logging.info(f"🧩 Filtros de puzzles vistos guardados ({len(self.players)} perfiles en memoria)")
+
+puzzle_seen_cache = PuzzleSeenCache()
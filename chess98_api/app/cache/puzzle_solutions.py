@@ -0,0 +1,42 @@
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from app.models.puzzle import Puzzle
+from app.utils.puzzle_solution import PuzzleSolution
+
+MAX_PUZZLES = 20000
+
+class PuzzleSolutionCache:
+    """
+    PuzzleSolution ya parseadas por puzzle, con desalojo LRU.
+    """
+    def __init__(self, max_puzzles: int = MAX_PUZZLES):
+        self.max_puzzles = max_puzzles
+        self.solutions: OrderedDict[str, PuzzleSolution] = OrderedDict()
+
+    async def get(self, puzzle_id: str, db: AsyncSession) -> PuzzleSolution:
+        solution = self.solutions.get(puzzle_id)
+        if solution is not None:
+            self.solutions.move_to_end(puzzle_id)
+            return solution
+
+        result = await db.execute(select(Puzzle.fen, Puzzle.moves).where(Puzzle.id == puzzle_id))
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Puzzle not found")
+
+        solution = PuzzleSolution(row.fen, row.moves)
+        self.solutions[puzzle_id] = solution
+        if len(self.solutions) > self.max_puzzles:
+            self.solutions.popitem(last=False)
+
+        return solution
+
+    def clear(self):
+        # Un re-import puede cambiar la solución de un puzzle ya cacheado
+        self.solutions.clear()
+
+puzzle_solution_cache = PuzzleSolutionCache()
@@ -0,0 +1,9 @@
+# Evaluación guardada para un mate (centipeones, desde el lado de blancas): +MATE_SCORE si ganan blancas
+MATE_SCORE = 10000
+
+# Profundidad por defecto del análisis de partidas (scripts/analyze_games.py)
+ANALYSIS_DEPTH = 18
+ENGINE_HASH_MB = 64
+
+# Evaluación de la posición inicial cuando no está guardada (las filas de `moves` tienen la de después de cada jugada)
+INITIAL_EVAL = 20
@@ -0,0 +1,13 @@
+# Ratings iniciales por categoría (time controls + puzzles)
+DEFAULT_RATINGS = {
+    "bullet": 1200,
+    "blitz": 1200,
+    "rapid": 1200,
+    "classical": 1200,
+    "puzzle": 500,
+}
+
+RATING_CATEGORIES = list(DEFAULT_RATINGS.keys())
+
+DEFAULT_RATING_DEVIATION = 350.0
+DEFAULT_VOLATILITY = 0.06
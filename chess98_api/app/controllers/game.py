@@ -1,8 +1,14 @@
 from fastapi import HTTPException
 from uuid import UUID
+from typing import Optional
+from datetime import datetime
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.game import get_game_by_id, get_games_by_user, get_recent_games
+from app.services.game import get_game_by_id, get_games_by_user, get_recent_games, export_user_games_pgn
 from app.services.user import get_user_by_username 
+from app.services.opening import get_opening_stats
+from app.services.explorer import get_explorer_moves
+from app.services.position import find_games_by_position
 
 class GameController:
     @staticmethod
@@ -23,4 +29,34 @@ class GameController:
     
     @staticmethod
     async def list_recent_games(page: int, page_size: int, db: AsyncSession):
-        return await get_recent_games(page, page_size, db)
\ No newline at end of file
+        return await get_recent_games(page, page_size, db)
+
+    @staticmethod
+    async def list_opening_stats(eco: Optional[str], limit: int, db: AsyncSession):
+        return await get_opening_stats(eco, limit, db)
+
+    @staticmethod
+    async def export_user_games(
+        username: str,
+        since: Optional[datetime],
+        until: Optional[datetime],
+        time_control: Optional[str],
+        db: AsyncSession
+    ):
+        user = await get_user_by_username(username, db)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        return StreamingResponse(
+            export_user_games_pgn(user.id, since, until, time_control),
+            media_type="application/x-chess-pgn",
+            headers={"Content-Disposition": f'attachment; filename="chess98_{user.username}.pgn"'}
+        )
+
+    @staticmethod
+    async def explore_position(fen: Optional[str], limit: int, db: AsyncSession):
+        return await get_explorer_moves(fen, limit, db)
+
+    @staticmethod
+    async def search_position(fen: str, cursor: Optional[str], limit: int, db: AsyncSession):
+        return await find_games_by_position(fen, cursor, limit, db)
@@ -1,8 +1,12 @@
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from datetime import date
+from typing import Optional
 
 from app.services.profile import get_profile_by_user_id, get_profile_by_username
+from app.services.rating_histogram import get_rating_distribution, get_rating_percentile
+from app.services.rating_history import get_rating_history
 
 class ProfileController:
     @staticmethod
@@ -17,4 +21,19 @@ class ProfileController:
         profile = await get_profile_by_username(username, db)
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
-        return profile
\ No newline at end of file
+        return profile
+
+    @staticmethod
+    async def get_rating_distribution(category: str, db: AsyncSession):
+        return await get_rating_distribution(category, db)
+
+    @staticmethod
+    async def get_rating_percentile(category: str, rating: float, db: AsyncSession):
+        return await get_rating_percentile(category, rating, db)
+
+    @staticmethod
+    async def get_rating_history(username: str, category: str, interval: str, since: Optional[date], db: AsyncSession):
+        profile = await get_profile_by_username(username, db)
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return await get_rating_history(profile.id, category, interval, since, db)
\ No newline at end of file
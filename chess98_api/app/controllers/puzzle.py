@@ -1,3 +1,4 @@
+from typing import Optional, List
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
@@ -7,9 +8,13 @@ from app.services.puzzle import (
     solve_puzzle_and_get_next,
     refresh_active_puzzle,
     get_puzzle_by_id,
-    get_puzzles_by_profile_id
+    get_puzzles_by_profile_id,
+    get_theme_counts,
+    validate_puzzle_moves
 )
 from app.services.puzzle_solve import get_solve_stats_by_profile_id
+from app.services.puzzle_rush import get_rush_batch, record_rush_results
+from app.schemas.puzzle_rush import PuzzleRushAttempt
 
 from app.models.puzzle_solve import PuzzleSolveStatus
 
@@ -25,30 +30,60 @@ class PuzzleController:
         user_id: UUID,
         puzzle_id: str,
         status: PuzzleSolveStatus,
-        db: AsyncSession
+        db: AsyncSession,
+        themes: Optional[List[str]] = None,
+        moves: Optional[List[str]] = None
     ):
         profile = await get_profile_by_user_id(user_id, db)
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
 
-        return await solve_puzzle_and_get_next(profile, puzzle_id, status, db)
+        return await solve_puzzle_and_get_next(profile, puzzle_id, status, db, themes, moves)
+
+    @staticmethod
+    async def validate_moves(puzzle_id: str, moves: List[str], db: AsyncSession):
+        return await validate_puzzle_moves(puzzle_id, moves, db)
 
     @staticmethod
-    async def refresh_puzzle(user_id: UUID, db: AsyncSession):
+    async def refresh_puzzle(user_id: UUID, db: AsyncSession, themes: Optional[List[str]] = None):
         profile = await get_profile_by_user_id(user_id, db)
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
 
-        new_puzzle_id = await refresh_active_puzzle(profile, db)
-        return {"new_puzzle_id": new_puzzle_id}
+        puzzle = await refresh_active_puzzle(profile, db, themes)
+        return {"new_puzzle_id": puzzle["id"], "puzzle": puzzle}
+
+    @staticmethod
+    async def get_themes(db: AsyncSession):
+        return await get_theme_counts(db)
+
+    @staticmethod
+    async def get_rush(db: AsyncSession):
+        return await get_rush_batch(db)
+
+    @staticmethod
+    async def submit_rush_results(user_id: UUID, attempts: List[PuzzleRushAttempt], db: AsyncSession):
+        profile = await get_profile_by_user_id(user_id, db)
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found")
+
+        return await record_rush_results(profile, attempts, db)
     
     @staticmethod
-    async def get_paginated_solves_by_username(username: str, only_rated: bool, page: int, page_size: int, db: AsyncSession):
+    async def get_paginated_solves_by_username(
+        username: str,
+        only_rated: bool,
+        page: int,
+        page_size: int,
+        db: AsyncSession,
+        cursor: Optional[str] = None,
+        include_total: bool = True
+    ):
         profile = await get_profile_by_username(username, db)
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
 
-        return await get_puzzles_by_profile_id(profile.id, only_rated, page, page_size, db)
+        return await get_puzzles_by_profile_id(profile.id, only_rated, page, page_size, db, cursor, include_total)
 
     @staticmethod
     async def get_stats_by_username(username: str, db: AsyncSession):
@@ -56,7 +91,7 @@ class PuzzleController:
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
 
-        return await get_solve_stats_by_profile_id(profile.id, db)
+        return await get_solve_stats_by_profile_id(profile.id, profile.ratings.get("puzzle"), db)
 
     #experimental
     @staticmethod
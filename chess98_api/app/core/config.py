@@ -6,4 +6,6 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+OPENINGS_DIR = os.getenv("OPENINGS_DIR", "data/openings")  # TSV de lichess-org/chess-openings
+STOCKFISH_PATH = os.getenv("STOCKFISH_PATH", "stockfish")  # motor UCI para scripts/analyze_games.py
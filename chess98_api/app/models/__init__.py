@@ -4,8 +4,18 @@ from .friend import Friend
 from .game import Game
 from .move import Move
 from .profile import Profile
+from .profile_rating import ProfileRating
 from .settings import Settings
 from .user_achievement import UserAchievement
 from .user import User
 from .puzzle import Puzzle
-from .puzzle_solve import PuzzleSolve
\ No newline at end of file
+from .puzzle_solve import PuzzleSolve
+from .puzzle_seen_filter import PuzzleSeenFilter
+from .puzzle_solve_stats import PuzzleSolveStats
+from .rating_histogram import RatingHistogramBucket
+from .rating_history import RatingHistory, RatingHistoryDaily
+from .job_watermark import JobWatermark
+from .opening_stats import OpeningStats
+from .explorer_move import ExplorerMove
+from .game_position import GamePosition
+from .analysis_job import AnalysisJob
\ No newline at end of file
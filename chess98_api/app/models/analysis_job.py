@@ -0,0 +1,43 @@
+import enum
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, Text, Enum as SAEnum
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.database.base import Base
+
+
+class AnalysisJobStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class AnalysisJob(Base):
+    """
+    Cola de análisis con motor de las partidas terminadas (la procesa scripts/analyze_games.py).
+    Se toman en orden de `priority` con FOR UPDATE SKIP LOCKED, así varios workers no se pisan.
+    """
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        sa.Index(
+            "idx_analysis_jobs_pending_priority", sa.text("priority DESC"),
+            postgresql_where=sa.text("status = 'PENDING'")
+        ),
+    )
+
+    game_id = Column(PG_UUID(as_uuid=True), ForeignKey("games.id", ondelete="CASCADE"), primary_key=True)
+
+    status = Column(SAEnum(AnalysisJobStatus, name="analysis_job_status"), default=AnalysisJobStatus.PENDING, nullable=False)
+    priority = Column(Float, nullable=False)  # ver analysis_priority(): partidas recientes y de más rating primero
+
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)  # cuándo la tomó un worker (para liberar las colgadas)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Métricas del análisis
+    positions = Column(Integer, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
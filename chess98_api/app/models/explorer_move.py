@@ -0,0 +1,18 @@
+from sqlalchemy import Column, BigInteger, Integer, String
+from app.database.base import Base
+
+
+class ExplorerMove(Base):
+    """
+    Explorador de aperturas: por posición (hash Zobrist, ver app/utils/zobrist.py) y jugada,
+    cuántas partidas la jugaron y cómo terminaron. Solo las primeras 30 jugadas de cada partida.
+    """
+    __tablename__ = "explorer_moves"
+
+    position_key = Column(BigInteger, primary_key=True)
+    move_uci = Column(String(5), primary_key=True)  # el SAN se calcula al consultar, con el tablero de la posición
+
+    games = Column(Integer, default=0, nullable=False)
+    white_wins = Column(Integer, default=0, nullable=False)
+    draws = Column(Integer, default=0, nullable=False)
+    black_wins = Column(Integer, default=0, nullable=False)
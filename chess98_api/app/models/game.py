@@ -1,9 +1,10 @@
 import uuid
 from datetime import datetime, timezone
 from enum import Enum
-from sqlalchemy import Column, String, DateTime, Integer, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Float, Enum as SQLEnum, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
+import sqlalchemy as sa
 from app.database.base import Base
 
 class GameStatus(Enum):
@@ -29,6 +30,10 @@ class GameTermination(Enum):
 
 class Game(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        # Partidas terminadas en orden (end_time, id) para las cargas incrementales (scripts/build_game_positions.py)
+        sa.Index("idx_games_completed_end_time_id", "end_time", "id", postgresql_where=sa.text("status = 'completed'")),
+    )
     
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     white_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -55,6 +60,18 @@ class Game(Base):
     black_rating = Column(Integer, nullable=False)
     white_rating_change = Column(Integer, nullable=True)
     black_rating_change = Column(Integer, nullable=True)
+
+    # Resumen del análisis con motor (app/utils/accuracy.py), se llena al terminar el análisis de la partida
+    white_accuracy = Column(Float, nullable=True)
+    black_accuracy = Column(Float, nullable=True)
+    white_acpl = Column(Integer, nullable=True)
+    black_acpl = Column(Integer, nullable=True)
+    white_inaccuracies = Column(Integer, nullable=True)
+    black_inaccuracies = Column(Integer, nullable=True)
+    white_mistakes = Column(Integer, nullable=True)
+    black_mistakes = Column(Integer, nullable=True)
+    white_blunders = Column(Integer, nullable=True)
+    black_blunders = Column(Integer, nullable=True)
     
     moves = relationship("Move", back_populates="game", order_by="Move.move_number")
     chats = relationship("ChatMessage", back_populates="game")
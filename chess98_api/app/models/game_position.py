@@ -0,0 +1,23 @@
+from sqlalchemy import Column, BigInteger, DateTime, ForeignKey, SmallInteger
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.database.base import Base
+
+
+class GamePosition(Base):
+    """
+    Índice de posiciones de las partidas terminadas: hash Zobrist (ver app/utils/zobrist.py) -> partida
+    y primera jugada en la que se llegó a la posición. La primary key empieza por la posición y sigue por
+    la fecha, así "partidas que pasaron por esta posición, más recientes primero" es un recorrido del índice.
+    """
+    __tablename__ = "game_positions"
+    __table_args__ = (
+        # Para el ON DELETE CASCADE (la primary key empieza por la posición)
+        sa.Index("idx_game_positions_game_id", "game_id"),
+    )
+
+    position_key = Column(BigInteger, primary_key=True)
+    ended_at = Column(DateTime(timezone=True), primary_key=True)  # copia de Game.end_time para ordenar sin join
+    game_id = Column(PG_UUID(as_uuid=True), ForeignKey("games.id", ondelete="CASCADE"), primary_key=True)
+
+    ply = Column(SmallInteger, nullable=False)
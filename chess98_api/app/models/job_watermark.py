@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.database.base import Base
+
+
+class JobWatermark(Base):
+    """
+    Hasta dónde procesó cada job batch incremental: la última fila vista como (last_at, last_id),
+    en el mismo orden en que el job recorre la tabla.
+    """
+    __tablename__ = "job_watermarks"
+
+    name = Column(String, primary_key=True)
+
+    last_at = Column(DateTime(timezone=True), nullable=False)
+    last_id = Column(PG_UUID(as_uuid=True), nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from enum import Enum
 from sqlalchemy import Column, String, Integer, Boolean, Float, DateTime, Enum as SQLEnum, ForeignKey
+import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 from app.database.base import Base
@@ -12,11 +13,15 @@ class MoveColor(Enum):
 
 class Move(Base):
     __tablename__ = "moves"
+    __table_args__ = (
+        # Jugadas de una partida en orden (el análisis las escribe y las lee por partida)
+        sa.Index("idx_moves_game_id_move_number", "game_id", "move_number"),
+    )
     
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     game_id = Column(PG_UUID(as_uuid=True), ForeignKey("games.id"), nullable=False)
     
-    move_number = Column(Integer, nullable=False)
+    move_number = Column(Integer, nullable=False)  # media jugada: 1 = primera de blancas, 2 = primera de negras...
     color = Column(SQLEnum(MoveColor), nullable=False)
     move_san = Column(String, nullable=False)
     move_uci = Column(String, nullable=False)
@@ -33,6 +38,8 @@ class Move(Base):
     is_promotion = Column(Boolean, default=False, nullable=False)
     promotion_piece = Column(String, nullable=True)
     
+    # Los llena scripts/analyze_games.py: evaluación después de la jugada en centipeones desde el lado de blancas
+    # (mate = ±MATE_SCORE) y la mejor jugada (UCI) según el motor en la posición anterior
     evaluation = Column(Float, nullable=True)
     best_move = Column(String, nullable=True)
     
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String
+from app.database.base import Base
+
+
+class OpeningStats(Base):
+    """
+    Resultados agregados por apertura, sumados al terminar cada partida (ver record_opening_result)
+    y reconstruibles con scripts/backfill_openings.py.
+    """
+    __tablename__ = "opening_stats"
+
+    eco_code = Column(String, primary_key=True)
+    opening = Column(String, primary_key=True)
+
+    games = Column(Integer, default=0, nullable=False)
+    white_wins = Column(Integer, default=0, nullable=False)
+    draws = Column(Integer, default=0, nullable=False)
+    black_wins = Column(Integer, default=0, nullable=False)
@@ -3,10 +3,9 @@
 import uuid
 from datetime import datetime, timezone
 from enum import Enum
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Integer, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
-from sqlalchemy.ext.mutable import MutableDict
 from app.database.base import Base
 
 class TitleEnum(str, Enum):
@@ -30,16 +29,12 @@ class Profile(Base):
     country = Column(String, nullable=True)
     avatar_url = Column(String, nullable=True)
     
-    ratings = Column(
-        MutableDict.as_mutable(JSON),
-        default=lambda: {
-            "bullet": 1200,
-            "blitz": 1200,
-            "rapid": 1200,
-            "classical": 1200,
-            "puzzle": 500,
-        },
-        nullable=False,
+    # Ratings normalizados en profile_ratings (una fila por categoría)
+    rating_rows = relationship(
+        "ProfileRating",
+        back_populates="profile",
+        lazy="selectin",
+        cascade="all, delete-orphan",
     )
     
     total_games = Column(Integer, default=0, nullable=False)
@@ -58,3 +53,11 @@ class Profile(Base):
     active_puzzle_id = Column(String, ForeignKey("puzzles.id"), nullable=True)
     active_puzzle = relationship("Puzzle", back_populates="profiles_with_active_puzzle")
     puzzle_solves = relationship("PuzzleSolve", back_populates="profile", cascade="all, delete-orphan")
+
+    @property
+    def ratings(self) -> dict[str, int]:
+        """
+        Vista de solo lectura {categoria: rating}, mantiene el formato que consume la API.
+        Las actualizaciones se hacen con app.services.rating.apply_rating_delta.
+        """
+        return {row.category: row.rating for row in self.rating_rows}
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, Float, ForeignKey
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import relationship
+from app.database.base import Base
+from app.constants.rating import DEFAULT_RATING_DEVIATION, DEFAULT_VOLATILITY
+
+
+class ProfileRating(Base):
+    __tablename__ = "profile_ratings"
+    __table_args__ = (
+        sa.Index("idx_profile_ratings_category_rating", "category", "rating"),
+    )
+
+    profile_id = Column(PG_UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String, primary_key=True)  # bullet, blitz, rapid, classical, puzzle
+
+    rating = Column(Integer, nullable=False)
+    rating_deviation = Column(Float, default=DEFAULT_RATING_DEVIATION, nullable=False)
+    volatility = Column(Float, default=DEFAULT_VOLATILITY, nullable=False)  # Glicko-2
+    games = Column(Integer, default=0, nullable=False)
+
+    profile = relationship("Profile", back_populates="rating_rows")
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Float, Integer, Text, JSON
+from sqlalchemy import Column, String, Float, Integer, BigInteger, Boolean, Text, JSON
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.database.base import Base
 
@@ -9,6 +9,7 @@ class Puzzle(Base):
     __tablename__ = "puzzles"
     __table_args__ = (
         sa.Index("idx_puzzles_rating_id", "rating", "id"),
+        sa.Index("idx_puzzles_themes", "themes", postgresql_using="gin"),
     )
 
     id = Column(String, primary_key=True)
@@ -16,11 +17,16 @@ class Puzzle(Base):
     moves = Column(JSON, nullable=False)  # Lista de strings (movimientos en UCI)
     rating = Column(Float, nullable=False)
     rating_deviation = Column(Float, nullable=False)
+    volatility = Column(Float, default=0.06, server_default="0.06", nullable=False)  # Glicko-2, la usa scripts/recalibrate_puzzle_ratings.py
     popularity = Column(Float, nullable=False)
     times_played = Column(Integer, default=0, nullable=False)
-    themes = Column(JSON, nullable=False)  # Lista de strings
+    themes = Column(JSONB, nullable=False)  # Lista de strings, con índice GIN para filtrar por tema (@>)
     game_url = Column(String, nullable=True)
 
+    # Sync con los dumps de Lichess (scripts/import_puzzles.py --sync)
+    row_hash = Column(BigInteger, nullable=True)  # hash de los campos del CSV, solo se reescriben filas que cambian
+    retired = Column(Boolean, default=False, nullable=False)  # ya no está en el dump, no se sirve más
+
     # Relación con perfiles que lo tienen como activo
     profiles_with_active_puzzle = relationship("Profile", back_populates="active_puzzle")
 
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, DateTime, LargeBinary, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.database.base import Base
+
+
+class PuzzleSeenFilter(Base):
+    __tablename__ = "puzzle_seen_filters"
+
+    profile_id = Column(PG_UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True)
+
+    data = Column(LargeBinary, nullable=False)  # ScalableBloomFilter.to_bytes()
+    items = Column(Integer, nullable=False)
+    synced_at = Column(DateTime(timezone=True), nullable=False)  # solves posteriores se agregan al cargar
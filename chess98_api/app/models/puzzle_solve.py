@@ -27,6 +27,17 @@ class PuzzleSolve(Base):
     __tablename__ = "puzzle_solves"
     __table_args__ = (
         sa.Index("idx_puzzle_solves_profile_puzzle", "profile_id", "puzzle_id"),
+        # Historial por fecha (Postgres recorre el índice hacia atrás para ORDER BY ... DESC)
+        sa.Index("idx_puzzle_solves_profile_solved_at", "profile_id", "solved_at", "id"),
+        sa.Index(
+            "idx_puzzle_solves_profile_rated_solved_at", "profile_id", "solved_at", "id",
+            postgresql_where=sa.text("rating_delta != 0")
+        ),
+        # Recorrido global de solves rateados en orden para la recalibración incremental de puzzles
+        sa.Index(
+            "idx_puzzle_solves_rated_solved_at", "solved_at", "id",
+            postgresql_where=sa.text("rating_delta != 0")
+        ),
     )
 
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.database.base import Base
+
+
+class PuzzleSolveStats(Base):
+    """
+    Estadísticas de solves rateados por perfil, actualizadas en cada solve (ver record_solve_stats).
+    """
+    __tablename__ = "puzzle_solve_stats"
+
+    profile_id = Column(PG_UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True)
+
+    total = Column(Integer, default=0, nullable=False)  # SOLVED + FAILED con rating_delta != 0
+    solved = Column(Integer, default=0, nullable=False)
+    highest_solved_rating = Column(Float, nullable=True)
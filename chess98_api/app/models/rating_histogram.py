@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Integer
+from app.database.base import Base
+
+
+class RatingHistogramBucket(Base):
+    __tablename__ = "rating_histogram"
+
+    category = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # rating inicial del bucket (múltiplo de BUCKET_SIZE)
+    count = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, ForeignKey
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from app.database.base import Base
+
+
+class RatingHistory(Base):
+    """
+    Un punto por cada cambio de rating (append-only).
+    """
+    __tablename__ = "rating_history"
+    __table_args__ = (
+        sa.Index("idx_rating_history_profile_category_ts", "profile_id", "category", "ts"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    profile_id = Column(PG_UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
+    category = Column(String, nullable=False)
+
+    rating = Column(Integer, nullable=False)  # rating después del cambio
+    rating_delta = Column(Integer, nullable=False)
+    ts = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    game_id = Column(PG_UUID(as_uuid=True), ForeignKey("games.id", ondelete="SET NULL"), nullable=True)
+
+
+class RatingHistoryDaily(Base):
+    """
+    Resumen OHLC diario de rating_history, se mantiene en cada cambio de rating.
+    Las vistas semanales se agregan desde aquí.
+    """
+    __tablename__ = "rating_history_daily"
+
+    profile_id = Column(PG_UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    open = Column(Integer, nullable=False)
+    high = Column(Integer, nullable=False)
+    low = Column(Integer, nullable=False)
+    close = Column(Integer, nullable=False)
+    points = Column(Integer, default=0, nullable=False)
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, Query
 from uuid import UUID
+from typing import List, Optional
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.connection import get_db
 from app.controllers.game import GameController
 from app.schemas.game import PaginatedGames, PaginatedRecentGames
+from app.schemas.opening import OpeningStatsOut
+from app.schemas.explorer import ExplorerOut
+from app.schemas.position import PositionGamesOut
 
 router = APIRouter(prefix="/games", tags=["games"])
 
@@ -19,6 +24,19 @@ async def list_user_games(
     """
     return await GameController.list_user_games(username, page, page_size, db)
 
+@router.get("/user/{username}/export")
+async def export_user_games(
+    username: str,
+    since: Optional[datetime] = Query(None, description="Solo partidas empezadas desde esta fecha"),
+    until: Optional[datetime] = Query(None, description="Solo partidas empezadas antes de esta fecha"),
+    time_control: Optional[str] = Query(None, description="bullet, blitz, rapid o classical"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Descarga en PGN todas las partidas terminadas de un usuario (streaming, más recientes primero).
+    """
+    return await GameController.export_user_games(username, since, until, time_control, db)
+
 @router.get("/recent", response_model=PaginatedRecentGames)
 async def list_recent_games(
     page: int = Query(1, ge=1),
@@ -30,6 +48,40 @@ async def list_recent_games(
     """
     return await GameController.list_recent_games(page, page_size, db)
 
+@router.get("/openings/stats", response_model=List[OpeningStatsOut])
+async def list_opening_stats(
+    eco: Optional[str] = Query(None, max_length=3, description="Prefijo ECO, p. ej. B o B90"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Aperturas más jugadas con sus resultados (desde los conteos agregados en opening_stats).
+    """
+    return await GameController.list_opening_stats(eco, limit, db)
+
+@router.get("/explorer", response_model=ExplorerOut)
+async def explore_position(
+    fen: Optional[str] = Query(None, description="Posición en FEN, por defecto la inicial"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Explorador de aperturas: jugadas que se hicieron desde una posición en las partidas terminadas y cómo salieron.
+    """
+    return await GameController.explore_position(fen, limit, db)
+
+@router.get("/position", response_model=PositionGamesOut)
+async def search_position(
+    fen: str = Query(..., description="Posición en FEN"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Partidas terminadas que llegaron a una posición (más recientes primero), con la jugada en la que llegaron.
+    """
+    return await GameController.search_position(fen, cursor, limit, db)
+
 @router.get("/{game_id}")
 async def get_game(game_id: UUID, db: AsyncSession = Depends(get_db)):
     """
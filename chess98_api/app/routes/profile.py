@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from datetime import date
+from typing import Optional
 
 from app.controllers.profile import ProfileController
 from app.database.connection import get_db
-from app.schemas.profile import ProfileOut
+from app.schemas.profile import ProfileOut, RatingDistributionOut, RatingPercentileOut, RatingHistoryOut
 
 router = APIRouter(prefix="/profiles", tags=["profiles"])
 
@@ -14,4 +16,35 @@ async def get_profile_by_user(user_id: UUID, db: AsyncSession = Depends(get_db))
 
 @router.get("/username/{username}", response_model=ProfileOut)
 async def get_profile_by_username(username: str, db: AsyncSession = Depends(get_db)):
-    return await ProfileController.get_by_username(username, db)
\ No newline at end of file
+    return await ProfileController.get_by_username(username, db)
+
+@router.get("/ratings/{category}/distribution", response_model=RatingDistributionOut)
+async def get_rating_distribution(category: str, db: AsyncSession = Depends(get_db)):
+    """
+    Distribución de ratings de una categoría (bullet, blitz, rapid, classical, puzzle) en buckets de 10 puntos.
+    """
+    return await ProfileController.get_rating_distribution(category, db)
+
+@router.get("/ratings/{category}/percentile", response_model=RatingPercentileOut)
+async def get_rating_percentile(
+    category: str,
+    rating: float = Query(..., ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Percentil de un rating dentro de su categoría (ej: ¿qué percentil es 1650 en blitz?).
+    """
+    return await ProfileController.get_rating_percentile(category, rating, db)
+
+@router.get("/username/{username}/rating-history", response_model=RatingHistoryOut)
+async def get_rating_history(
+    username: str,
+    category: str = Query(...),
+    interval: str = Query("day", pattern="^(day|week)$"),
+    since: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Historial de rating del usuario en velas OHLC diarias o semanales.
+    """
+    return await ProfileController.get_rating_history(username, category, interval, since, db)
\ No newline at end of file
@@ -1,15 +1,55 @@
+from typing import Optional, List
 from fastapi import APIRouter, Depends, Query, Body
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.connection import get_db
 from app.controllers.puzzle import PuzzleController
-from app.schemas.puzzle import PuzzleRefreshResult, PuzzleOut
+from app.schemas.puzzle import PuzzleRefreshResult, PuzzleOut, PuzzleThemeCount, PuzzleValidationResult
 from app.schemas.puzzle_solve import PaginatedPuzzleSolves, PuzzleSolveStatsResponse, PuzzleSolveResult
+from app.schemas.puzzle_rush import PuzzleRushOut, PuzzleRushAttempt, PuzzleRushSummary
 from app.models.puzzle_solve import PuzzleSolveStatus
 
 router = APIRouter(prefix="/puzzles", tags=["puzzles"])
 
+@router.get("/themes", response_model=List[PuzzleThemeCount])
+async def get_themes(db: AsyncSession = Depends(get_db)):
+    """
+    Temas disponibles para entrenar y cuántos puzzles tiene cada uno.
+    """
+    return await PuzzleController.get_themes(db)
+
+@router.post("/themes/next", response_model=PuzzleRefreshResult)
+async def next_themed_puzzle(
+    user_id: UUID = Body(..., embed=True),
+    themes: List[str] = Body(..., embed=True, min_length=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Entrenamiento por tema: asigna como activo un puzzle que tenga todos los `themes` cerca del rating del usuario.
+    Para seguir en el mismo modo, mandar los mismos `themes` al marcar el puzzle como resuelto.
+    """
+    return await PuzzleController.refresh_puzzle(user_id, db, themes)
+
+@router.get("/rush", response_model=PuzzleRushOut)
+async def get_rush(db: AsyncSession = Depends(get_db)):
+    """
+    Puzzle rush: devuelve de una vez un batch de puzzles con rating creciente (precalculado).
+    El cliente los juega localmente y manda todos los resultados juntos a /puzzles/rush/results.
+    """
+    return await PuzzleController.get_rush(db)
+
+@router.post("/rush/results", response_model=PuzzleRushSummary)
+async def submit_rush_results(
+    user_id: UUID = Body(..., embed=True),
+    attempts: List[PuzzleRushAttempt] = Body(..., embed=True, min_length=1, max_length=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Registra los resultados de un puzzle rush en un solo insert. No afecta el rating de puzzles.
+    """
+    return await PuzzleController.submit_rush_results(user_id, attempts, db)
+
 @router.get("/{puzzle_id}", response_model=PuzzleOut)
 async def get_puzzle(
     puzzle_id: str,
@@ -25,13 +65,30 @@ async def solve_puzzle(
     puzzle_id: str,
     user_id: UUID = Body(..., embed=True),
     status: PuzzleSolveStatus = Body(..., embed=True),
+    themes: Optional[List[str]] = Body(None, embed=True),
+    moves: Optional[List[str]] = Body(None, embed=True),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Marca un puzzle como resuelto, fallado o saltado.
-    Actualiza el rating (solo si es SOLVED o FAILED) y asigna el siguiente puzzle.
+    Actualiza el rating (solo si es SOLVED o FAILED) y asigna el siguiente puzzle
+    (con `themes`, el siguiente sale del entrenamiento por tema).
+    Salvo para SKIPPED hay que mandar las jugadas del usuario (`moves`, UCI, sin las del rival):
+    el servidor decide con ellas si fue SOLVED o FAILED.
+    """
+    return await PuzzleController.solve_and_get_next(user_id, puzzle_id, status, db, themes, moves)
+
+@router.post("/{puzzle_id}/validate", response_model=PuzzleValidationResult)
+async def validate_puzzle(
+    puzzle_id: str,
+    moves: List[str] = Body(..., embed=True, max_length=64),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Valida las jugadas del usuario hasta ahora (UCI, sin las del rival) contra la solución.
+    Acepta cualquier mate aunque no sea el de la solución. Si la línea es correcta y sigue, devuelve la respuesta del rival.
     """
-    return await PuzzleController.solve_and_get_next(user_id, puzzle_id, status, db)
+    return await PuzzleController.validate_moves(puzzle_id, moves, db)
 
 
 @router.post("/refresh", response_model=PuzzleRefreshResult)
@@ -50,12 +107,17 @@ async def get_user_solves(
     only_rated: bool = Query(True),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior; si se manda, se ignora page"),
+    include_total: bool = Query(True, description="Contar el total (y total_pages)"),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Obtiene los puzzles que un usuario ha resuelto, filtrando si fueron rateados o no.
+    Paginar con `next_cursor` es igual de rápido en cualquier página; `page` se mantiene por compatibilidad.
     """
-    return await PuzzleController.get_paginated_solves_by_username(username, only_rated, page, page_size, db)
+    return await PuzzleController.get_paginated_solves_by_username(
+        username, only_rated, page, page_size, db, cursor, include_total
+    )
 
 @router.get("/{username}/stats", response_model=PuzzleSolveStatsResponse)
 async def get_stats_for_user(
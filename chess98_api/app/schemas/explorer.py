@@ -0,0 +1,15 @@
+from typing import List
+from pydantic import BaseModel
+
+class ExplorerMoveOut(BaseModel):
+    uci: str
+    san: str
+    games: int
+    white_wins: int
+    draws: int
+    black_wins: int
+
+class ExplorerOut(BaseModel):
+    fen: str
+    games: int  # partidas que pasaron por la posición (dentro de las primeras 30 jugadas)
+    moves: List[ExplorerMoveOut]
@@ -60,6 +60,18 @@ class GameOut(BaseModel):
     white_rating_change: Optional[int] = None
     black_rating_change: Optional[int] = None
 
+    # Vacíos hasta que termina el análisis con motor
+    white_accuracy: Optional[float] = None
+    black_accuracy: Optional[float] = None
+    white_acpl: Optional[int] = None
+    black_acpl: Optional[int] = None
+    white_inaccuracies: Optional[int] = None
+    black_inaccuracies: Optional[int] = None
+    white_mistakes: Optional[int] = None
+    black_mistakes: Optional[int] = None
+    white_blunders: Optional[int] = None
+    black_blunders: Optional[int] = None
+
     initial_fen: str
     final_fen: Optional[str] = None
     opening: Optional[str] = None
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+class OpeningStatsOut(BaseModel):
+    eco_code: str
+    opening: str
+    games: int
+    white_wins: int
+    draws: int
+    black_wins: int
+    white_score: float  # puntos de blancas por partida (0..1)
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+class PositionGame(BaseModel):
+    game_id: UUID
+    ply: int  # primera jugada (media jugada) en la que la partida llegó a la posición
+    date: datetime
+    result: Optional[str]
+    time_control_str: str
+    white: str
+    black: str
+    white_rating: int
+    black_rating: int
+
+class PositionGamesOut(BaseModel):
+    fen: str
+    games: List[PositionGame]
+    next_cursor: Optional[str] = None
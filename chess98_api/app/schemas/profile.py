@@ -1,7 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, date
 
 class ProfileOut(BaseModel):
     id: UUID
@@ -22,3 +22,32 @@ class ProfileOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class RatingBucket(BaseModel):
+    rating: int
+    count: int
+
+class RatingDistributionOut(BaseModel):
+    category: str
+    bucket_size: int
+    total: int
+    buckets: List[RatingBucket]
+
+class RatingPercentileOut(BaseModel):
+    category: str
+    rating: float
+    percentile: float
+    total: int
+
+class RatingHistoryPoint(BaseModel):
+    period: date
+    open: int
+    high: int
+    low: int
+    close: int
+    count: int
+
+class RatingHistoryOut(BaseModel):
+    category: str
+    interval: str
+    points: List[RatingHistoryPoint]
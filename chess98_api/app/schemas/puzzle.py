@@ -1,9 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, List
 
-class PuzzleRefreshResult(BaseModel):
-    new_puzzle_id: str
-
 class PuzzleOut(BaseModel):
     id: str
     fen: str
@@ -17,3 +14,17 @@ class PuzzleOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class PuzzleRefreshResult(BaseModel):
+    new_puzzle_id: str
+    puzzle: Optional[PuzzleOut] = None
+
+class PuzzleThemeCount(BaseModel):
+    theme: str
+    count: int
+
+class PuzzleValidationResult(BaseModel):
+    valid: bool
+    solved: bool
+    reply: Optional[str]  # jugada del rival (UCI) si el puzzle sigue
+    failed_at: Optional[int]  # índice de la primera jugada incorrecta
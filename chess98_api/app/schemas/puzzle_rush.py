@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional, List
+
+from app.schemas.puzzle import PuzzleOut
+from app.models.puzzle_solve import PuzzleSolveStatus
+
+class PuzzleRushOut(BaseModel):
+    id: str
+    puzzles: List[PuzzleOut]  # rating creciente
+
+class PuzzleRushAttempt(BaseModel):
+    puzzle_id: str
+    status: PuzzleSolveStatus
+    solved_at: Optional[datetime] = None  # momento en el cliente, acotado a la hora del servidor (ver clamp_solved_at)
+
+class PuzzleRushSummary(BaseModel):
+    recorded: int
+    solved: int
+    failed: int
@@ -24,12 +24,15 @@ class PuzzleSolveResult(BaseModel):
     rating_delta: int
     new_rating: float
     next_puzzle_id: Optional[str]
+    next_puzzle: Optional[PuzzleOut] = None  # payload completo, sin GET /puzzles/{id} extra
 
 class PaginatedPuzzleSolves(BaseModel):
     data: List[PuzzleSolveOut]
-    page: int
+    page: Optional[int]  # None cuando se pagina por cursor
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]  # None con include_total=false
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None  # para pedir la página siguiente; None si no hay más
 
 class PuzzleSolveStatsResponse(BaseModel):
     total: int
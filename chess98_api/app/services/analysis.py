@@ -0,0 +1,232 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+import chess
+from sqlalchemy import Float, Integer, String, case, cast, column, func, insert, literal, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants.analysis import INITIAL_EVAL
+from app.models.analysis_job import AnalysisJob, AnalysisJobStatus
+from app.models.game import Game, GameStatus
+from app.models.move import Move, MoveColor
+from app.utils.accuracy import PlayerAccuracy, game_accuracy
+
+# Prioridad = rating promedio + 1 punto cada RECENCY_SECONDS de antigüedad a favor de la más nueva:
+# una partida de hoy le gana a una de ayer con hasta 240 puntos más de rating.
+RECENCY_SECONDS = 360
+MAX_ATTEMPTS = 3
+STALE_AFTER = timedelta(minutes=10)  # una partida tarda segundos; si sigue RUNNING el worker murió
+
+def analysis_priority(white_rating: int, black_rating: int, ended_at: datetime) -> float:
+    return (white_rating + black_rating) / 2 + ended_at.timestamp() / RECENCY_SECONDS
+
+def status_value(status: AnalysisJobStatus):
+    # Con el cast explícito Postgres no resuelve el parámetro como text dentro de un SELECT o un CASE
+    return cast(literal(status, AnalysisJob.status.type), AnalysisJob.status.type)
+
+async def enqueue_analysis(game_id: UUID, white_rating: int, black_rating: int, ended_at: datetime, db: AsyncSession):
+    """
+    Encola una partida terminada para el análisis con motor. No hace commit.
+    """
+    await db.execute(
+        pg_insert(AnalysisJob)
+        .values(
+            game_id=game_id,
+            status=AnalysisJobStatus.PENDING,
+            priority=analysis_priority(white_rating, black_rating, ended_at),
+            attempts=0,
+            created_at=datetime.now(timezone.utc)
+        )
+        .on_conflict_do_nothing(index_elements=[AnalysisJob.game_id])
+    )
+
+async def enqueue_completed_games(db: AsyncSession) -> int:
+    """
+    Encola en un solo INSERT ... SELECT las partidas terminadas que todavía no tienen job. No hace commit.
+    """
+    priority = (
+        (Game.white_rating + Game.black_rating) / 2.0
+        + func.extract("epoch", Game.end_time) / RECENCY_SECONDS
+    )
+    result = await db.execute(
+        pg_insert(AnalysisJob)
+        .from_select(
+            ["game_id", "status", "priority", "attempts", "created_at"],
+            select(Game.id, status_value(AnalysisJobStatus.PENDING), priority, 0, func.now())
+            .where(Game.status == GameStatus.completed, Game.pgn.is_not(None), Game.end_time.is_not(None))
+        )
+        .on_conflict_do_nothing(index_elements=[AnalysisJob.game_id])
+    )
+    return result.rowcount
+
+async def claim_next_job(db: AsyncSession) -> Optional[UUID]:
+    """
+    Toma el job pendiente de mayor prioridad y lo marca RUNNING (FOR UPDATE SKIP LOCKED: los demás workers
+    saltan la fila en vez de esperarla). Hace commit para que la fila quede tomada mientras dura el análisis.
+    """
+    next_job = (
+        select(AnalysisJob.game_id)
+        .where(AnalysisJob.status == AnalysisJobStatus.PENDING)
+        .order_by(AnalysisJob.priority.desc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.game_id == next_job)
+        .values(
+            status=AnalysisJobStatus.RUNNING,
+            locked_at=datetime.now(timezone.utc),
+            attempts=AnalysisJob.attempts + 1
+        )
+        .returning(AnalysisJob.game_id)
+    )
+    game_id = result.scalar_one_or_none()
+    await db.commit()
+    return game_id
+
+async def release_stale_jobs(db: AsyncSession) -> int:
+    """
+    Devuelve a PENDING los jobs RUNNING de workers que murieron (o los da por FAILED tras MAX_ATTEMPTS).
+    """
+    stale = AnalysisJob.locked_at < datetime.now(timezone.utc) - STALE_AFTER
+    result = await db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.status == AnalysisJobStatus.RUNNING, stale)
+        .values(
+            status=case(
+                (AnalysisJob.attempts >= MAX_ATTEMPTS, status_value(AnalysisJobStatus.FAILED)),
+                else_=status_value(AnalysisJobStatus.PENDING)
+            ),
+            locked_at=None,
+            error="worker lost"
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+async def fail_job(game_id: UUID, error: str, db: AsyncSession):
+    """
+    Vuelve a encolar el job, o lo marca FAILED si ya agotó los intentos.
+    """
+    job = await db.get(AnalysisJob, game_id)
+    if job is None:
+        return
+    job.status = AnalysisJobStatus.FAILED if job.attempts >= MAX_ATTEMPTS else AnalysisJobStatus.PENDING
+    job.error = error[:2000]
+    job.locked_at = None
+    await db.commit()
+
+def move_rows(game_id: UUID, initial_fen: str, moves_uci: list[str], ended_at: datetime, scores: list[float], best_moves: list[Optional[str]]) -> list[dict]:
+    """
+    Filas de `moves` de una partida analizada. scores[ply] es la evaluación de la posición después de `ply`
+    jugadas (scores[0] la inicial, en centipeones desde blancas, mate = ±MATE_SCORE) y best_moves[ply] la mejor
+    jugada del motor en esa posición.
+    """
+    board = chess.Board(initial_fen)
+    rows = []
+    for ply, uci in enumerate(moves_uci, start=1):
+        move = chess.Move.from_uci(uci)
+        color = MoveColor.white if board.turn == chess.WHITE else MoveColor.black
+        san = board.san(move)
+        is_capture = board.is_capture(move)
+        is_castle = board.is_castling(move)
+        board.push(move)
+
+        rows.append({
+            "game_id": game_id,
+            "move_number": ply,
+            "color": color,
+            "move_san": san,
+            "move_uci": uci,
+            "fen_after": board.fen(),
+            "timestamp": ended_at,
+            "time_spent": 0,  # no se guarda el reloj por jugada
+            "is_check": board.is_check(),
+            "is_checkmate": board.is_checkmate(),
+            "is_capture": is_capture,
+            "is_castle": is_castle,
+            "is_promotion": move.promotion is not None,
+            "promotion_piece": chess.piece_symbol(move.promotion) if move.promotion else None,
+            "evaluation": scores[ply],
+            "best_move": best_moves[ply - 1],
+        })
+    return rows
+
+def accuracy_values(evaluations: list[float], white_first: bool = True, initial_eval: float = INITIAL_EVAL) -> dict:
+    """
+    Columnas del resumen de análisis de Game (precisión, ACPL y errores de cada jugador).
+    """
+    columns = {}
+    for color, summary in zip(("white", "black"), game_accuracy(evaluations, initial_eval, white_first)):
+        for field in PlayerAccuracy._fields:
+            columns[f"{color}_{field}"] = getattr(summary, field) if summary else None
+    return columns
+
+async def save_analysis(game_id: UUID, rows: list[dict], initial_eval: float, duration_ms: int, db: AsyncSession):
+    """
+    Escribe las evaluaciones de toda la partida en un solo statement, el resumen de precisión en la partida y
+    cierra el job, todo en la misma transacción. Las jugadas se insertan si la partida no tenía filas en `moves`,
+    si no se actualizan con UPDATE ... FROM (VALUES ...) por move_number.
+    """
+    existing = await db.execute(select(func.count()).select_from(Move).where(Move.game_id == game_id))
+    if existing.scalar_one() == 0:
+        if rows:
+            await db.execute(insert(Move), rows)
+    elif rows:
+        evals = values(
+            column("move_number", Integer), column("evaluation", Float), column("best_move", String),
+            name="evals"
+        ).data([(row["move_number"], row["evaluation"], row["best_move"]) for row in rows])
+        await db.execute(
+            update(Move)
+            .where(Move.game_id == game_id, Move.move_number == evals.c.move_number)
+            .values(evaluation=evals.c.evaluation, best_move=evals.c.best_move)
+            .execution_options(synchronize_session=False)
+        )
+
+    if rows:
+        summary = accuracy_values(
+            [row["evaluation"] for row in rows], rows[0]["color"] == MoveColor.white, initial_eval
+        )
+        await db.execute(update(Game).where(Game.id == game_id).values(**summary))
+
+    await db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.game_id == game_id)
+        .values(
+            status=AnalysisJobStatus.DONE,
+            finished_at=datetime.now(timezone.utc),
+            positions=len(rows) + 1,
+            duration_ms=duration_ms,
+            error=None
+        )
+    )
+    await db.commit()
+
+async def get_analysis_throughput(since: datetime, db: AsyncSession) -> dict:
+    """
+    Métricas de los jobs terminados desde `since` y tamaño de la cola.
+    """
+    done = await db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(AnalysisJob.positions), 0),
+            func.coalesce(func.sum(AnalysisJob.duration_ms), 0)
+        )
+        .where(AnalysisJob.status == AnalysisJobStatus.DONE, AnalysisJob.finished_at >= since)
+    )
+    games, positions, duration_ms = done.one()
+
+    queued = await db.execute(
+        select(AnalysisJob.status, func.count()).group_by(AnalysisJob.status)
+    )
+    return {
+        "games": games,
+        "positions": positions,
+        "engine_seconds": duration_ms / 1000,
+        "queue": {status.name: count for status, count in queued.all()},
+    }
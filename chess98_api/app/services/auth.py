@@ -8,6 +8,7 @@ from app.utils.security import get_password_hash, verify_password
 from app.utils.jwt import create_access_token
 from sqlalchemy.orm import joinedload
 from app.schemas.settings import SettingsOut
+from app.services.rating import default_rating_rows
 
 async def register_user(user_data: UserCreate, db: AsyncSession) -> User:
     result = await db.execute(select(User).filter(User.email == user_data.email))
@@ -26,11 +27,14 @@ async def register_user(user_data: UserCreate, db: AsyncSession) -> User:
     )
     new_profile = Profile(
         user=new_user,
-        display_name=user_data.display_name
+        display_name=user_data.display_name,
+        rating_rows=default_rating_rows()
     )
     
     db.add(new_user)
     db.add(new_profile)
+    # Las filas de rating nuevas no entran al histograma hasta la primera partida (ver track_rating_change)
+
     await db.commit()
     await db.refresh(new_user)
     return new_user
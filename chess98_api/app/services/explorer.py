@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+import chess
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.explorer_move import ExplorerMove
+from app.models.game import GameResult
+from app.models.job_watermark import JobWatermark
+from app.utils.zobrist import explorer_entries, position_key
+
+# Desde cuándo la API suma las partidas al terminar (last_at): scripts/build_explorer.py solo carga las anteriores
+LIVE_WATERMARK = "explorer_live"
+
+def result_counts(result: GameResult) -> dict:
+    result = GameResult(result)
+    return {
+        "white_wins": int(result == GameResult.white_win),
+        "draws": int(result == GameResult.draw),
+        "black_wins": int(result == GameResult.black_win),
+    }
+
+async def upsert_explorer_moves(rows: list[dict], db: AsyncSession):
+    """
+    Suma filas (position_key, move_uci, games, white_wins, draws, black_wins) a explorer_moves
+    con un solo upsert. Las filas tienen que ser únicas por (position_key, move_uci). No hace commit.
+    """
+    if not rows:
+        return
+
+    # Ordenadas por clave para que dos partidas que terminan a la vez tomen los locks en el mismo orden
+    rows = sorted(rows, key=lambda row: (row["position_key"], row["move_uci"]))
+    stmt = pg_insert(ExplorerMove).values(rows)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ExplorerMove.position_key, ExplorerMove.move_uci],
+            set_={
+                "games": ExplorerMove.games + stmt.excluded.games,
+                "white_wins": ExplorerMove.white_wins + stmt.excluded.white_wins,
+                "draws": ExplorerMove.draws + stmt.excluded.draws,
+                "black_wins": ExplorerMove.black_wins + stmt.excluded.black_wins,
+            }
+        )
+    )
+
+async def record_explorer_game(moves_uci: Sequence[str], keys: Sequence[int], result: GameResult, db: AsyncSession):
+    """
+    Agrega las primeras posiciones de una partida terminada al explorador (`keys` de position_keys). No hace commit.
+    """
+    counts = result_counts(result)
+    await upsert_explorer_moves(
+        [{**entry._asdict(), "games": 1, **counts} for entry in explorer_entries(moves_uci, keys)],
+        db
+    )
+
+async def mark_explorer_live(db: AsyncSession):
+    """
+    Guarda la primera vez que arranca una API que registra partidas en el explorador. Si ya estaba, no lo toca.
+    """
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        pg_insert(JobWatermark)
+        .values(name=LIVE_WATERMARK, last_at=now, updated_at=now)
+        .on_conflict_do_nothing(index_elements=[JobWatermark.name])
+    )
+    await db.commit()
+
+async def get_explorer_moves(fen: Optional[str], limit: int, db: AsyncSession) -> dict:
+    """
+    Jugadas desde la posición `fen` (por defecto la inicial) con sus resultados, las más jugadas primero.
+    Una sola búsqueda por la primary key (position_key, move_uci).
+    """
+    try:
+        board = chess.Board(fen) if fen else chess.Board()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid FEN")
+
+    # sum() over () se calcula antes del LIMIT: el total cuenta todas las jugadas de la posición, no solo las devueltas
+    result = await db.execute(
+        select(ExplorerMove, func.sum(ExplorerMove.games).over().label("total"))
+        .where(ExplorerMove.position_key == position_key(board))
+        .order_by(ExplorerMove.games.desc(), ExplorerMove.move_uci)
+        .limit(limit)
+    )
+    rows = result.all()
+    moves = [
+        {
+            "uci": move.move_uci,
+            "san": board.san(chess.Move.from_uci(move.move_uci)),
+            "games": move.games,
+            "white_wins": move.white_wins,
+            "draws": move.draws,
+            "black_wins": move.black_wins,
+        }
+        for move, _ in rows
+    ]
+
+    return {
+        "fen": board.fen(),
+        "games": int(rows[0].total) if rows else 0,
+        "moves": moves,
+    }
@@ -1,7 +1,8 @@
 from uuid import UUID, uuid4
+from typing import AsyncIterator, Optional
 from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, update
 
 from app.utils.time import parse_time_control
 from aiocache.serializers import JsonSerializer
@@ -13,16 +14,28 @@ from app.ws.manager.game import game_manager
 from app.models.game import Game, GameStatus
 from app.models.user import User 
 
-from app.services.profile import get_profile_by_user_id
+from app.services.profile import get_profile_by_user_id, increment_game_stats
 
 from app.schemas import QueuedPlayer
 from app.schemas.active_game import ActiveGame, PlayerColor
 import logging
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, aliased
 from app.schemas.game import GameOut, GameSummary, OpponentSummary, PaginatedGames, RecentGame, PlayerSummary, PaginatedRecentGames
 from app.models.game import GameResult, GameTermination
-from app.utils.elo import update_ratings
+from app.models.profile_rating import ProfileRating
+from app.constants.rating import DEFAULT_RATING_DEVIATION, DEFAULT_VOLATILITY
+from app.utils.glicko2 import Glicko2Rating, rate_game
+from app.services.rating import apply_rating_delta, lock_ratings_for_users
+from app.services.rating_histogram import flush_rating_histogram
+from app.services.opening import record_opening_result
+from app.services.explorer import record_explorer_game
+from app.services.position import record_game_positions
+from app.services.analysis import enqueue_analysis
+from app.utils.zobrist import position_keys
+from app.cache.openings import opening_book
+from app.utils.pgn import build_pgn, is_legacy_pgn, iter_chunks, san_moves
+from app.database.connection import AsyncSessionLocal
 
 cache = SimpleMemoryCache(serializer=JsonSerializer())
 
@@ -40,6 +53,19 @@ def map_result(result: GameResult, color: PlayerColor):
         return "win"
     return "loss"
 
+def white_score(result: GameResult) -> float:
+    result = GameResult(result)
+    if result == GameResult.white_win:
+        return 1.0
+    if result == GameResult.black_win:
+        return 0.0
+    return 0.5
+
+def current_glicko_rating(rating_row: Optional[ProfileRating], fallback_rating: int) -> Glicko2Rating:
+    if not rating_row:
+        return Glicko2Rating(fallback_rating, DEFAULT_RATING_DEVIATION, DEFAULT_VOLATILITY)
+    return Glicko2Rating(rating_row.rating, rating_row.rating_deviation, rating_row.volatility)
+
 def get_rating_change(game: Game, color: PlayerColor) -> int:
     if color == PlayerColor.white:
         return game.white_rating_change or 0
@@ -185,6 +211,80 @@ async def get_recent_games(page: int, page_size: int, db: AsyncSession) -> Pagin
         total_games=total_games
     )
 
+EXPORT_BATCH_SIZE = 500
+
+async def _export_pgns(
+    user_id: UUID,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    time_control: Optional[str]
+) -> AsyncIterator[str]:
+    # Sesión propia: la del request (Depends) ya está cerrada mientras se envía la respuesta
+    white, black = aliased(User), aliased(User)
+    query = (
+        # Columnas sueltas y no el modelo: no se acumulan objetos en el identity map de la sesión
+        select(
+            Game.id, Game.pgn, Game.result, Game.termination, Game.start_time,
+            Game.time_control, Game.time_control_str, Game.white_rating, Game.black_rating,
+            Game.initial_fen, Game.eco_code, Game.opening,
+            white.username.label("white_username"), black.username.label("black_username")
+        )
+        .join(white, white.id == Game.white_id)
+        .join(black, black.id == Game.black_id)
+        .where(
+            or_(Game.white_id == user_id, Game.black_id == user_id),
+            Game.status == GameStatus.completed
+        )
+        .order_by(Game.start_time.desc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if since:
+        query = query.where(Game.start_time >= since)
+    if until:
+        query = query.where(Game.start_time < until)
+    if time_control:
+        query = query.where(Game.time_control_str == time_control)
+
+    async with AsyncSessionLocal() as db:
+        # Cursor del lado del servidor: se leen EXPORT_BATCH_SIZE filas por vez, memoria constante
+        stream = await db.stream(query)
+        async for game in stream:
+            if not is_legacy_pgn(game.pgn):
+                yield game.pgn
+                continue
+
+            # Partidas guardadas antes del PGN completo: se arma desde las columnas
+            initial_time, increment = parse_time_control(game.time_control)
+            yield build_pgn(
+                game.id,
+                game.white_username,
+                game.black_username,
+                san_moves(game.pgn),
+                game.result,
+                game.termination,
+                game.start_time,
+                initial_time,
+                increment,
+                game.time_control_str,
+                game.white_rating,
+                game.black_rating,
+                initial_fen=game.initial_fen,
+                eco_code=game.eco_code,
+                opening=game.opening
+            )
+
+def export_user_games_pgn(
+    user_id: UUID,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    time_control: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    PGN de todas las partidas terminadas del usuario (más recientes primero), en bloques de ~64KB
+    para una StreamingResponse.
+    """
+    return iter_chunks(_export_pgns(user_id, since, until, time_control))
+
 # Crea y guarda un Game en la base de datos
 async def create_game(
     db: AsyncSession,
@@ -266,58 +366,117 @@ async def create_game_and_active_game(
     #await cache.set(f"active_game:{game.id}", active_game.model_dump(mode="json"), ttl=3600)
     return game.id
 
-async def handle_game_over(
+async def game_pgn(
     game_id: UUID,
     active_game: ActiveGame,
     result: GameResult,
     termination: GameTermination,
+    opening,
     db: AsyncSession
-):
-    white_change, black_change = update_ratings(
-        white_rating=active_game.white_rating,
-        black_rating=active_game.black_rating,
-        result=result
+) -> str:
+    """
+    PGN completo de la partida (tags + jugadas numeradas + resultado) para guardar en Game.pgn.
+    """
+    white, black = aliased(User), aliased(User)
+    row = (await db.execute(
+        select(Game.start_time, Game.initial_fen, white.username, black.username)
+        .join(white, white.id == Game.white_id)
+        .join(black, black.id == Game.black_id)
+        .where(Game.id == game_id)
+    )).one()
+    start_time, initial_fen, white_username, black_username = row
+
+    return build_pgn(
+        game_id,
+        white_username,
+        black_username,
+        active_game.moves_san,
+        result,
+        termination,
+        start_time,
+        active_game.initial_time,
+        active_game.increment,
+        active_game.time_control_str,
+        active_game.white_rating,
+        active_game.black_rating,
+        initial_fen=initial_fen,
+        eco_code=opening.eco if opening else None,
+        opening=opening.name if opening else None
     )
 
-    white_profile = await get_profile_by_user_id(active_game.white_id, db)
-    black_profile = await get_profile_by_user_id(active_game.black_id, db)
-
+async def handle_game_over(
+    game_id: UUID,
+    active_game: ActiveGame,
+    result: GameResult,
+    termination: GameTermination,
+    db: AsyncSession
+):
     time_control = active_game.time_control_str
 
-    # ✅ Reasignar el dict completo para que SQLAlchemy lo detecte
-    ratings_white = dict(white_profile.ratings)
-    ratings_white[time_control] += white_change
-    white_profile.ratings = ratings_white
-
-    ratings_black = dict(black_profile.ratings)
-    ratings_black[time_control] += black_change
-    black_profile.ratings = ratings_black
-
-    # 📊 Estadísticas
-    white_profile.total_games += 1
-    black_profile.total_games += 1
+    # ♟️ Claves Zobrist de todas las posiciones (CPU, antes de tomar locks): explorador y búsqueda por posición
+    keys = position_keys(active_game.moves_uci)
+    ended_at = datetime.now(timezone.utc)
+
+    # 🔒 Bloquear los ratings de ambos jugadores (orden por user_id) y calcular Glicko-2
+    rating_rows = await lock_ratings_for_users([active_game.white_id, active_game.black_id], time_control, db)
+    white_before = current_glicko_rating(rating_rows.get(active_game.white_id), active_game.white_rating)
+    black_before = current_glicko_rating(rating_rows.get(active_game.black_id), active_game.black_rating)
+
+    white_after, black_after = rate_game(white_before, black_before, white_score(result))
+
+    white_change = round(white_after.rating) - round(white_before.rating)
+    black_change = round(black_after.rating) - round(black_before.rating)
+
+    # 📖 Apertura: recorrido del trie ECO con las jugadas de la partida
+    opening = opening_book.classify(active_game.moves_san)
+    pgn = await game_pgn(game_id, active_game, result, termination, opening, db)
+
+    # 🔒 Cerrar la partida solo si sigue activa: evita doble finalización (timeout + resign, etc.)
+    finalized = await db.execute(
+        update(Game)
+        .where(Game.id == game_id, Game.status == GameStatus.active)
+        .values(
+            status=GameStatus.completed,
+            result=result,
+            termination=termination,
+            final_fen=active_game.current_fen,
+            pgn=pgn,
+            end_time=ended_at,
+            white_rating_change=white_change,
+            black_rating_change=black_change,
+            opening=opening.name if opening else None,
+            eco_code=opening.eco if opening else None
+        )
+        .returning(Game.id)
+    )
+    if finalized.scalar_one_or_none() is None:
+        await db.rollback()
+        logging.warning(f"⚠️ Juego {game_id} ya estaba finalizado, ignorando")
+        return
+
+    # 📊 Estadísticas y ratings con incrementos atómicos.
+    # Orden fijo por user_id para que dos finalizaciones simultáneas no se bloqueen entre sí.
+    changes = {
+        active_game.white_id: (PlayerColor.white, white_change, white_after),
+        active_game.black_id: (PlayerColor.black, black_change, black_after),
+    }
+    for user_id in sorted(changes, key=str):
+        color, change, after = changes[user_id]
+        stats = await increment_game_stats(user_id, map_result(result, color), db)
+        await apply_rating_delta(
+            stats.id, time_control, change, db,
+            rating_deviation=after.rd,
+            volatility=after.volatility,
+            game_id=game_id
+        )
 
-    if result == GameResult.white_win:
-        white_profile.wins += 1
-        black_profile.losses += 1
-    elif result == GameResult.black_win:
-        black_profile.wins += 1
-        white_profile.losses += 1
-    else:
-        white_profile.draws += 1
-        black_profile.draws += 1
-
-    # 📝 Guardar resultado en la base de datos
-    game = await db.get(Game, game_id)
-    game.status = GameStatus.completed
-    game.result = result
-    game.termination = termination
-    game.final_fen = active_game.current_fen
-    game.pgn = "\n".join(active_game.moves_san)
-    game.end_time = datetime.now(timezone.utc)
-    game.white_rating_change = white_change
-    game.black_rating_change = black_change
+    if opening:
+        await record_opening_result(opening, result, db)
+    await record_explorer_game(active_game.moves_uci, keys, result, db)
+    await record_game_positions(game_id, ended_at, keys, db)
+    await enqueue_analysis(game_id, active_game.white_rating, active_game.black_rating, ended_at, db)
 
+    await flush_rating_histogram(db)
     await db.commit()
 
     # 📢 Notificar a los jugadores
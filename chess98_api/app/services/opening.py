@@ -0,0 +1,87 @@
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.game import Game, GameResult, GameStatus
+from app.models.opening_stats import OpeningStats
+from app.utils.openings import Opening
+
+async def record_opening_result(opening: Opening, result: GameResult, db: AsyncSession):
+    """
+    Suma una partida terminada a opening_stats con un upsert atómico. No hace commit.
+    """
+    result = GameResult(result)
+    stmt = pg_insert(OpeningStats).values(
+        eco_code=opening.eco,
+        opening=opening.name,
+        games=1,
+        white_wins=int(result == GameResult.white_win),
+        draws=int(result == GameResult.draw),
+        black_wins=int(result == GameResult.black_win)
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[OpeningStats.eco_code, OpeningStats.opening],
+            set_={
+                "games": OpeningStats.games + 1,
+                "white_wins": OpeningStats.white_wins + stmt.excluded.white_wins,
+                "draws": OpeningStats.draws + stmt.excluded.draws,
+                "black_wins": OpeningStats.black_wins + stmt.excluded.black_wins,
+            }
+        )
+    )
+
+async def rebuild_opening_stats(db: AsyncSession) -> int:
+    """
+    Recalcula opening_stats desde las partidas terminadas en una sola pasada (agregados con FILTER).
+    No hace commit. Devuelve cuántas aperturas quedaron.
+    """
+    await db.execute(delete(OpeningStats))
+    await db.execute(
+        insert(OpeningStats).from_select(
+            ["eco_code", "opening", "games", "white_wins", "draws", "black_wins"],
+            select(
+                Game.eco_code,
+                Game.opening,
+                func.count(),
+                func.count().filter(Game.result == GameResult.white_win),
+                func.count().filter(Game.result == GameResult.draw),
+                func.count().filter(Game.result == GameResult.black_win)
+            )
+            .where(
+                Game.status == GameStatus.completed,
+                Game.result.is_not(None),
+                Game.eco_code.is_not(None),
+                Game.opening.is_not(None)
+            )
+            .group_by(Game.eco_code, Game.opening)
+        )
+    )
+    result = await db.execute(select(func.count()).select_from(OpeningStats))
+    return result.scalar_one()
+
+async def get_opening_stats(eco: Optional[str], limit: int, db: AsyncSession) -> list[dict]:
+    """
+    Aperturas más jugadas (opcionalmente solo las de un prefijo ECO, p. ej. "B" o "B2"), leídas de opening_stats.
+    """
+    query = select(OpeningStats)
+    if eco:
+        query = query.where(OpeningStats.eco_code.startswith(eco.upper()))
+
+    result = await db.execute(
+        query.order_by(OpeningStats.games.desc(), OpeningStats.eco_code, OpeningStats.opening).limit(limit)
+    )
+    return [
+        {
+            "eco_code": stats.eco_code,
+            "opening": stats.opening,
+            "games": stats.games,
+            "white_wins": stats.white_wins,
+            "draws": stats.draws,
+            "black_wins": stats.black_wins,
+            "white_score": (stats.white_wins + stats.draws / 2) / stats.games if stats.games else 0.0,
+        }
+        for stats in result.scalars()
+    ]
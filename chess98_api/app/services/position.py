@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Optional, Sequence
+from uuid import UUID
+
+import chess
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.game import Game
+from app.models.game_position import GamePosition
+from app.models.user import User
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.zobrist import first_plies, position_key
+
+async def record_game_positions(game_id: UUID, ended_at: datetime, keys: Sequence[int], db: AsyncSession):
+    """
+    Agrega las posiciones de una partida terminada (`keys` de position_keys) a game_positions. No hace commit.
+    """
+    rows = [
+        {"position_key": key, "ended_at": ended_at, "game_id": game_id, "ply": ply}
+        for key, ply in first_plies(keys).items()
+    ]
+    if not rows:
+        return
+
+    # on_conflict_do_nothing: el builder (scripts/build_game_positions.py) puede haberla cargado ya
+    await db.execute(pg_insert(GamePosition).values(rows).on_conflict_do_nothing())
+
+async def find_games_by_position(fen: str, cursor: Optional[str], limit: int, db: AsyncSession) -> dict:
+    """
+    Partidas terminadas que pasaron por la posición, más recientes primero, con paginación keyset
+    por (ended_at, game_id) sobre la primary key de game_positions.
+    """
+    try:
+        board = chess.Board(fen)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid FEN")
+
+    white, black = aliased(User), aliased(User)
+    query = (
+        select(
+            GamePosition.game_id, GamePosition.ended_at, GamePosition.ply,
+            Game.result, Game.time_control_str, Game.white_rating, Game.black_rating,
+            white.username.label("white_username"), black.username.label("black_username")
+        )
+        .join(Game, Game.id == GamePosition.game_id)
+        .join(white, white.id == Game.white_id)
+        .join(black, black.id == Game.black_id)
+        .where(GamePosition.position_key == position_key(board))
+        .order_by(GamePosition.ended_at.desc(), GamePosition.game_id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        try:
+            ended_at, game_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(tuple_(GamePosition.ended_at, GamePosition.game_id) < tuple_(ended_at, game_id))
+
+    rows = (await db.execute(query)).all()
+    next_cursor = encode_cursor(rows[limit - 1].ended_at, rows[limit - 1].game_id) if len(rows) > limit else None
+
+    return {
+        "fen": board.fen(),
+        "games": [
+            {
+                "game_id": row.game_id,
+                "ply": row.ply,
+                "date": row.ended_at,
+                "result": row.result.value if row.result else None,
+                "time_control_str": row.time_control_str,
+                "white": row.white_username,
+                "black": row.black_username,
+                "white_rating": row.white_rating,
+                "black_rating": row.black_rating,
+            }
+            for row in rows[:limit]
+        ],
+        "next_cursor": next_cursor,
+    }
@@ -1,6 +1,7 @@
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
 from fastapi import HTTPException
 
 from app.models.profile import Profile
@@ -47,4 +48,28 @@ async def set_active_puzzle(profile_id: UUID, puzzle_id: UUID, db: AsyncSession)
     await db.commit()
     await db.refresh(profile)
 
-    return profile
\ No newline at end of file
+    return profile
+
+async def increment_game_stats(user_id: UUID, outcome: str, db: AsyncSession) -> Row:
+    """
+    Suma una partida (y su win/loss/draw) al perfil con un UPDATE atómico.
+    outcome: "win" | "loss" | "draw". Devuelve (id, total_games, wins, losses, draws) ya actualizados.
+    No hace commit.
+    """
+    result = await db.execute(
+        update(Profile)
+        .where(Profile.user_id == user_id)
+        .values(
+            total_games=Profile.total_games + 1,
+            wins=Profile.wins + (1 if outcome == "win" else 0),
+            losses=Profile.losses + (1 if outcome == "loss" else 0),
+            draws=Profile.draws + (1 if outcome == "draw" else 0)
+        )
+        .returning(Profile.id, Profile.total_games, Profile.wins, Profile.losses, Profile.draws)
+    )
+    stats = result.one_or_none()
+
+    if not stats:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return stats
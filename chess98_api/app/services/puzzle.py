@@ -1,10 +1,10 @@
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, timezone
 from uuid import UUID
 import random
 from math import ceil
 
-from sqlalchemy import select, update, func
+from sqlalchemy import select, func, tuple_
 from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
@@ -12,8 +12,18 @@ from fastapi import HTTPException
 from app.models.puzzle import Puzzle
 from app.models.profile import Profile
 from app.models.puzzle_solve import PuzzleSolve, PuzzleSolveStatus
-from app.services.profile import set_active_puzzle
+from app.models.puzzle_solve_stats import PuzzleSolveStats
 from app.utils.elo import update_puzzle_rating
+from app.services.rating import apply_rating_delta
+from app.services.rating_histogram import flush_rating_histogram
+from app.services.puzzle_solve import record_solve_stats
+from app.cache.puzzle_index import puzzle_index
+from app.cache.puzzle_seen import puzzle_seen_cache
+from app.cache.puzzle_queue import puzzle_queue_cache
+from app.cache.puzzle_counters import puzzle_play_counter
+from app.cache.puzzle_solutions import puzzle_solution_cache
+from app.schemas.puzzle import PuzzleOut
+from app.utils.cursor import encode_cursor, decode_cursor
 
 async def get_puzzle_by_id(puzzle_id: str, db: AsyncSession) -> Puzzle:
     result = await db.execute(select(Puzzle).where(Puzzle.id == puzzle_id))
@@ -22,25 +32,104 @@ async def get_puzzle_by_id(puzzle_id: str, db: AsyncSession) -> Puzzle:
         raise HTTPException(status_code=404, detail="Puzzle not found")
     return puzzle
 
-async def get_puzzle_by_rating(rating: float, profile_id: UUID, db: AsyncSession) -> Optional[Puzzle]:
+async def get_puzzle_by_rating(
+    rating: float,
+    profile_id: UUID,
+    db: AsyncSession,
+    themes: Optional[List[str]] = None
+) -> Optional[Puzzle]:
     subquery = select(PuzzleSolve.puzzle_id).where(PuzzleSolve.profile_id == profile_id)
 
-    result = await db.execute(
-        select(Puzzle)
-        .where(
-            Puzzle.rating.between(rating - 25, rating + 25),
-            Puzzle.id.not_in(subquery)
-        )
-        .limit(1)
+    query = select(Puzzle).where(
+        Puzzle.retired.is_(False),
+        Puzzle.id.not_in(subquery)
     )
+    if themes:
+        # themes @> '[...]' usa el índice GIN; ventana más ancha porque hay menos candidatos
+        query = query.where(
+            Puzzle.themes.contains(themes),
+            Puzzle.rating.between(rating - 200, rating + 200)
+        )
+    else:
+        query = query.where(Puzzle.rating.between(rating - 25, rating + 25))
+
+    result = await db.execute(query.limit(1))
     return result.scalar_one_or_none()
 
-async def sum_times_played(puzzle_id: str, db: AsyncSession):
-    await db.execute(
-        update(Puzzle)
-        .where(Puzzle.id == puzzle_id)
-        .values(times_played=Puzzle.times_played + 1)
-    )
+async def select_next_puzzle_id(
+    rating: float,
+    profile_id: UUID,
+    db: AsyncSession,
+    themes: Optional[List[str]] = None
+) -> Optional[str]:
+    """
+    Elige el siguiente puzzle desde el índice en memoria (búsqueda binaria + probing al azar),
+    o con `themes` desde el índice invertido por tema (intersección de posting lists en la ventana).
+    Los vistos se descartan con el Bloom filter del jugador: si dice "no visto" es seguro, pero puede
+    dar falsos positivos, así que si descarta toda la ventana se confirma con la consulta SQL exacta.
+    Si el índice no está cargado usa directamente la consulta SQL.
+    """
+    if puzzle_index.loaded:
+        seen = await puzzle_seen_cache.get(profile_id, db)
+        if themes:
+            puzzle_id = puzzle_index.pick_themed(themes, rating, seen.__contains__)
+        else:
+            puzzle_id = puzzle_index.pick(rating, seen.__contains__)
+        if puzzle_id:
+            return puzzle_id
+
+    puzzle = await get_puzzle_by_rating(rating, profile_id, db, themes)
+    return puzzle.id if puzzle else None
+
+async def get_theme_counts(db: AsyncSession) -> list[dict]:
+    if puzzle_index.loaded:
+        counts = [(theme, len(positions)) for theme, positions in puzzle_index.themes.items()]
+    else:
+        theme = func.jsonb_array_elements_text(Puzzle.themes).label("theme")
+        result = await db.execute(
+            select(theme, func.count())
+            .where(Puzzle.retired.is_(False))
+            .group_by(theme)
+        )
+        counts = result.all()
+
+    return [
+        {"theme": theme, "count": count}
+        for theme, count in sorted(counts, key=lambda item: item[1], reverse=True)
+    ]
+
+async def take_next_puzzle(
+    rating: float,
+    profile_id: UUID,
+    db: AsyncSession,
+    themes: Optional[List[str]] = None
+) -> Optional[dict]:
+    """
+    Siguiente puzzle con su payload completo (PuzzleOut). Sale de la cola precalculada del jugador
+    si hay uno cerca de `rating`; si no, se elige y se lee en el momento. En ambos casos se agenda el relleno.
+    Con `themes` (entrenamiento por tema) no se usa la cola.
+    """
+    puzzle = None if themes else puzzle_queue_cache.pop(profile_id, rating)
+
+    if puzzle is None:
+        puzzle_id = await select_next_puzzle_id(rating, profile_id, db, themes)
+        if puzzle_id:
+            puzzle = PuzzleOut.model_validate(await get_puzzle_by_id(puzzle_id, db)).model_dump()
+
+    if not themes:
+        puzzle_queue_cache.schedule_refill(profile_id, rating)
+
+    if puzzle:
+        # Servido = visto, así no vuelve a salir mientras está activo
+        puzzle_seen_cache.mark(profile_id, puzzle["id"])
+    return puzzle
+
+async def get_puzzle_rating(puzzle_id: str, db: AsyncSession) -> float:
+    result = await db.execute(select(Puzzle.rating).where(Puzzle.id == puzzle_id))
+    puzzle_rating = result.scalar_one_or_none()
+    if puzzle_rating is None:
+        raise HTTPException(status_code=404, detail="Puzzle not found")
+    return puzzle_rating
 
 def get_k_factor(rating: float) -> int:
     if rating < 2000:
@@ -50,12 +139,39 @@ def get_k_factor(rating: float) -> int:
     else:
         return 10
 
-async def solve_puzzle_and_get_next(profile: Profile, puzzle_id: str, status: PuzzleSolveStatus, db: AsyncSession):
-    puzzle = await get_puzzle_by_id(puzzle_id, db)
-    await sum_times_played(puzzle_id, db)
+async def validate_puzzle_moves(puzzle_id: str, moves: List[str], db: AsyncSession) -> dict:
+    """
+    Valida las jugadas del jugador contra la solución (acepta mates alternativos).
+    Si la línea sigue siendo correcta devuelve la respuesta del rival.
+    """
+    solution = await puzzle_solution_cache.get(puzzle_id, db)
+    return solution.check(moves)._asdict()
+
+async def solve_puzzle_and_get_next(
+    profile: Profile,
+    puzzle_id: str,
+    status: PuzzleSolveStatus,
+    db: AsyncSession,
+    themes: Optional[List[str]] = None,
+    moves: Optional[List[str]] = None
+):
+    """
+    Todo el solve en una transacción y un solo commit: una lectura del rating del puzzle,
+    el rating con upsert atómico, y el insert del solve + el nuevo puzzle activo en el flush del commit.
+    `profile` ya viene cargado en esta sesión con sus ratings, no se vuelve a leer.
+    times_played se suma en memoria y se escribe en bloque (puzzle_play_counter).
+    SOLVED/FAILED exigen las jugadas (`moves`): el resultado lo decide el servidor validando la línea,
+    el `status` del cliente solo distingue un SKIPPED.
+    """
+    if status != PuzzleSolveStatus.SKIPPED:
+        if moves is None:
+            raise HTTPException(status_code=422, detail="moves is required to submit a SOLVED or FAILED puzzle")
+        solution = await puzzle_solution_cache.get(puzzle_id, db)
+        status = PuzzleSolveStatus.SOLVED if solution.check(moves).solved else PuzzleSolveStatus.FAILED
+
+    puzzle_rating = await get_puzzle_rating(puzzle_id, db)
 
-    user_rating = profile.ratings.get("puzzle")
-    puzzle_rating = puzzle.rating
+    user_rating = profile.ratings.get("puzzle", 500)
 
     apply_rating = (
         profile.active_puzzle_id == puzzle_id and
@@ -65,10 +181,21 @@ async def solve_puzzle_and_get_next(profile: Profile, puzzle_id: str, status: Pu
     k = get_k_factor(user_rating)
     delta = update_puzzle_rating(user_rating, puzzle_rating, success=(status == PuzzleSolveStatus.SOLVED), k=k) if apply_rating else 0
 
-    new_rating = user_rating + delta if apply_rating else user_rating
+    new_rating = user_rating
 
     if apply_rating:
-        profile.ratings["puzzle"] = new_rating
+        rating_row = await apply_rating_delta(profile.id, "puzzle", delta, db)
+        new_rating = rating_row.rating
+
+    if delta != 0:
+        solved = status == PuzzleSolveStatus.SOLVED
+        await record_solve_stats(
+            profile.id,
+            solved=int(solved),
+            failed=int(not solved),
+            highest_solved_rating=puzzle_rating if solved else None,
+            db=db
+        )
 
     # Registrar el solve
     solve = PuzzleSolve(
@@ -81,76 +208,110 @@ async def solve_puzzle_and_get_next(profile: Profile, puzzle_id: str, status: Pu
         rating_delta=delta,
     )
     db.add(solve)
+    puzzle_seen_cache.mark(profile.id, puzzle_id)
+    puzzle_queue_cache.discard(profile.id, puzzle_id)
 
-    # Asignar nuevo puzzle si era el activo
+    # Asignar nuevo puzzle si era el activo (se escribe en el mismo commit)
+    next_puzzle = None
     if apply_rating or status == PuzzleSolveStatus.SKIPPED:
-        next_puzzle = await get_puzzle_by_rating(new_rating, profile.id, db)
-        if next_puzzle:
-            await set_active_puzzle(profile.id, next_puzzle.id, db)
-            next_puzzle_id = next_puzzle.id
-        else:
-            next_puzzle_id = None
+        next_puzzle = await take_next_puzzle(new_rating, profile.id, db, themes)
+        next_puzzle_id = next_puzzle["id"] if next_puzzle else None
+        if next_puzzle_id:
+            profile.active_puzzle_id = next_puzzle_id
     else:
         next_puzzle_id = profile.active_puzzle_id
 
+    await flush_rating_histogram(db)
     await db.commit()
-    await db.refresh(profile)
+    puzzle_play_counter.add(puzzle_id)
 
     return {
         "status": status.value,
         "rating_delta": delta,
         "new_rating": new_rating,
         "next_puzzle_id": next_puzzle_id,
+        "next_puzzle": next_puzzle,
         "rating_updated": apply_rating,
     }
 
-async def refresh_active_puzzle(profile: Profile, db: AsyncSession) -> str:
+async def refresh_active_puzzle(profile: Profile, db: AsyncSession, themes: Optional[List[str]] = None) -> dict:
+    if themes and puzzle_index.loaded:
+        unknown = [theme for theme in themes if theme not in puzzle_index.themes]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Theme not found: {', '.join(unknown)}")
+
     rating = profile.ratings.get("puzzle", 500)
-    puzzle = await get_puzzle_by_rating(rating, profile.id, db)
+    puzzle = await take_next_puzzle(rating, profile.id, db, themes)
 
     if not puzzle:
         raise HTTPException(status_code=404, detail="No puzzle found")
 
-    await set_active_puzzle(profile.id, puzzle.id, db)
+    profile.active_puzzle_id = puzzle["id"]
     await db.commit()
 
-    return puzzle.id
+    return puzzle
 
 async def get_puzzles_by_profile_id(
     profile_id: UUID,
     only_rated: bool,
     page: int,
     page_size: int,
-    db: AsyncSession
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    include_total: bool = True
 ):
+    """
+    Historial de solves, del más reciente al más antiguo. Con `cursor` pagina por keyset
+    ((solved_at, id) < cursor) usando idx_puzzle_solves_profile_solved_at (o el parcial de rateados),
+    así una página profunda cuesta lo mismo que la primera. Sin cursor sigue funcionando por `page` (OFFSET).
+    """
     base_query = select(PuzzleSolve).where(PuzzleSolve.profile_id == profile_id)
 
     if only_rated:
         base_query = base_query.where(PuzzleSolve.rating_delta != 0)
 
-    # Contar total con subquery
-    count_result = await db.execute(
-        select(func.count()).select_from(base_query.subquery())
-    )
-    total = count_result.scalar()
-
-    total_pages = ceil(total / page_size)
-    offset = (page - 1) * page_size
+    total = None
+    if include_total:
+        stats = await db.get(PuzzleSolveStats, profile_id) if only_rated else None
+        if stats is not None:
+            # Los solves rateados son exactamente los que cuenta puzzle_solve_stats
+            total = stats.total
+        else:
+            count_result = await db.execute(
+                select(func.count()).select_from(base_query.subquery())
+            )
+            total = count_result.scalar()
 
-    # Cargar puzzles en el mismo query
     paginated_query = (
         base_query.options(joinedload(PuzzleSolve.puzzle))
-        .order_by(PuzzleSolve.solved_at.desc())
-        .offset(offset)
-        .limit(page_size)
+        .order_by(PuzzleSolve.solved_at.desc(), PuzzleSolve.id.desc())
+        .limit(page_size + 1)
     )
 
+    if cursor:
+        try:
+            solved_at, solve_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        paginated_query = paginated_query.where(
+            tuple_(PuzzleSolve.solved_at, PuzzleSolve.id) < tuple_(solved_at, solve_id)
+        )
+    else:
+        paginated_query = paginated_query.offset((page - 1) * page_size)
+
     result = await db.execute(paginated_query)
     solves = result.scalars().all()
 
+    next_cursor = None
+    if len(solves) > page_size:
+        solves = solves[:page_size]
+        next_cursor = encode_cursor(solves[-1].solved_at, solves[-1].id)
+
     return {
         "data": solves,
-        "page": page,
+        "page": None if cursor else page,
         "page_size": page_size,
-        "total_pages": total_pages
-    }
\ No newline at end of file
+        "total_pages": ceil(total / page_size) if total is not None else None,
+        "total": total,
+        "next_cursor": next_cursor
+    }
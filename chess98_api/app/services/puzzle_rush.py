@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from app.models.profile import Profile
+from app.models.puzzle import Puzzle
+from app.models.puzzle_solve import PuzzleSolve, PuzzleSolveStatus
+from app.schemas.puzzle_rush import PuzzleRushAttempt
+from app.cache.puzzle_rush import puzzle_rush_pool
+from app.cache.puzzle_seen import puzzle_seen_cache
+from app.cache.puzzle_counters import puzzle_play_counter
+
+# Un rush dura unos minutos: los solved_at del cliente se aceptan solo dentro de esta ventana antes del envío
+RUSH_MAX_DURATION = timedelta(minutes=10)
+
+def clamp_solved_at(solved_at: Optional[datetime], now: datetime) -> datetime:
+    """
+    El momento del cliente recortado a [now - RUSH_MAX_DURATION, now] (hora del servidor): no se pueden
+    anticipar ni atrasar solves, que alimentan los cursores del historial y el watermark de recalibración.
+    """
+    if solved_at is None:
+        return now
+    if solved_at.tzinfo is None:
+        solved_at = solved_at.replace(tzinfo=timezone.utc)
+    return min(max(solved_at, now - RUSH_MAX_DURATION), now)
+
+async def get_rush_batch(db: AsyncSession) -> dict:
+    batch = await puzzle_rush_pool.take(db)
+    if not batch:
+        raise HTTPException(status_code=503, detail="Puzzle rush is not available yet")
+    return batch
+
+async def record_rush_results(profile: Profile, attempts: list[PuzzleRushAttempt], db: AsyncSession) -> dict:
+    """
+    Registra todos los intentos de un rush con un solo INSERT multi-fila.
+    El rush no es rateado: rating_delta = 0, así no entra en el historial rateado ni en las estadísticas.
+    """
+    puzzle_ids = {attempt.puzzle_id for attempt in attempts}
+    result = await db.execute(select(Puzzle.id).where(Puzzle.id.in_(puzzle_ids)))
+    unknown = puzzle_ids - set(result.scalars())
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Puzzle not found: {', '.join(sorted(unknown))}")
+
+    rating = profile.ratings.get("puzzle", 500)
+    now = datetime.now(timezone.utc)
+
+    await db.execute(
+        insert(PuzzleSolve),
+        [
+            {
+                "profile_id": profile.id,
+                "puzzle_id": attempt.puzzle_id,
+                "solved_at": clamp_solved_at(attempt.solved_at, now),
+                "status": attempt.status,
+                "rating_before": rating,
+                "rating_after": rating,
+                "rating_delta": 0,
+            }
+            for attempt in attempts
+        ]
+    )
+    await db.commit()
+
+    for attempt in attempts:
+        puzzle_play_counter.add(attempt.puzzle_id)
+        puzzle_seen_cache.mark(profile.id, attempt.puzzle_id)
+
+    solved = sum(attempt.status == PuzzleSolveStatus.SOLVED for attempt in attempts)
+    return {
+        "recorded": len(attempts),
+        "solved": solved,
+        "failed": len(attempts) - solved,
+    }
@@ -1,64 +1,98 @@
-from sqlalchemy import func, select, desc
-
+from typing import Optional
 from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.models.puzzle_solve import PuzzleSolve, PuzzleSolveStatus  # Importar el Enum
-from app.models.profile import Profile
+from app.models.puzzle_solve_stats import PuzzleSolveStats
 from app.models.puzzle import Puzzle
 
-async def get_solve_stats_by_profile_id(profile_id: UUID, db: AsyncSession):
-    # Total solves (rated only)
-    total_q = await db.execute(
-        select(func.count()).where(
-            PuzzleSolve.profile_id == profile_id,
-            PuzzleSolve.rating_delta != 0,
-            PuzzleSolve.status.in_([PuzzleSolveStatus.SOLVED, PuzzleSolveStatus.FAILED])
-        )
+async def record_solve_stats(
+    profile_id: UUID,
+    solved: int,
+    failed: int,
+    highest_solved_rating: Optional[float],
+    db: AsyncSession
+):
+    """
+    Suma solves rateados a puzzle_solve_stats con un upsert atómico. No hace commit.
+    """
+    stmt = pg_insert(PuzzleSolveStats).values(
+        profile_id=profile_id,
+        total=solved + failed,
+        solved=solved,
+        highest_solved_rating=highest_solved_rating
     )
-    total = total_q.scalar() or 0
-
-    # Solved (status == SOLVED)
-    solved_q = await db.execute(
-        select(func.count()).where(
-            PuzzleSolve.profile_id == profile_id,
-            PuzzleSolve.rating_delta != 0,
-            PuzzleSolve.status == PuzzleSolveStatus.SOLVED
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[PuzzleSolveStats.profile_id],
+            set_={
+                "total": PuzzleSolveStats.total + stmt.excluded.total,
+                "solved": PuzzleSolveStats.solved + stmt.excluded.solved,
+                # greatest() ignora los NULL
+                "highest_solved_rating": func.greatest(
+                    PuzzleSolveStats.highest_solved_rating,
+                    stmt.excluded.highest_solved_rating
+                ),
+            }
         )
     )
-    solved = solved_q.scalar() or 0
 
-    # Failed (status == FAILED)
-    failed = total - solved
+async def rebuild_solve_stats(profile_id: UUID, db: AsyncSession) -> PuzzleSolveStats:
+    """
+    Recalcula las estadísticas desde puzzle_solves en una sola pasada (agregados con FILTER)
+    y crea la fila si no existía.
+    """
+    is_solved = PuzzleSolve.status == PuzzleSolveStatus.SOLVED
 
-    # Solve %
-    solve_pct = round((solved / total) * 100, 2) if total > 0 else 0.0
-
-    # Highest solved rating
-    highest_q = await db.execute(
-        select(Puzzle.rating)
-        .join(PuzzleSolve, Puzzle.id == PuzzleSolve.puzzle_id)
+    result = await db.execute(
+        select(
+            func.count().filter(PuzzleSolve.status.in_([PuzzleSolveStatus.SOLVED, PuzzleSolveStatus.FAILED])),
+            func.count().filter(is_solved),
+            func.max(Puzzle.rating).filter(is_solved)
+        )
+        .select_from(PuzzleSolve)
+        .join(Puzzle, Puzzle.id == PuzzleSolve.puzzle_id)
         .where(
             PuzzleSolve.profile_id == profile_id,
-            PuzzleSolve.rating_delta != 0,
-            PuzzleSolve.status == PuzzleSolveStatus.SOLVED
+            PuzzleSolve.rating_delta != 0
         )
-        .order_by(desc(Puzzle.rating))
-        .limit(1)
     )
-    highest = highest_q.scalar()
+    total, solved, highest = result.one()
 
-    # Current user rating (from profile)
-    profile_q = await db.execute(
-        select(Profile).where(Profile.id == profile_id)
+    stats = PuzzleSolveStats(
+        profile_id=profile_id,
+        total=total,
+        solved=solved,
+        highest_solved_rating=highest
+    )
+    await db.execute(
+        pg_insert(PuzzleSolveStats)
+        .values(profile_id=profile_id, total=total, solved=solved, highest_solved_rating=highest)
+        .on_conflict_do_nothing(index_elements=[PuzzleSolveStats.profile_id])
     )
-    profile = profile_q.scalar_one_or_none()
-    current_rating = profile.ratings.get("puzzle") if profile else None
+    await db.commit()
+
+    return stats
+
+async def get_solve_stats_by_profile_id(profile_id: UUID, current_rating: Optional[float], db: AsyncSession):
+    """
+    Lee la fila de puzzle_solve_stats (una consulta por PK). Si el perfil todavía no la tiene se reconstruye.
+    """
+    stats = await db.get(PuzzleSolveStats, profile_id)
+    if stats is None:
+        stats = await rebuild_solve_stats(profile_id, db)
+
+    total = stats.total
+    solved = stats.solved
 
     return {
         "total": total,
         "solved": solved,
-        "failed": failed,
-        "solve_percentage": solve_pct,
-        "highest_solved_rating": highest,
+        "failed": total - solved,
+        "solve_percentage": round((solved / total) * 100, 2) if total > 0 else 0.0,
+        "highest_solved_rating": stats.highest_solved_rating,
         "current_user_rating": current_rating
     }
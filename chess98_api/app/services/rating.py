@@ -0,0 +1,100 @@
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants.rating import DEFAULT_RATINGS, DEFAULT_RATING_DEVIATION, DEFAULT_VOLATILITY
+from app.models.profile import Profile
+from app.models.profile_rating import ProfileRating
+from app.services.rating_histogram import track_rating_change
+from app.services.rating_history import record_rating_point
+
+async def lock_ratings_for_users(user_ids: list[UUID], category: str, db: AsyncSession) -> dict[UUID, ProfileRating]:
+    """
+    Bloquea (FOR UPDATE) las filas de rating de los usuarios en una categoría, siempre en orden de user_id
+    para que dos transacciones concurrentes no se bloqueen entre sí. Devuelve {user_id: ProfileRating}.
+    """
+    result = await db.execute(
+        select(ProfileRating, Profile.user_id)
+        .join(Profile, Profile.id == ProfileRating.profile_id)
+        .where(
+            Profile.user_id.in_(user_ids),
+            ProfileRating.category == category
+        )
+        .order_by(Profile.user_id)
+        .with_for_update(of=ProfileRating)
+        .execution_options(populate_existing=True)
+    )
+    return {user_id: rating_row for rating_row, user_id in result.all()}
+
+def default_rating_rows() -> list[ProfileRating]:
+    """
+    Filas iniciales de rating para un perfil nuevo (una por categoría).
+    """
+    return [
+        ProfileRating(
+            category=category,
+            rating=rating,
+            rating_deviation=DEFAULT_RATING_DEVIATION,
+            volatility=DEFAULT_VOLATILITY,
+            games=0
+        )
+        for category, rating in DEFAULT_RATINGS.items()
+    ]
+
+async def apply_rating_delta(
+    profile_id: UUID,
+    category: str,
+    delta: int,
+    db: AsyncSession,
+    rating_deviation: Optional[float] = None,
+    volatility: Optional[float] = None,
+    game_id: Optional[UUID] = None
+) -> ProfileRating:
+    """
+    Aplica `rating = rating + delta` de forma atómica en la base de datos (sin leer antes)
+    y devuelve la fila actualizada. Si la categoría no existe aún para el perfil, la crea.
+    También registra el punto en rating_history.
+    No hace commit: el caller controla la transacción (y debe llamar a flush_rating_histogram).
+    """
+    values = {
+        "profile_id": profile_id,
+        "category": category,
+        "rating": DEFAULT_RATINGS.get(category, 1200) + delta,
+        "rating_deviation": rating_deviation if rating_deviation is not None else DEFAULT_RATING_DEVIATION,
+        "volatility": volatility if volatility is not None else DEFAULT_VOLATILITY,
+        "games": 1,
+    }
+    on_conflict = {
+        "rating": ProfileRating.rating + delta,
+        "games": ProfileRating.games + 1,
+    }
+    if rating_deviation is not None:
+        on_conflict["rating_deviation"] = rating_deviation
+    if volatility is not None:
+        on_conflict["volatility"] = volatility
+
+    stmt = (
+        pg_insert(ProfileRating)
+        .values(**values)
+        .on_conflict_do_update(
+            index_elements=[ProfileRating.profile_id, ProfileRating.category],
+            set_=on_conflict
+        )
+        .returning(ProfileRating)
+    )
+
+    # populate_existing para que la instancia en sesión (profile.rating_rows) quede al día
+    result = await db.execute(
+        select(ProfileRating)
+        .from_statement(stmt)
+        .execution_options(populate_existing=True)
+    )
+    rating_row = result.scalar_one()
+
+    track_rating_change(category, rating_row.rating - delta, rating_row.rating, db, first_game=rating_row.games == 1)
+    await record_rating_point(profile_id, category, rating_row.rating, delta, db, game_id=game_id)
+
+    return rating_row
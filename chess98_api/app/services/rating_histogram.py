@@ -0,0 +1,141 @@
+from collections import defaultdict
+
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from app.constants.rating import RATING_CATEGORIES
+from app.models.profile_rating import ProfileRating
+from app.models.rating_histogram import RatingHistogramBucket
+
+BUCKET_SIZE = 10
+
+# Clave en db.info donde se acumulan los cambios pendientes de la transacción
+_PENDING_KEY = "rating_histogram_pending"
+
+def bucket_of(rating: float) -> int:
+    return int(rating // BUCKET_SIZE) * BUCKET_SIZE
+
+def _pending(db: AsyncSession) -> defaultdict:
+    return db.info.setdefault(_PENDING_KEY, defaultdict(int))
+
+def track_rating_change(category: str, old_rating: float, new_rating: float, db: AsyncSession, first_game: bool = False):
+    """
+    Mueve un jugador de bucket si el cambio de rating lo hace cruzar de uno a otro.
+    Solo cuentan los jugadores con partidas en la categoría (las filas por defecto de un perfil nuevo
+    amontonarían a todos en el rating inicial): con `first_game` el jugador recién entra al histograma.
+    Se aplica recién con flush_rating_histogram.
+    """
+    if category not in RATING_CATEGORIES:
+        return
+
+    pending = _pending(db)
+    if first_game:
+        pending[(category, bucket_of(new_rating))] += 1
+        return
+
+    old_bucket, new_bucket = bucket_of(old_rating), bucket_of(new_rating)
+    if old_bucket == new_bucket:
+        return
+
+    pending[(category, old_bucket)] -= 1
+    pending[(category, new_bucket)] += 1
+
+async def flush_rating_histogram(db: AsyncSession):
+    """
+    Aplica los cambios acumulados en un solo upsert, llamar justo antes del commit.
+    Las filas van ordenadas por (category, bucket) para que dos transacciones
+    concurrentes siempre tomen los locks en el mismo orden.
+    """
+    pending = db.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    rows = [
+        {"category": category, "bucket": bucket, "count": delta}
+        for (category, bucket), delta in sorted(pending.items())
+        if delta != 0
+    ]
+    if not rows:
+        return
+
+    stmt = pg_insert(RatingHistogramBucket).values(rows)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[RatingHistogramBucket.category, RatingHistogramBucket.bucket],
+            set_={"count": RatingHistogramBucket.count + stmt.excluded.count}
+        )
+    )
+
+def _validate_category(category: str):
+    if category not in RATING_CATEGORIES:
+        raise HTTPException(status_code=404, detail="Rating category not found")
+
+async def get_rating_distribution(category: str, db: AsyncSession) -> dict:
+    _validate_category(category)
+
+    result = await db.execute(
+        select(RatingHistogramBucket.bucket, RatingHistogramBucket.count)
+        .where(
+            RatingHistogramBucket.category == category,
+            RatingHistogramBucket.count > 0
+        )
+        .order_by(RatingHistogramBucket.bucket)
+    )
+    buckets = [{"rating": bucket, "count": count} for bucket, count in result.all()]
+
+    return {
+        "category": category,
+        "bucket_size": BUCKET_SIZE,
+        "total": sum(b["count"] for b in buckets),
+        "buckets": buckets,
+    }
+
+async def get_rating_percentile(category: str, rating: float, db: AsyncSession) -> dict:
+    """
+    Porcentaje de jugadores con rating menor a `rating`.
+    Dentro del bucket del rating se interpola linealmente.
+    """
+    distribution = await get_rating_distribution(category, db)
+    total = distribution["total"]
+    target = bucket_of(rating)
+
+    below = 0.0
+    for bucket in distribution["buckets"]:
+        if bucket["rating"] < target:
+            below += bucket["count"]
+        elif bucket["rating"] == target:
+            below += bucket["count"] * (rating - target) / BUCKET_SIZE
+        else:
+            break
+
+    percentile = round(below / total * 100, 2) if total > 0 else 0.0
+
+    return {
+        "category": category,
+        "rating": rating,
+        "percentile": percentile,
+        "total": total,
+    }
+
+async def rebuild_rating_histograms(db: AsyncSession) -> int:
+    """
+    Recalcula todo el histograma desde profile_ratings (solo categorías con partidas jugadas).
+    Devuelve la cantidad de buckets.
+    """
+    bucket_expr = ((ProfileRating.rating // BUCKET_SIZE) * BUCKET_SIZE).label("bucket")
+
+    await db.execute(delete(RatingHistogramBucket))
+    await db.execute(
+        insert(RatingHistogramBucket).from_select(
+            ["category", "bucket", "count"],
+            select(ProfileRating.category, bucket_expr, func.count())
+            .where(ProfileRating.category.in_(RATING_CATEGORIES), ProfileRating.games > 0)
+            .group_by(ProfileRating.category, bucket_expr)
+        )
+    )
+    await db.commit()
+
+    result = await db.execute(select(func.count()).select_from(RatingHistogramBucket))
+    return result.scalar_one()
@@ -0,0 +1,162 @@
+from datetime import datetime, timezone, date
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, insert, delete, func, text, type_coerce, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert, aggregate_order_by, ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+
+from app.constants.rating import RATING_CATEGORIES
+from app.models.rating_history import RatingHistory, RatingHistoryDaily
+
+INTERVALS = ("day", "week")
+
+async def record_rating_point(
+    profile_id: UUID,
+    category: str,
+    new_rating: int,
+    delta: int,
+    db: AsyncSession,
+    ts: Optional[datetime] = None,
+    game_id: Optional[UUID] = None
+):
+    """
+    Agrega el punto a rating_history y actualiza la vela del día en rating_history_daily.
+    No hace commit.
+    """
+    ts = ts or datetime.now(timezone.utc)
+    old_rating = new_rating - delta
+
+    await db.execute(
+        insert(RatingHistory).values(
+            profile_id=profile_id,
+            category=category,
+            rating=new_rating,
+            rating_delta=delta,
+            ts=ts,
+            game_id=game_id
+        )
+    )
+
+    stmt = pg_insert(RatingHistoryDaily).values(
+        profile_id=profile_id,
+        category=category,
+        day=ts.astimezone(timezone.utc).date(),
+        open=old_rating,
+        high=max(old_rating, new_rating),
+        low=min(old_rating, new_rating),
+        close=new_rating,
+        points=1
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[RatingHistoryDaily.profile_id, RatingHistoryDaily.category, RatingHistoryDaily.day],
+            set_={
+                "high": func.greatest(RatingHistoryDaily.high, stmt.excluded.close),
+                "low": func.least(RatingHistoryDaily.low, stmt.excluded.close),
+                "close": stmt.excluded.close,
+                "points": RatingHistoryDaily.points + 1,
+            }
+        )
+    )
+
+async def get_rating_history(
+    profile_id: UUID,
+    category: str,
+    interval: str,
+    since: Optional[date],
+    db: AsyncSession
+) -> dict:
+    """
+    Serie OHLC por día o por semana. Lee solo rating_history_daily (una fila por día con actividad),
+    así que el costo no depende de la cantidad de partidas del jugador.
+    """
+    if category not in RATING_CATEGORIES:
+        raise HTTPException(status_code=404, detail="Rating category not found")
+    if interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Invalid interval, use one of {INTERVALS}")
+
+    filters = [
+        RatingHistoryDaily.profile_id == profile_id,
+        RatingHistoryDaily.category == category,
+    ]
+    if since:
+        filters.append(RatingHistoryDaily.day >= since)
+
+    if interval == "day":
+        result = await db.execute(
+            select(
+                RatingHistoryDaily.day.label("period"),
+                RatingHistoryDaily.open,
+                RatingHistoryDaily.high,
+                RatingHistoryDaily.low,
+                RatingHistoryDaily.close,
+                RatingHistoryDaily.points
+            )
+            .where(*filters)
+            .order_by(RatingHistoryDaily.day)
+        )
+    else:
+        week = func.date_trunc("week", RatingHistoryDaily.day).label("period")
+        first_open = type_coerce(
+            func.array_agg(aggregate_order_by(RatingHistoryDaily.open, RatingHistoryDaily.day)),
+            ARRAY(Integer)
+        )[1]
+        last_close = type_coerce(
+            func.array_agg(aggregate_order_by(RatingHistoryDaily.close, RatingHistoryDaily.day.desc())),
+            ARRAY(Integer)
+        )[1]
+        result = await db.execute(
+            select(
+                week,
+                first_open.label("open"),
+                func.max(RatingHistoryDaily.high).label("high"),
+                func.min(RatingHistoryDaily.low).label("low"),
+                last_close.label("close"),
+                func.sum(RatingHistoryDaily.points).label("points")
+            )
+            .where(*filters)
+            .group_by(week)
+            .order_by(week)
+        )
+
+    return {
+        "category": category,
+        "interval": interval,
+        "points": [
+            {
+                "period": row.period.date() if isinstance(row.period, datetime) else row.period,
+                "open": row.open,
+                "high": row.high,
+                "low": row.low,
+                "close": row.close,
+                "count": row.points,
+            }
+            for row in result.all()
+        ],
+    }
+
+async def rebuild_daily_rating_history(db: AsyncSession):
+    """
+    Recalcula rating_history_daily completo desde rating_history. No hace commit.
+    Toma un lock SHARE ROW EXCLUSIVE sobre las dos tablas: espera a que commiteen los puntos en curso y deja
+    esperando a record_rating_point hasta el commit del caller, así ninguna vela en vivo se pierde ni se pisa.
+    Commitear enseguida: mientras tanto las partidas y puzzles que terminan quedan bloqueados.
+    """
+    await db.execute(text("LOCK TABLE rating_history, rating_history_daily IN SHARE ROW EXCLUSIVE MODE"))
+    await db.execute(delete(RatingHistoryDaily))
+    await db.execute(text("""
+        INSERT INTO rating_history_daily (profile_id, category, day, open, high, low, close, points)
+        SELECT
+            profile_id,
+            category,
+            (ts AT TIME ZONE 'UTC')::date,
+            (array_agg(rating - rating_delta ORDER BY ts, id))[1],
+            max(greatest(rating, rating - rating_delta)),
+            min(least(rating, rating - rating_delta)),
+            (array_agg(rating ORDER BY ts DESC, id DESC))[1],
+            count(*)
+        FROM rating_history
+        GROUP BY profile_id, category, (ts AT TIME ZONE 'UTC')::date
+    """))
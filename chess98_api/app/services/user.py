@@ -1,8 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func, Integer
+from sqlalchemy import select, desc
 from sqlalchemy.orm import joinedload
 from app.models.user import User
 from app.models.profile import Profile
+from app.models.profile_rating import ProfileRating
 from typing import Dict, List
 from uuid import UUID
 
@@ -26,12 +27,14 @@ async def get_top_users_by_rating(db: AsyncSession) -> Dict[str, List[dict]]:
         stmt = (
             select(User)
             .join(Profile)
+            .join(ProfileRating, ProfileRating.profile_id == Profile.id)
             .options(joinedload(User.profile))
             .where(
                 User.status == "active",
-                Profile.total_games > 0
+                Profile.total_games > 0,
+                ProfileRating.category == control
             )
-            .order_by(desc(func.cast(Profile.ratings.op('->>')(control), Integer)))
+            .order_by(desc(ProfileRating.rating))
             .limit(5)
         )
 
@@ -0,0 +1,96 @@
+"""
+Precisión, ACPL y errores por jugador a partir de las evaluaciones del motor, con las fórmulas de Lichess
+(lila: WinPercent, AccuracyPercent y las marcas de Advice).
+
+- win%: 50 + 50 * (2 / (1 + e^(-0.00368208 * cp)) - 1), con cp recortado a ±1000.
+- Precisión de una jugada: 103.1668 * e^(-0.04354 * (win% antes - win% después)) - 3.1669 (+1), entre 0 y 100.
+- Precisión de la partida: promedio entre la media ponderada por volatilidad (desvío estándar del win%
+  en una ventana de jugadas) y la media armónica de las precisiones por jugada.
+- Imprecisión / error / error grave: caída de las chances de ganar (entre -1 y 1) de al menos 0.1 / 0.2 / 0.3.
+
+Todo vectorizado con NumPy sobre la partida entera.
+"""
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+CP_CEILING = 1000
+WIN_SLOPE = 0.00368208
+
+INACCURACY = 0.1
+MISTAKE = 0.2
+BLUNDER = 0.3
+
+class PlayerAccuracy(NamedTuple):
+    accuracy: float
+    acpl: int
+    inaccuracies: int
+    mistakes: int
+    blunders: int
+
+def winning_chances(cp: np.ndarray) -> np.ndarray:
+    return 2 / (1 + np.exp(-WIN_SLOPE * np.clip(cp, -CP_CEILING, CP_CEILING))) - 1
+
+def move_accuracies(win_before: np.ndarray, win_after: np.ndarray) -> np.ndarray:
+    """
+    Precisión de cada jugada con los win% (0-100) desde el lado del que movió.
+    """
+    raw = 103.1668100711649 * np.exp(-0.04354415386753951 * (win_before - win_after)) - 3.166924740191411 + 1
+    return np.where(win_after >= win_before, 100.0, np.clip(raw, 0, 100))
+
+def volatility_weights(win_percents: np.ndarray, moves: int) -> np.ndarray:
+    """
+    Un peso por jugada: desvío estándar del win% en la ventana que la rodea, entre 0.5 y 12.
+    Las primeras jugadas repiten la primera ventana (como en Lichess).
+    """
+    window = min(max(moves // 10, 2), 8, len(win_percents))
+    stdevs = sliding_window_view(win_percents, window).std(axis=1)
+    stdevs = np.concatenate([np.full(max(window - 2, 0), stdevs[0]), stdevs])[:moves]
+    return np.clip(stdevs, 0.5, 12)
+
+def _summary(accuracies: np.ndarray, weights: np.ndarray, cp_losses: np.ndarray, drops: np.ndarray) -> Optional[PlayerAccuracy]:
+    if not len(accuracies):
+        return None
+    weighted = np.average(accuracies, weights=weights)
+    harmonic = len(accuracies) / np.sum(1 / np.maximum(accuracies, 1))  # una jugada con 0% no anula la media
+    return PlayerAccuracy(
+        accuracy=round(float((weighted + harmonic) / 2), 1),
+        acpl=int(round(float(cp_losses.mean()))),
+        inaccuracies=int(np.count_nonzero((drops >= INACCURACY) & (drops < MISTAKE))),
+        mistakes=int(np.count_nonzero((drops >= MISTAKE) & (drops < BLUNDER))),
+        blunders=int(np.count_nonzero(drops >= BLUNDER)),
+    )
+
+def game_accuracy(
+    evaluations: Sequence[float],
+    initial_eval: float,
+    white_first: bool = True
+) -> tuple[Optional[PlayerAccuracy], Optional[PlayerAccuracy]]:
+    """
+    (blancas, negras) a partir de la evaluación después de cada jugada, en centipeones desde el lado de blancas.
+    Un jugador sin jugadas queda en None.
+    """
+    moves = len(evaluations)
+    if not moves:
+        return None, None
+
+    cps = np.clip(np.asarray([initial_eval, *evaluations], dtype=np.float64), -CP_CEILING, CP_CEILING)
+    chances = winning_chances(cps)
+    win_percents = 50 + 50 * chances
+
+    # Todo desde el lado del que movió: las jugadas de negras invierten el signo
+    white_moves = (np.arange(moves) % 2 == 0) == white_first
+    sign = np.where(white_moves, 1.0, -1.0)
+
+    before, after = win_percents[:-1], win_percents[1:]
+    accuracies = move_accuracies(np.where(white_moves, before, 100 - before), np.where(white_moves, after, 100 - after))
+    weights = volatility_weights(win_percents, moves)
+    cp_losses = np.maximum(sign * (cps[:-1] - cps[1:]), 0)
+    drops = sign * (chances[:-1] - chances[1:])
+
+    black_moves = ~white_moves
+    return (
+        _summary(accuracies[white_moves], weights[white_moves], cp_losses[white_moves], drops[white_moves]),
+        _summary(accuracies[black_moves], weights[black_moves], cp_losses[black_moves], drops[black_moves]),
+    )
@@ -0,0 +1,116 @@
+"""
+Bloom filter escalable (Almeida et al., "Scalable Bloom Filters", 2007).
+
+Cuando una capa se llena se agrega otra con el doble de capacidad y una tasa de error más estricta,
+así el error total queda acotado sin saber de antemano cuántos elementos habrá.
+Sin falsos negativos: si `x in filtro` es False, x nunca se agregó.
+"""
+import hashlib
+import math
+import struct
+
+INITIAL_CAPACITY = 1024
+ERROR_RATE = 0.01
+GROWTH = 2
+TIGHTENING = 0.5
+
+_HEADER = struct.Struct("<BdIB")  # versión, error_rate, capacidad inicial, número de capas
+_LAYER = struct.Struct("<IIBI")   # capacidad, elementos, hashes, bytes del array de bits
+_VERSION = 1
+
+def _hashes(item: str) -> tuple[int, int]:
+    digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+class _Layer:
+    __slots__ = ("capacity", "count", "hash_count", "bit_count", "bits")
+
+    def __init__(self, capacity: int, error_rate: float, hash_count: int = 0, bits: bytearray = None, count: int = 0):
+        self.capacity = capacity
+        self.count = count
+
+        if bits is None:
+            bit_count = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+            bits = bytearray((bit_count + 7) // 8)
+            hash_count = max(1, round(bit_count / capacity * math.log(2)))
+
+        self.bits = bits
+        self.bit_count = len(bits) * 8
+        self.hash_count = hash_count
+
+    def positions(self, h1: int, h2: int):
+        # Double hashing: k posiciones a partir de dos hashes de 64 bits
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, h1: int, h2: int):
+        for pos in self.positions(h1, h2):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def contains(self, h1: int, h2: int) -> bool:
+        bits = self.bits
+        for pos in self.positions(h1, h2):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+class ScalableBloomFilter:
+    def __init__(self, initial_capacity: int = INITIAL_CAPACITY, error_rate: float = ERROR_RATE):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.layers: list[_Layer] = []
+
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self.layers)
+
+    def __contains__(self, item: str) -> bool:
+        h1, h2 = _hashes(item)
+        return any(layer.contains(h1, h2) for layer in self.layers)
+
+    def _new_layer(self) -> _Layer:
+        i = len(self.layers)
+        return _Layer(
+            self.initial_capacity * GROWTH ** i,
+            self.error_rate * (1 - TIGHTENING) * TIGHTENING ** i
+        )
+
+    def add(self, item: str):
+        h1, h2 = _hashes(item)
+        if any(layer.contains(h1, h2) for layer in self.layers):
+            return
+
+        if not self.layers or self.layers[-1].count >= self.layers[-1].capacity:
+            self.layers.append(self._new_layer())
+        self.layers[-1].add(h1, h2)
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def memory_bytes(self) -> int:
+        return sum(len(layer.bits) for layer in self.layers)
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(_VERSION, self.error_rate, self.initial_capacity, len(self.layers))]
+        for layer in self.layers:
+            parts.append(_LAYER.pack(layer.capacity, layer.count, layer.hash_count, len(layer.bits)))
+            parts.append(bytes(layer.bits))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ScalableBloomFilter":
+        version, error_rate, initial_capacity, layer_count = _HEADER.unpack_from(data)
+        if version != _VERSION:
+            raise ValueError(f"Versión de Bloom filter desconocida: {version}")
+
+        bloom = cls(initial_capacity, error_rate)
+        offset = _HEADER.size
+        for _ in range(layer_count):
+            capacity, count, hash_count, size = _LAYER.unpack_from(data, offset)
+            offset += _LAYER.size
+            bits = bytearray(data[offset:offset + size])
+            offset += size
+            bloom.layers.append(_Layer(capacity, error_rate, hash_count, bits, count))
+
+        return bloom
@@ -0,0 +1,18 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+
+def encode_cursor(ts: datetime, row_id: UUID) -> str:
+    """
+    Cursor opaco para paginación keyset por (timestamp, id): '2025-04-19T23:43:05+00:00|<uuid>' en base64 url-safe.
+    """
+    raw = f"{ts.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, row_id = raw.split("|")
+        return datetime.fromisoformat(ts), UUID(row_id)
+    except Exception:
+        raise ValueError(f"Cursor inválido: '{cursor}'")
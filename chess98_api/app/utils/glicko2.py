@@ -0,0 +1,233 @@
+"""
+Glicko-2 (Glickman, "Example of the Glicko-2 system", 2013).
+
+- rate(): un jugador contra sus resultados del período, paso a paso como en el paper.
+- rate_game(): una partida = un período (lo que usamos al terminar cada partida).
+- rate_period_batch() / rate_history(): versión vectorizada con NumPy para re-ratear
+  un período completo o recalcular todos los ratings desde el historial.
+"""
+import math
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+TAU = 0.5
+SCALE = 173.7178
+BASE_RATING = 1500.0
+EPSILON = 0.000001
+MAX_RD = 350.0
+DEFAULT_VOLATILITY = 0.06
+
+class Glicko2Rating(NamedTuple):
+    rating: float
+    rd: float
+    volatility: float
+
+def _g(phi):
+    return 1 / np.sqrt(1 + 3 * phi ** 2 / math.pi ** 2)
+
+def _new_volatility(phi: float, sigma: float, v: float, delta: float, tau: float) -> float:
+    a = math.log(sigma ** 2)
+
+    def f(x):
+        ex = math.exp(x)
+        return (ex * (delta ** 2 - phi ** 2 - v - ex)) / (2 * (phi ** 2 + v + ex) ** 2) - (x - a) / tau ** 2
+
+    A = a
+    if delta ** 2 > phi ** 2 + v:
+        B = math.log(delta ** 2 - phi ** 2 - v)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        B = a - k * tau
+
+    fA, fB = f(A), f(B)
+    while abs(B - A) > EPSILON:
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        if fC * fB <= 0:
+            A, fA = B, fB
+        else:
+            fA = fA / 2
+        B, fB = C, fC
+
+    return math.exp(A / 2)
+
+def rate(player: Glicko2Rating, results: Iterable[tuple[Glicko2Rating, float]], tau: float = TAU) -> Glicko2Rating:
+    """
+    Nuevo rating de `player` tras un período con `results` = [(oponente, score)], score en {1, 0.5, 0}.
+    """
+    mu = (player.rating - BASE_RATING) / SCALE
+    phi = player.rd / SCALE
+    sigma = player.volatility
+
+    results = list(results)
+    if not results:
+        phi_star = math.sqrt(phi ** 2 + sigma ** 2)
+        return Glicko2Rating(player.rating, min(phi_star * SCALE, MAX_RD), sigma)
+
+    v_inv = 0.0
+    delta_sum = 0.0
+    for opponent, score in results:
+        mu_j = (opponent.rating - BASE_RATING) / SCALE
+        g_j = float(_g(opponent.rd / SCALE))
+        e_j = 1 / (1 + math.exp(-g_j * (mu - mu_j)))
+        v_inv += g_j ** 2 * e_j * (1 - e_j)
+        delta_sum += g_j * (score - e_j)
+
+    v = 1 / v_inv
+    delta = v * delta_sum
+
+    new_sigma = _new_volatility(phi, sigma, v, delta, tau)
+    phi_star = math.sqrt(phi ** 2 + new_sigma ** 2)
+    new_phi = 1 / math.sqrt(1 / phi_star ** 2 + 1 / v)
+    new_mu = mu + new_phi ** 2 * delta_sum
+
+    return Glicko2Rating(
+        new_mu * SCALE + BASE_RATING,
+        min(new_phi * SCALE, MAX_RD),
+        new_sigma
+    )
+
+def rate_game(white: Glicko2Rating, black: Glicko2Rating, white_score: float, tau: float = TAU) -> tuple[Glicko2Rating, Glicko2Rating]:
+    """
+    Aplica una partida como período de rating para ambos jugadores.
+    """
+    return (
+        rate(white, [(black, white_score)], tau),
+        rate(black, [(white, 1 - white_score)], tau),
+    )
+
+def _new_volatility_batch(phi, sigma, v, delta, tau):
+    a = np.log(sigma ** 2)
+    phi2 = phi ** 2
+    delta2 = delta ** 2
+
+    def f(x, idx):
+        ex = np.exp(x)
+        return (ex * (delta2[idx] - phi2[idx] - v[idx] - ex)) / (2 * (phi2[idx] + v[idx] + ex) ** 2) - (x - a[idx]) / tau ** 2
+
+    every = np.arange(len(a))
+    A = a.copy()
+    B = np.empty_like(a)
+
+    big = delta2 > phi2 + v
+    B[big] = np.log(delta2[big] - phi2[big] - v[big])
+
+    small = np.flatnonzero(~big)
+    k = np.ones(len(small))
+    searching = np.ones(len(small), dtype=bool)
+    while searching.any():
+        pos = np.flatnonzero(searching)
+        negative = f(a[small[pos]] - k[pos] * tau, small[pos]) < 0
+        k[pos[negative]] += 1
+        searching[pos[~negative]] = False
+    B[small] = a[small] - k * tau
+
+    fA = f(A, every)
+    fB = f(B, every)
+
+    active = np.flatnonzero(np.abs(B - A) > EPSILON)
+    while len(active):
+        C = A[active] + (A[active] - B[active]) * fA[active] / (fB[active] - fA[active])
+        fC = f(C, active)
+
+        swap = fC * fB[active] <= 0
+        A[active[swap]] = B[active[swap]]
+        fA[active[swap]] = fB[active[swap]]
+        fA[active[~swap]] /= 2
+
+        B[active] = C
+        fB[active] = fC
+
+        active = active[np.abs(B[active] - A[active]) > EPSILON]
+
+    return np.exp(A / 2)
+
+def rate_period_batch(
+    ratings: np.ndarray,
+    rds: np.ndarray,
+    volatilities: np.ndarray,
+    player_idx: np.ndarray,
+    opponent_idx: np.ndarray,
+    scores: np.ndarray,
+    tau: float = TAU
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Re-ratea a todos los jugadores en un período.
+    Cada partida debe venir en ambas direcciones: (jugador, oponente, score) y (oponente, jugador, 1 - score).
+    Todos usan los ratings del inicio del período. Los jugadores sin partidas solo aumentan su RD.
+    """
+    n = len(ratings)
+    mu = (ratings - BASE_RATING) / SCALE
+    phi = rds / SCALE
+
+    g_j = _g(phi[opponent_idx])
+    e_j = 1 / (1 + np.exp(-g_j * (mu[player_idx] - mu[opponent_idx])))
+
+    v_inv = np.bincount(player_idx, weights=g_j ** 2 * e_j * (1 - e_j), minlength=n)
+    delta_sum = np.bincount(player_idx, weights=g_j * (scores - e_j), minlength=n)
+
+    new_mu = mu.copy()
+    new_phi = np.sqrt(phi ** 2 + volatilities ** 2)
+    new_sigma = volatilities.copy()
+
+    played = np.flatnonzero(v_inv > 0)
+    if len(played):
+        v = 1 / v_inv[played]
+        delta = v * delta_sum[played]
+
+        sigma = _new_volatility_batch(phi[played], volatilities[played], v, delta, tau)
+        phi_star = np.sqrt(phi[played] ** 2 + sigma ** 2)
+        phi_played = 1 / np.sqrt(1 / phi_star ** 2 + 1 / v)
+
+        new_mu[played] = mu[played] + phi_played ** 2 * delta_sum[played]
+        new_phi[played] = phi_played
+        new_sigma[played] = sigma
+
+    return (
+        new_mu * SCALE + BASE_RATING,
+        np.minimum(new_phi * SCALE, MAX_RD),
+        new_sigma,
+    )
+
+def rate_history(
+    n_players: int,
+    white_idx: np.ndarray,
+    black_idx: np.ndarray,
+    white_scores: np.ndarray,
+    periods: np.ndarray,
+    initial_rating: float = BASE_RATING,
+    initial_rd: float = MAX_RD,
+    initial_volatility: float = DEFAULT_VOLATILITY,
+    tau: float = TAU
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Recalcula los ratings de todos los jugadores desde cero procesando las partidas período por período.
+    `periods` es el número de período (entero) de cada partida; se procesan en orden ascendente.
+    """
+    ratings = np.full(n_players, initial_rating, dtype=np.float64)
+    rds = np.full(n_players, initial_rd, dtype=np.float64)
+    volatilities = np.full(n_players, initial_volatility, dtype=np.float64)
+
+    # Cada partida en ambas direcciones, agrupadas por período
+    players = np.concatenate([white_idx, black_idx])
+    opponents = np.concatenate([black_idx, white_idx])
+    scores = np.concatenate([white_scores, 1 - white_scores]).astype(np.float64)
+    game_periods = np.concatenate([periods, periods])
+
+    order = np.argsort(game_periods, kind="stable")
+    players, opponents, scores, game_periods = players[order], opponents[order], scores[order], game_periods[order]
+
+    _, starts = np.unique(game_periods, return_index=True)
+    ends = np.append(starts[1:], len(game_periods))
+
+    for start, end in zip(starts, ends):
+        ratings, rds, volatilities = rate_period_batch(
+            ratings, rds, volatilities,
+            players[start:end], opponents[start:end], scores[start:end],
+            tau
+        )
+
+    return ratings, rds, volatilities
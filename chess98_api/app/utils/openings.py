@@ -0,0 +1,76 @@
+"""
+Clasificación de aperturas con el dataset ECO de Lichess (github.com/lichess-org/chess-openings):
+archivos a.tsv ... e.tsv con columnas eco, name, pgn ("1. e4 e5 2. Nf3 Nc6").
+
+Las líneas se guardan en un trie por jugada SAN (sin +, #, !, ?), así clasificar una partida
+es recorrer sus jugadas desde el inicio sin reproducir el tablero: O(jugadas) y se corta
+en cuanto la partida sale del libro. Gana la apertura con nombre más profunda del camino.
+"""
+import csv
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+class Opening(NamedTuple):
+    eco: str
+    name: str
+
+def normalize_san(san: str) -> str:
+    return san.rstrip("+#!?")
+
+def pgn_moves(pgn: str) -> list[str]:
+    """
+    Jugadas SAN de una línea PGN simple, sin números de jugada ("1.", "1...").
+    """
+    return [normalize_san(token) for token in pgn.split() if not token[0].isdigit()]
+
+class _Node:
+    __slots__ = ("children", "opening")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.opening: Optional[Opening] = None
+
+class OpeningTrie:
+    def __init__(self):
+        self.root = _Node()
+        self.size = 0
+        self.depth = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, moves: list[str], opening: Opening):
+        node = self.root
+        for san in moves:
+            node = node.children.setdefault(san, _Node())
+        if node.opening is None:
+            self.size += 1
+        node.opening = opening
+        self.depth = max(self.depth, len(moves))
+
+    def load_tsv(self, path: Path):
+        with open(path, newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file, delimiter="\t"):
+                self.add(pgn_moves(row["pgn"]), Opening(row["eco"], row["name"]))
+
+    def load_dir(self, directory: Path) -> int:
+        """
+        Carga todos los .tsv del directorio. Devuelve cuántos archivos leyó.
+        """
+        files = sorted(Path(directory).glob("*.tsv"))
+        for path in files:
+            self.load_tsv(path)
+        return len(files)
+
+    def classify(self, moves_san: Iterable[str]) -> Optional[Opening]:
+        """
+        Apertura más específica que coincide con el comienzo de la partida (None si la primera jugada no está en el libro).
+        """
+        node, found = self.root, None
+        for san in moves_san:
+            node = node.children.get(normalize_san(san))
+            if node is None:
+                break
+            if node.opening is not None:
+                found = node.opening
+        return found
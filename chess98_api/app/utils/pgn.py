@@ -0,0 +1,151 @@
+"""
+PGN de las partidas (formato de exportación: Seven Tag Roster + tags extra, movetext a 80 columnas).
+
+Las partidas anteriores a este formato tienen en Game.pgn solo las jugadas SAN una por línea;
+`san_moves` lee los dos formatos y `is_legacy_pgn` permite regenerarlas al exportar.
+"""
+import re
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import chess
+
+from app.models.game import GameResult, GameTermination
+
+STANDARD_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+SITE_URL = "https://chess98.com/play"
+LINE_WIDTH = 80
+
+RESULT_TOKENS = {
+    GameResult.white_win: "1-0",
+    GameResult.black_win: "0-1",
+    GameResult.draw: "1/2-1/2",
+}
+
+# Como en Lichess: "Time forfeit" para las partidas perdidas por tiempo, "Normal" para el resto
+TERMINATIONS = {
+    GameTermination.timeout: "Time forfeit",
+}
+
+_COMMENT = re.compile(r"\{[^}]*\}|;[^\n]*")
+_MOVE_NUMBER = re.compile(r"^\d+\.+")
+
+def result_token(result: Optional[GameResult]) -> str:
+    return RESULT_TOKENS.get(GameResult(result), "*") if result else "*"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def movetext(moves_san: list[str], result: str) -> str:
+    """
+    "1. e4 e5 2. Nf3 ..." con el resultado al final, cortado en líneas de hasta LINE_WIDTH.
+    """
+    tokens = []
+    for ply, san in enumerate(moves_san):
+        if ply % 2 == 0:
+            tokens.append(f"{ply // 2 + 1}.")
+        tokens.append(san)
+    tokens.append(result)
+
+    lines, line = [], ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > LINE_WIDTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines)
+
+def build_pgn(
+    game_id,
+    white: str,
+    black: str,
+    moves_san: list[str],
+    result: Optional[GameResult],
+    termination: Optional[GameTermination],
+    start_time: datetime,
+    initial_time: int,
+    increment: int,
+    time_control_str: str,
+    white_rating: int,
+    black_rating: int,
+    initial_fen: str = STANDARD_FEN,
+    eco_code: Optional[str] = None,
+    opening: Optional[str] = None,
+    rated: bool = True
+) -> str:
+    result_str = result_token(result)
+
+    headers = [
+        ("Event", f"{'Rated' if rated else 'Casual'} {time_control_str} game"),
+        ("Site", f"{SITE_URL}/{game_id}"),
+        ("Date", start_time.strftime("%Y.%m.%d")),
+        ("Round", "-"),
+        ("White", white),
+        ("Black", black),
+        ("Result", result_str),
+        ("UTCDate", start_time.strftime("%Y.%m.%d")),
+        ("UTCTime", start_time.strftime("%H:%M:%S")),
+        ("WhiteElo", white_rating),
+        ("BlackElo", black_rating),
+        ("TimeControl", f"{initial_time}+{increment}"),
+    ]
+    if eco_code:
+        headers.append(("ECO", eco_code))
+    if opening:
+        headers.append(("Opening", opening))
+    if termination:
+        headers.append(("Termination", TERMINATIONS.get(GameTermination(termination), "Normal")))
+    if initial_fen and initial_fen != STANDARD_FEN:
+        headers += [("SetUp", "1"), ("FEN", initial_fen)]
+
+    tags = "\n".join(f'[{name} "{_escape(value)}"]' for name, value in headers)
+    return f"{tags}\n\n{movetext(moves_san, result_str)}\n"
+
+def is_legacy_pgn(pgn: Optional[str]) -> bool:
+    return bool(pgn) and not pgn.lstrip().startswith("[")
+
+def san_moves(pgn: Optional[str]) -> list[str]:
+    """
+    Jugadas SAN de un Game.pgn, sea PGN completo (sin variantes) o el formato viejo de una jugada por línea.
+    """
+    if not pgn:
+        return []
+    if is_legacy_pgn(pgn):
+        return pgn.split()
+
+    text = "\n".join(line for line in pgn.splitlines() if not line.startswith("["))
+    moves = []
+    for token in _COMMENT.sub(" ", text).split():
+        token = _MOVE_NUMBER.sub("", token)
+        if token and token not in ("1-0", "0-1", "1/2-1/2", "*") and not token.startswith("$"):
+            moves.append(token)
+    return moves
+
+def uci_moves(pgn: Optional[str], initial_fen: str = STANDARD_FEN, max_ply: Optional[int] = None) -> list[str]:
+    """
+    Las jugadas de un Game.pgn pasadas a UCI reproduciendo la partida (se corta en la primera jugada inválida).
+    """
+    board = chess.Board(initial_fen)
+    moves = []
+    for san in san_moves(pgn)[:max_ply]:
+        try:
+            moves.append(board.push_san(san).uci())
+        except ValueError:
+            break
+    return moves
+
+async def iter_chunks(pgns: AsyncIterable[str], chunk_size: int = 64 * 1024) -> AsyncIterator[str]:
+    """
+    Agrupa los PGN (separados por una línea en blanco) en bloques de ~chunk_size para la respuesta en streaming.
+    """
+    buffer, size = [], 0
+    async for pgn in pgns:
+        buffer.append(pgn + "\n")
+        size += len(pgn) + 1
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
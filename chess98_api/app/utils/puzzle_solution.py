@@ -0,0 +1,77 @@
+"""
+Validación de la línea de un puzzle de Lichess.
+
+`Puzzle.fen` es la posición antes de la jugada del rival: moves[0] la hace el rival y
+después alternan jugador (índices impares) y rival (pares). Como en Lichess, cualquier
+jugada que da mate cuenta como correcta aunque no sea la de la solución.
+"""
+from typing import NamedTuple, Optional
+
+import chess
+
+class PuzzleCheck(NamedTuple):
+    valid: bool  # todas las jugadas enviadas son correctas
+    solved: bool  # y completan la solución
+    reply: Optional[str]  # respuesta del rival a la última jugada, si el puzzle sigue
+    failed_at: Optional[int]  # índice de la primera jugada incorrecta
+
+class PuzzleSolution:
+    """
+    Posiciones precalculadas en cada turno del jugador con la jugada esperada y la respuesta del rival,
+    así validar no requiere volver a parsear el FEN ni reproducir la línea.
+    """
+    __slots__ = ("boards", "expected", "replies")
+
+    def __init__(self, fen: str, moves: list[str]):
+        board = chess.Board(fen)
+        board.push_uci(moves[0])
+
+        self.boards: list[chess.Board] = []
+        self.expected: list[str] = []
+        self.replies: list[Optional[str]] = []
+
+        for i in range(1, len(moves), 2):
+            self.boards.append(board.copy(stack=False))
+            self.expected.append(moves[i])
+            reply = moves[i + 1] if i + 1 < len(moves) else None
+            self.replies.append(reply)
+
+            board.push_uci(moves[i])
+            if reply:
+                board.push_uci(reply)
+
+    def __len__(self) -> int:
+        return len(self.expected)
+
+    def is_mate(self, step: int, uci: str) -> bool:
+        board = self.boards[step]
+        try:
+            move = chess.Move.from_uci(uci)
+        except ValueError:
+            return False
+        if move not in board.legal_moves:
+            return False
+
+        board.push(move)
+        mate = board.is_checkmate()
+        board.pop()
+        return mate
+
+    def check(self, moves: list[str]) -> PuzzleCheck:
+        """
+        Valida las jugadas del jugador (sin las del rival) contra la solución.
+        """
+        for step, uci in enumerate(moves):
+            if step >= len(self):
+                return PuzzleCheck(False, False, None, step)
+
+            if uci != self.expected[step]:
+                if self.is_mate(step, uci):
+                    return PuzzleCheck(True, True, None, None)
+                return PuzzleCheck(False, False, None, step)
+
+        if len(moves) == len(self):
+            return PuzzleCheck(True, True, None, None)
+
+        reply = self.replies[len(moves) - 1] if moves else None
+        return PuzzleCheck(True, False, reply, None)
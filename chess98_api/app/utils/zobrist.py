@@ -0,0 +1,51 @@
+"""
+Claves de posición para el explorador de aperturas y la búsqueda por posición: hash Zobrist de Polyglot
+(chess.polyglot.zobrist_hash), que incluye turno, enroques y captura al paso, así las transposiciones
+caen en la misma clave.
+"""
+from typing import NamedTuple, Optional, Sequence
+
+import chess
+import chess.polyglot
+
+MAX_PLY = 30  # el explorador solo mira las primeras jugadas
+
+class ExplorerEntry(NamedTuple):
+    position_key: int
+    move_uci: str
+
+def position_key(board: chess.Board) -> int:
+    """
+    Hash de 64 bits sin signo convertido a con signo para guardarlo en un BIGINT de Postgres.
+    """
+    key = chess.polyglot.zobrist_hash(board)
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+def position_keys(moves_uci: Sequence[str], fen: Optional[str] = None) -> list[int]:
+    """
+    Reproduce la partida una vez: keys[ply] es la posición después de `ply` jugadas (keys[0] la inicial).
+    """
+    board = chess.Board(fen) if fen else chess.Board()
+    keys = [position_key(board)]
+    for uci in moves_uci:
+        board.push_uci(uci)
+        keys.append(position_key(board))
+    return keys
+
+def explorer_entries(moves_uci: Sequence[str], keys: Sequence[int], max_ply: int = MAX_PLY) -> list[ExplorerEntry]:
+    """
+    (posición antes de la jugada, jugada) de las primeras `max_ply` jugadas de la partida.
+    Si la misma posición y jugada se repiten en la partida se cuentan una sola vez.
+    """
+    return list(dict.fromkeys(
+        ExplorerEntry(keys[ply], uci) for ply, uci in enumerate(moves_uci[:max_ply])
+    ))
+
+def first_plies(keys: Sequence[int]) -> dict[int, int]:
+    """
+    {posición: primera jugada en la que se llegó a ella}, sin la posición inicial (la tienen todas las partidas).
+    """
+    plies: dict[int, int] = {}
+    for ply in range(1, len(keys)):
+        plies.setdefault(keys[ply], ply)
+    return plies
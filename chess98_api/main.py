@@ -11,6 +11,15 @@ from app.routes.puzzle import router as puzzle_router
 
 from app.ws.entrypoints import register_websockets
 from app.core.cache import setup_cache
+from app.cache.puzzle_index import puzzle_index
+from app.cache.puzzle_seen import puzzle_seen_cache
+from app.cache.puzzle_counters import puzzle_play_counter
+from app.cache.puzzle_rush import puzzle_rush_pool
+from app.cache.puzzle_queue import puzzle_queue_cache
+from app.cache.puzzle_solutions import puzzle_solution_cache
+from app.cache.openings import load_opening_book
+from app.services.explorer import mark_explorer_live
+from app.database.connection import AsyncSessionLocal
 import logging
 
 logging.basicConfig(level=logging.DEBUG)
@@ -41,6 +50,42 @@ app.include_router(puzzle_router)
 
 register_websockets(app)
 
+@app.on_event("startup")
+async def load_puzzle_index():
+    async with AsyncSessionLocal() as db:
+        await puzzle_index.load(db)
+    puzzle_rush_pool.schedule_fill()
+
+    # Recarga en caliente cuando un script marca el índice como cambiado
+    puzzle_index.on_reload += [puzzle_rush_pool.reset, puzzle_queue_cache.clear, puzzle_solution_cache.clear]
+    puzzle_index.start()
+
+@app.on_event("startup")
+async def load_openings():
+    load_opening_book()
+
+@app.on_event("startup")
+async def mark_explorer_start():
+    # Las partidas que terminen desde acá las suma handle_game_over; build_explorer.py carga las anteriores
+    async with AsyncSessionLocal() as db:
+        await mark_explorer_live(db)
+
+@app.on_event("startup")
+async def start_puzzle_play_counter():
+    puzzle_play_counter.start()
+
+@app.on_event("shutdown")
+async def save_puzzle_seen_filters():
+    await puzzle_seen_cache.save_all()
+
+@app.on_event("shutdown")
+async def stop_puzzle_index_reload():
+    puzzle_index.stop()
+
+@app.on_event("shutdown")
+async def flush_puzzle_play_counter():
+    await puzzle_play_counter.stop()
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
@@ -0,0 +1,218 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from uuid import UUID
+
+import chess
+import chess.engine
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select
+
+from app.constants.analysis import ANALYSIS_DEPTH, ENGINE_HASH_MB, MATE_SCORE
+from app.core.config import STOCKFISH_PATH
+from app.database.connection import AsyncSessionLocal
+from app.models.game import Game
+from app.services.analysis import (
+    claim_next_job, enqueue_completed_games, fail_job, get_analysis_throughput, move_rows,
+    release_stale_jobs, save_analysis
+)
+from app.utils.pgn import STANDARD_FEN, uci_moves
+
+# Worker de la cola analysis_jobs: N procesos del motor UCI, cada uno con su corrutina que toma
+# la partida de mayor prioridad, evalúa todas sus posiciones y escribe las jugadas de una vez.
+#
+# - Es reanudable: el estado vive en analysis_jobs. Un job RUNNING de un worker que murió vuelve a
+#   PENDING después de STALE_AFTER (y se da por FAILED tras MAX_ATTEMPTS intentos).
+# - Un motor por corrutina con Threads=1: el paralelismo es entre partidas, así que --engines no
+#   debería pasar la cantidad de cores.
+# - Las partidas no tienen filas en `moves` (la API guarda solo el PGN): el worker las crea desde el PGN.
+
+REPORT_EVERY = 30  # segundos entre líneas de métricas
+IDLE_SLEEP = 5  # segundos de espera con la cola vacía
+
+logger = logging.getLogger("analyze_games")
+
+
+async def open_engine(path: str) -> chess.engine.UciProtocol:
+    _, engine = await chess.engine.popen_uci(path)
+    await engine.configure({"Threads": 1, "Hash": ENGINE_HASH_MB})
+    return engine
+
+
+async def analyse_game(engine: chess.engine.UciProtocol, game_id: UUID, initial_fen: str, moves: list[str], depth: int):
+    """
+    Evalúa la posición inicial y la posición después de cada jugada.
+    Devuelve (scores, best_moves) con len(moves) + 1 elementos cada uno.
+    """
+    board = chess.Board(initial_fen)
+    limit = chess.engine.Limit(depth=depth)
+    scores, best_moves = [], []
+
+    for ply in range(len(moves) + 1):
+        if ply:
+            board.push_uci(moves[ply - 1])
+        if board.is_game_over():
+            # Sin jugadas legales el motor no analiza: mate (pierde el que mueve) o tablas
+            if board.is_checkmate():
+                scores.append(-MATE_SCORE if board.turn == chess.WHITE else MATE_SCORE)
+            else:
+                scores.append(0)
+            best_moves.append(None)
+            continue
+
+        # `game` le avisa al motor que las posiciones son de la misma partida: conserva la tabla hash
+        info = await engine.analyse(board, limit, game=game_id)
+        scores.append(info["score"].white().score(mate_score=MATE_SCORE))
+        pv = info.get("pv")
+        best_moves.append(pv[0].uci() if pv else None)
+
+    return scores, best_moves
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.games = 0
+        self.failed = 0
+        self.positions = 0
+        self.engine_seconds = 0.0
+
+    def report(self, workers: int) -> str:
+        elapsed = time.perf_counter() - self.started
+        per_position = self.engine_seconds * 1000 / self.positions if self.positions else 0
+        return (
+            f"{self.games} games ({self.failed} failed), {self.positions} positions in {elapsed:.0f}s: "
+            f"{self.games * 60 / elapsed:.1f} games/min, {self.positions / elapsed:.1f} positions/s, "
+            f"{per_position:.1f} ms/position/engine, {workers} engines"
+        )
+
+
+async def process_job(engine: chess.engine.UciProtocol, game_id: UUID, depth: int, metrics: Metrics):
+    # La transacción no queda abierta mientras analiza el motor: una sesión para leer la partida y otra para escribir
+    async with AsyncSessionLocal() as session:
+        game = (await session.execute(
+            select(Game.pgn, Game.initial_fen, Game.end_time).where(Game.id == game_id)
+        )).one()
+
+    initial_fen = game.initial_fen or STANDARD_FEN
+    moves = uci_moves(game.pgn, initial_fen)
+
+    started = time.perf_counter()
+    scores, best_moves = await analyse_game(engine, game_id, initial_fen, moves, depth)
+    elapsed = time.perf_counter() - started
+
+    rows = move_rows(game_id, initial_fen, moves, game.end_time, scores, best_moves)
+    async with AsyncSessionLocal() as session:
+        await save_analysis(game_id, rows, scores[0], int(elapsed * 1000), session)
+
+    metrics.games += 1
+    metrics.positions += len(scores)
+    metrics.engine_seconds += elapsed
+
+
+async def worker(number: int, engine_path: str, depth: int, once: bool, metrics: Metrics):
+    engine = await open_engine(engine_path)
+    try:
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    game_id = await claim_next_job(session)
+            except Exception:
+                logger.exception(f"Worker {number} could not claim a job")
+                await asyncio.sleep(IDLE_SLEEP)
+                continue
+
+            if game_id is None:
+                if once:
+                    return
+                await asyncio.sleep(IDLE_SLEEP)
+                continue
+
+            # Cualquier error de un job (PGN inválido, motor, base) lo reencola o lo da por FAILED
+            # y el worker sigue con el próximo en vez de cortar todo el proceso
+            try:
+                await process_job(engine, game_id, depth, metrics)
+            except Exception as e:
+                logger.warning(f"Worker {number} failed on {game_id}: {e!r}")
+                metrics.failed += 1
+                try:
+                    async with AsyncSessionLocal() as session:
+                        await fail_job(game_id, repr(e), session)
+                except Exception:
+                    # Sin base no se puede cerrar: release_stale_jobs lo libera después de STALE_AFTER
+                    logger.exception(f"Worker {number} could not release {game_id}")
+
+                if isinstance(e, chess.engine.EngineError):
+                    # El motor se cayó o respondió mal: se levanta otro
+                    await close_engine(engine)
+                    engine = await open_engine(engine_path)
+    finally:
+        await close_engine(engine)
+
+
+async def close_engine(engine: chess.engine.UciProtocol):
+    try:
+        await asyncio.wait_for(engine.quit(), timeout=5)
+    except (asyncio.TimeoutError, chess.engine.EngineError):
+        pass
+
+
+async def supervise(engines: int, metrics: Metrics):
+    """
+    Métricas periódicas del proceso y libera los jobs colgados de otros workers.
+    """
+    while True:
+        await asyncio.sleep(REPORT_EVERY)
+        print(metrics.report(engines))
+        async with AsyncSessionLocal() as session:
+            released = await release_stale_jobs(session)
+        if released:
+            print(f"Released {released} stale jobs.")
+
+
+async def main(engines: int, depth: int, engine_path: str, enqueue_existing: bool, once: bool):
+    logging.basicConfig(level=logging.INFO)
+    started_at = datetime.now(timezone.utc)
+
+    async with AsyncSessionLocal() as session:
+        if enqueue_existing:
+            queued = await enqueue_completed_games(session)
+            await session.commit()
+            print(f"Queued {queued} finished games.")
+        released = await release_stale_jobs(session)
+        if released:
+            print(f"Released {released} stale jobs.")
+
+    metrics = Metrics()
+    supervisor = asyncio.create_task(supervise(engines, metrics))
+    try:
+        await asyncio.gather(*(worker(i, engine_path, depth, once, metrics) for i in range(engines)))
+    finally:
+        supervisor.cancel()
+        print(metrics.report(engines))
+
+    async with AsyncSessionLocal() as session:
+        throughput = await get_analysis_throughput(started_at, session)
+    print(
+        f"Queue: {throughput['queue']}. Since start: {throughput['games']} games, "
+        f"{throughput['positions']} positions, {throughput['engine_seconds']:.0f}s of engine time (all workers)."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analiza con un motor UCI las partidas de la cola analysis_jobs.")
+    parser.add_argument("--engines", type=int, default=2, help="Procesos del motor en paralelo (uno por partida)")
+    parser.add_argument("--depth", type=int, default=ANALYSIS_DEPTH, help="Profundidad del análisis por posición")
+    parser.add_argument("--engine-path", default=STOCKFISH_PATH, help="Ejecutable del motor UCI")
+    parser.add_argument("--enqueue-existing", action="store_true", help="Encolar antes las partidas terminadas sin job")
+    parser.add_argument("--once", action="store_true", help="Terminar cuando la cola quede vacía")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.engines, args.depth, args.engine_path, args.enqueue_existing, args.once))
@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import time
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import String, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from app.cache.openings import load_opening_book, opening_book
+from app.core.config import OPENINGS_DIR
+from app.database.connection import AsyncSessionLocal
+from app.models.game import Game, GameStatus
+from app.services.opening import rebuild_opening_stats
+from app.utils.pgn import san_moves
+
+
+BATCH_SIZE = 10000
+UPDATE_BATCH_SIZE = 5000  # filas por UPDATE (límite de parámetros de Postgres)
+
+
+async def write_openings(session, rows: list[tuple]):
+    for i in range(0, len(rows), UPDATE_BATCH_SIZE):
+        openings = values(
+            column("id", PG_UUID(as_uuid=True)), column("eco", String), column("name", String),
+            name="openings"
+        ).data(rows[i:i + UPDATE_BATCH_SIZE])
+
+        await session.execute(
+            update(Game)
+            .where(Game.id == openings.c.id)
+            .values(eco_code=openings.c.eco, opening=openings.c.name)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def main(all_games: bool, apply: bool):
+    load_opening_book(OPENINGS_DIR)
+    if not len(opening_book):
+        return
+
+    async with AsyncSessionLocal() as session, AsyncSessionLocal() as writer:
+        query = (
+            select(Game.id, Game.pgn)
+            .where(Game.status == GameStatus.completed, Game.pgn.is_not(None))
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        if not all_games:
+            query = query.where(Game.eco_code.is_(None))
+
+        started = time.perf_counter()
+        games, classified, rows = 0, 0, []
+        stream = await session.stream(query)
+        async for game_id, pgn in stream:
+            games += 1
+            opening = opening_book.classify(san_moves(pgn))
+            if opening:
+                classified += 1
+                rows.append((game_id, opening.eco, opening.name))
+
+            if apply and len(rows) >= BATCH_SIZE:
+                await write_openings(writer, rows)
+                rows = []
+
+        elapsed = time.perf_counter() - started
+        print(f"{games} games, {classified} classified in {elapsed:.1f}s ({games / max(elapsed, 1e-9):.0f} games/s)")
+
+        if not apply:
+            print(f"Dry run: {classified} games would be updated. Use --apply to write them.")
+            return
+
+        await write_openings(writer, rows)
+        stats = await rebuild_opening_stats(writer)
+        await writer.commit()
+        print(f"Updated games and rebuilt opening_stats: {stats} openings.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clasifica la apertura (ECO) de las partidas guardadas y reconstruye opening_stats.")
+    parser.add_argument("--all", action="store_true", help="Reclasificar también las que ya tienen apertura (p. ej. tras actualizar los TSV)")
+    parser.add_argument("--apply", action="store_true", help="Escribir las aperturas en la base de datos")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.all, args.apply))
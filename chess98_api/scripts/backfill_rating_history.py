@@ -0,0 +1,198 @@
+import sys
+from pathlib import Path
+import asyncio
+from datetime import datetime, timezone
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select, insert, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.database.connection import AsyncSessionLocal
+from app.models.game import Game, GameStatus
+from app.models.job_watermark import JobWatermark
+from app.models.profile import Profile
+from app.models.puzzle_solve import PuzzleSolve
+from app.models.rating_history import RatingHistory
+from app.services.rating_history import rebuild_daily_rating_history
+
+
+BATCH_SIZE = 5000
+
+# Solo se rellenan eventos anteriores al primer punto que registró la API (el corte), así el script
+# se puede correr con la API levantada. El corte se guarda en job_watermarks en la primera corrida
+# (los puntos que escribe el backfill lo moverían) y cada fuente avanza su propio watermark
+# (fecha, id) en la misma transacción que sus puntos: si se corta, la próxima corrida sigue desde ahí.
+
+CUTOFF_WATERMARK = "rating_history_backfill_cutoff"
+GAMES_WATERMARK = "rating_history_backfill_games"
+PUZZLES_WATERMARK = "rating_history_backfill_puzzles"
+
+
+async def save_watermark(session, name: str, last_at: datetime, last_id=None):
+    stmt = pg_insert(JobWatermark).values(
+        name=name, last_at=last_at, last_id=last_id, updated_at=datetime.now(timezone.utc)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobWatermark.name],
+        set_={"last_at": stmt.excluded.last_at, "last_id": stmt.excluded.last_id, "updated_at": stmt.excluded.updated_at}
+    )
+    await session.execute(stmt)
+
+
+async def get_cutoff(session) -> datetime:
+    watermark = await session.get(JobWatermark, CUTOFF_WATERMARK)
+    if watermark:
+        return watermark.last_at
+
+    result = await session.execute(select(func.min(RatingHistory.ts)))
+    cutoff = result.scalar() or datetime.now(timezone.utc)
+    await save_watermark(session, CUTOFF_WATERMARK, cutoff)
+    await session.commit()
+    return cutoff
+
+
+async def insert_batch(session, batch: list[dict], watermark: str, last):
+    # Puntos y watermark juntos: un batch queda entero o no queda
+    if batch:
+        await session.execute(insert(RatingHistory), batch)
+    await save_watermark(session, watermark, *last)
+    await session.commit()
+
+
+async def backfill_games(read_session, write_session, cutoff: datetime, profile_ids: dict) -> int:
+    query = (
+        select(
+            Game.id,
+            Game.white_id,
+            Game.black_id,
+            Game.time_control_str,
+            Game.end_time,
+            Game.white_rating,
+            Game.black_rating,
+            Game.white_rating_change,
+            Game.black_rating_change
+        )
+        .where(
+            Game.status == GameStatus.completed,
+            Game.end_time < cutoff,
+            Game.white_rating_change.is_not(None)
+        )
+        .order_by(Game.end_time, Game.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    watermark = await write_session.get(JobWatermark, GAMES_WATERMARK)
+    if watermark:
+        query = query.where(tuple_(Game.end_time, Game.id) > tuple_(watermark.last_at, watermark.last_id))
+        print(f"Games: resuming after {watermark.last_at.isoformat()}")
+    stream = await read_session.stream(query)
+
+    batch = []
+    count = 0
+    last = None
+
+    async for game in stream:
+        sides = (
+            (game.white_id, game.white_rating, game.white_rating_change),
+            (game.black_id, game.black_rating, game.black_rating_change or 0),
+        )
+        for user_id, rating_before, change in sides:
+            profile_id = profile_ids.get(user_id)
+            if not profile_id:
+                continue
+            batch.append({
+                "profile_id": profile_id,
+                "category": game.time_control_str,
+                "rating": rating_before + change,
+                "rating_delta": change,
+                "ts": game.end_time,
+                "game_id": game.id,
+            })
+        last = (game.end_time, game.id)
+
+        if len(batch) >= BATCH_SIZE:
+            await insert_batch(write_session, batch, GAMES_WATERMARK, last)
+            count += len(batch)
+            print(f"Games: {count} points...")
+            batch.clear()
+
+    if last:
+        await insert_batch(write_session, batch, GAMES_WATERMARK, last)
+        count += len(batch)
+
+    return count
+
+
+async def backfill_puzzle_solves(read_session, write_session, cutoff: datetime) -> int:
+    query = (
+        select(
+            PuzzleSolve.id,
+            PuzzleSolve.profile_id,
+            PuzzleSolve.solved_at,
+            PuzzleSolve.rating_after,
+            PuzzleSolve.rating_delta
+        )
+        .where(
+            PuzzleSolve.rating_delta != 0,
+            PuzzleSolve.rating_after.is_not(None),
+            PuzzleSolve.solved_at < cutoff
+        )
+        .order_by(PuzzleSolve.solved_at, PuzzleSolve.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    watermark = await write_session.get(JobWatermark, PUZZLES_WATERMARK)
+    if watermark:
+        query = query.where(tuple_(PuzzleSolve.solved_at, PuzzleSolve.id) > tuple_(watermark.last_at, watermark.last_id))
+        print(f"Puzzles: resuming after {watermark.last_at.isoformat()}")
+    stream = await read_session.stream(query)
+
+    batch = []
+    count = 0
+    last = None
+
+    async for solve in stream:
+        batch.append({
+            "profile_id": solve.profile_id,
+            "category": "puzzle",
+            "rating": round(solve.rating_after),
+            "rating_delta": round(solve.rating_delta),
+            "ts": solve.solved_at,
+            "game_id": None,
+        })
+        last = (solve.solved_at, solve.id)
+
+        if len(batch) >= BATCH_SIZE:
+            await insert_batch(write_session, batch, PUZZLES_WATERMARK, last)
+            count += len(batch)
+            print(f"Puzzles: {count} points...")
+            batch.clear()
+
+    if batch:
+        await insert_batch(write_session, batch, PUZZLES_WATERMARK, last)
+        count += len(batch)
+
+    return count
+
+
+async def main():
+    async with AsyncSessionLocal() as read_session, AsyncSessionLocal() as write_session:
+        cutoff = await get_cutoff(write_session)
+        print(f"Backfilling rating history before {cutoff.isoformat()}")
+
+        result = await write_session.execute(select(Profile.user_id, Profile.id))
+        profile_ids = dict(result.all())
+
+        games = await backfill_games(read_session, write_session, cutoff, profile_ids)
+        print(f"Games done. {games} points.")
+
+        puzzles = await backfill_puzzle_solves(read_session, write_session, cutoff)
+        print(f"Puzzles done. {puzzles} points.")
+
+        await rebuild_daily_rating_history(write_session)
+        await write_session.commit()
+        print("Daily OHLC rebuilt.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
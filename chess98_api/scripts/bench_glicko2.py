@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+import argparse
+import time
+
+import numpy as np
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.utils.glicko2 import Glicko2Rating, rate, rate_history
+
+
+def check_reference():
+    """
+    Ejemplo del paper de Glickman: 1500/200/0.06 contra 1400/30 (gana), 1550/100 (pierde), 1700/300 (pierde)
+    -> 1464.06 / 151.52 / 0.05999
+    """
+    result = rate(
+        Glicko2Rating(1500, 200, 0.06),
+        [
+            (Glicko2Rating(1400, 30, 0.06), 1),
+            (Glicko2Rating(1550, 100, 0.06), 0),
+            (Glicko2Rating(1700, 300, 0.06), 0),
+        ]
+    )
+    assert abs(result.rating - 1464.06) < 0.01, result
+    assert abs(result.rd - 151.52) < 0.01, result
+    assert abs(result.volatility - 0.05999) < 0.00001, result
+    print(f"Reference example OK: {result.rating:.2f} / {result.rd:.2f} / {result.volatility:.5f}")
+
+
+def check_batch_against_scalar(players: int = 200, games: int = 5000, periods: int = 20, seed: int = 1):
+    """
+    La versión vectorizada debe coincidir con rate() jugador por jugador, período por período.
+    """
+    rng = np.random.default_rng(seed)
+    white = rng.integers(0, players, games)
+    black = (white + rng.integers(1, players, games)) % players
+    scores = rng.choice([0.0, 0.5, 1.0], games)
+    game_periods = np.sort(rng.integers(0, periods, games))
+
+    ratings, rds, volatilities = rate_history(players, white, black, scores, game_periods)
+
+    current = [Glicko2Rating(1500, 350, 0.06)] * players
+    for period in range(periods):
+        results = {i: [] for i in range(players)}
+        mask = game_periods == period
+        for w, b, s in zip(white[mask], black[mask], scores[mask]):
+            results[w].append((current[b], s))
+            results[b].append((current[w], 1 - s))
+        current = [rate(current[i], results[i]) for i in range(players)]
+
+    max_diff = max(
+        max(abs(ratings[i] - current[i].rating), abs(rds[i] - current[i].rd))
+        for i in range(players)
+    )
+    assert max_diff < 1e-6, max_diff
+    print(f"Batch vs scalar OK: max diff {max_diff:.2e} over {players} players / {games} games")
+
+
+def bench(players: int, games: int, periods: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    strength = rng.normal(1500, 300, players)
+
+    white = rng.integers(0, players, games)
+    black = (white + rng.integers(1, players, games)) % players
+    expected = 1 / (1 + 10 ** ((strength[black] - strength[white]) / 400))
+    roll = rng.random(games)
+    scores = np.where(roll < expected * 0.9, 1.0, np.where(roll < expected * 0.9 + 0.1, 0.5, 0.0))
+    game_periods = np.sort(rng.integers(0, periods, games))
+
+    started = time.perf_counter()
+    ratings, rds, _ = rate_history(players, white, black, scores, game_periods)
+    elapsed = time.perf_counter() - started
+
+    correlation = np.corrcoef(strength, ratings)[0, 1]
+    print(
+        f"Recomputed {games:,} games / {players:,} players / {periods} periods in {elapsed:.2f}s "
+        f"({games / elapsed:,.0f} games/s). corr(strength, rating)={correlation:.3f}, mean RD={rds.mean():.1f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark y chequeo de consistencia del motor Glicko-2.")
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=50_000)
+    parser.add_argument("--periods", type=int, default=365)
+    args = parser.parse_args()
+
+    check_reference()
+    check_batch_against_scalar()
+    bench(args.players, args.games, args.periods)
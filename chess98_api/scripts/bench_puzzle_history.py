@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import time
+from uuid import UUID
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func, select
+
+from app.database.connection import AsyncSessionLocal
+from app.models.puzzle_solve import PuzzleSolve
+from app.services.puzzle import get_puzzles_by_profile_id
+from app.utils.cursor import encode_cursor
+from scripts.bench_puzzle_selection import percentiles
+
+
+async def cursor_at(profile_id: UUID, only_rated: bool, position: int, db) -> str:
+    """
+    Cursor que devolvería la página que termina en `position` (se arma fuera de la medición).
+    """
+    query = select(PuzzleSolve.solved_at, PuzzleSolve.id).where(PuzzleSolve.profile_id == profile_id)
+    if only_rated:
+        query = query.where(PuzzleSolve.rating_delta != 0)
+    result = await db.execute(
+        query.order_by(PuzzleSolve.solved_at.desc(), PuzzleSolve.id.desc()).offset(position - 1).limit(1)
+    )
+    solved_at, solve_id = result.one()
+    return encode_cursor(solved_at, solve_id)
+
+
+async def timed(runs: int, call) -> str:
+    samples = []
+    for _ in range(runs):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await call(db)
+            samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+async def main(profile_id: UUID, only_rated: bool, page_size: int, pages: list[int], runs: int):
+    async with AsyncSessionLocal() as db:
+        total = (await db.execute(
+            select(func.count()).where(PuzzleSolve.profile_id == profile_id)
+        )).scalar()
+    print(f"Profile {profile_id}: {total:,} solves, page_size={page_size}, only_rated={only_rated}")
+
+    for page in pages:
+        if (page - 1) * page_size >= total:
+            break
+
+        offset = await timed(runs, lambda db: get_puzzles_by_profile_id(
+            profile_id, only_rated, page, page_size, db
+        ))
+
+        if page == 1:
+            keyset = await timed(runs, lambda db: get_puzzles_by_profile_id(
+                profile_id, only_rated, 1, page_size, db, include_total=False
+            ))
+        else:
+            async with AsyncSessionLocal() as db:
+                cursor = await cursor_at(profile_id, only_rated, (page - 1) * page_size, db)
+            keyset = await timed(runs, lambda db: get_puzzles_by_profile_id(
+                profile_id, only_rated, page, page_size, db, cursor=cursor, include_total=False
+            ))
+
+        print(f"page {page:>6}: OFFSET + count {offset} | cursor {keyset}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Páginas profundas del historial de solves: OFFSET vs cursor.")
+    parser.add_argument("profile_id", type=UUID, help="Perfil con un historial grande (p. ej. 100k solves)")
+    parser.add_argument("--all", action="store_true", help="Incluir solves no rateados (only_rated=false)")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000, 5000, 9000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.profile_id, not args.all, args.page_size, args.pages, args.runs))
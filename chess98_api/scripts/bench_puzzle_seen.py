@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+import argparse
+import random
+import string
+import time
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.utils.bloom import ScalableBloomFilter
+
+
+def random_ids(count: int, rng: random.Random) -> list[str]:
+    alphabet = string.ascii_letters + string.digits
+    ids = set()
+    while len(ids) < count:
+        ids.add("".join(rng.choices(alphabet, k=5)))
+    return list(ids)
+
+
+def set_bytes(seen: set[str]) -> int:
+    # Tabla hash del set + cada string (lo que ocupaba el caché anterior)
+    return sys.getsizeof(seen) + sum(sys.getsizeof(puzzle_id) for puzzle_id in seen)
+
+
+def report(solves: int, probes: int, rng: random.Random):
+    ids = random_ids(solves + probes, rng)
+    played, unseen = ids[:solves], ids[solves:]
+
+    started = time.perf_counter()
+    bloom = ScalableBloomFilter()
+    bloom.update(played)
+    build = time.perf_counter() - started
+
+    assert all(puzzle_id in bloom for puzzle_id in played), "Bloom filter con falso negativo"
+
+    started = time.perf_counter()
+    false_positives = sum(puzzle_id in bloom for puzzle_id in unseen)
+    lookup = (time.perf_counter() - started) / probes
+
+    serialized = len(bloom.to_bytes())
+    assert len(ScalableBloomFilter.from_bytes(bloom.to_bytes())) == len(bloom)
+
+    print(
+        f"{solves:>7,} solves | bloom {bloom.memory_bytes() / 1024:8.1f} KB "
+        f"({len(bloom.layers)} capas, serializado {serialized / 1024:.1f} KB) | "
+        f"set {set_bytes(set(played)) / 1024:8.1f} KB | "
+        f"falsos positivos {false_positives / probes:.2%} | "
+        f"build {build * 1000:.0f}ms, lookup {lookup * 1e6:.1f}µs"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memoria por jugador del filtro de puzzles vistos.")
+    parser.add_argument("--solves", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--probes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    for solves in args.solves:
+        report(solves, args.probes, rng)
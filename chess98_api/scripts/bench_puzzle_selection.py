@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import string
+import time
+from uuid import UUID
+
+import numpy as np
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.cache.puzzle_index import PuzzleIndex
+
+
+def percentiles(samples: list[float]) -> str:
+    ms = np.array(samples) * 1000
+    return f"p50={np.percentile(ms, 50):.3f}ms p99={np.percentile(ms, 99):.3f}ms"
+
+
+def synthetic_index(puzzles: int, seed: int = 3) -> PuzzleIndex:
+    rng = np.random.default_rng(seed)
+    alphabet = np.array(list((string.ascii_letters + string.digits).encode()), dtype=np.uint8)
+
+    ratings = np.sort(rng.normal(1500, 450, puzzles).clip(400, 3200)).astype(np.float32)
+    ids = alphabet[rng.integers(0, len(alphabet), (puzzles, 5))].view("S5").ravel()
+
+    # Popularidad parecida a la de Lichess: la mayoría entre 80 y 100, una cola de puzzles mal votados
+    popularity = (100 - rng.exponential(15, puzzles)).clip(-100, 100).astype(np.float32)
+
+    index = PuzzleIndex()
+    index.ids = ids
+    index.ratings = ratings
+    index.set_popularity(popularity)
+    index.popularity = popularity  # solo para medir la distribución de los sorteos
+    return index
+
+
+def bench_synthetic(puzzles: int, solves: int, picks: int):
+    started = time.perf_counter()
+    index = synthetic_index(puzzles)
+    print(f"Synthetic index: {len(index):,} puzzles, {index.memory_bytes() / 1e6:.1f} MB, built in {time.perf_counter() - started:.1f}s")
+
+    # El peor caso: todo el historial del jugador concentrado alrededor de su rating
+    rating = 1500.0
+    lo, hi = index.window(rating, 400)
+    seen = {index.puzzle_id(p) for p in random.sample(range(lo, hi), min(solves, hi - lo))}
+    print(f"Player history: {len(seen):,} solves around {rating:.0f}")
+
+    samples = []
+    for _ in range(picks):
+        started = time.perf_counter()
+        puzzle_id = index.pick(rating + random.uniform(-100, 100), seen.__contains__)
+        samples.append(time.perf_counter() - started)
+        seen.add(puzzle_id)
+
+    print(f"Index pick x{picks}: {percentiles(samples)}")
+
+    # Sin vistos: cuánto más salen los populares que con un sorteo uniforme de la misma ventana
+    lo, hi = index.window(rating, 25)
+    positions = index.weighted_sample(lo, hi, 100_000)
+    window = index.popularity[lo:hi]
+    for label, low, high in (("popularity < 50", -100, 50), ("50..90", 50, 90), (">= 90", 90, 101)):
+        share = np.mean((window >= low) & (window < high))
+        drawn = np.mean((index.popularity[positions] >= low) & (index.popularity[positions] < high))
+        print(f"  {label:>16}: {share:6.1%} of the window, {drawn:6.1%} of weighted draws")
+
+
+async def bench_database(profile_id: UUID, picks: int):
+    from app.database.connection import AsyncSessionLocal
+    from app.cache.puzzle_seen import PuzzleSeenCache
+    from app.services.puzzle import get_puzzle_by_rating
+
+    async with AsyncSessionLocal() as db:
+        index = PuzzleIndex()
+        started = time.perf_counter()
+        await index.load(db)
+        print(f"DB index: {len(index):,} puzzles loaded in {time.perf_counter() - started:.1f}s")
+
+        seen_cache = PuzzleSeenCache()
+        started = time.perf_counter()
+        seen = await seen_cache.get(profile_id, db)
+        print(f"Seen set: {len(seen):,} solves loaded in {(time.perf_counter() - started) * 1000:.1f}ms (once per player)")
+
+        sql_samples, index_samples = [], []
+        for _ in range(picks):
+            rating = random.uniform(800, 2200)
+
+            started = time.perf_counter()
+            await get_puzzle_by_rating(rating, profile_id, db)
+            sql_samples.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            index.pick(rating, seen.__contains__)
+            index_samples.append(time.perf_counter() - started)
+
+        print(f"SQL NOT IN x{picks}: {percentiles(sql_samples)}")
+        print(f"Index pick x{picks}: {percentiles(index_samples)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latencia de selección del siguiente puzzle: índice en memoria vs SQL.")
+    parser.add_argument("--puzzles", type=int, default=4_000_000)
+    parser.add_argument("--solves", type=int, default=50_000)
+    parser.add_argument("--picks", type=int, default=2000)
+    parser.add_argument("--profile-id", type=UUID, help="Comparar contra la consulta SQL usando la base de datos real")
+    args = parser.parse_args()
+
+    if args.profile_id:
+        asyncio.run(bench_database(args.profile_id, args.picks))
+    else:
+        bench_synthetic(args.puzzles, args.solves, args.picks)
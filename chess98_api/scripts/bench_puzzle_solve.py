@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, select
+
+from app.cache.puzzle_index import puzzle_index
+from app.cache.puzzle_solutions import puzzle_solution_cache
+from app.database.connection import AsyncSessionLocal, async_engine
+from app.models.profile import Profile
+from app.models.puzzle_solve import PuzzleSolveStatus
+from app.services.profile import get_profile_by_user_id
+from app.services.puzzle import solve_puzzle_and_get_next, refresh_active_puzzle
+
+# OJO: escribe solves y cambia ratings de verdad, usar solo contra una base de desarrollo.
+
+statements = {"count": 0, "commits": 0}
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_statement(*_):
+    statements["count"] += 1
+
+@event.listens_for(async_engine.sync_engine, "commit")
+def count_commit(*_):
+    statements["commits"] += 1
+
+
+def percentiles(samples: list[float]) -> str:
+    ms = np.array(samples) * 1000
+    return f"p50={np.percentile(ms, 50):.1f}ms p99={np.percentile(ms, 99):.1f}ms"
+
+
+async def solve_once(user_id) -> float:
+    status = random.choice([PuzzleSolveStatus.SOLVED, PuzzleSolveStatus.SOLVED, PuzzleSolveStatus.FAILED])
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        # Igual que el endpoint: el controller carga el perfil y llama al servicio
+        profile = await get_profile_by_user_id(user_id, db)
+        if not profile.active_puzzle_id:
+            await refresh_active_puzzle(profile, db)
+        # El servidor decide el resultado con las jugadas: la solución completa o ninguna (FAILED)
+        solution = await puzzle_solution_cache.get(profile.active_puzzle_id, db)
+        moves = list(solution.expected) if status == PuzzleSolveStatus.SOLVED else []
+        await solve_puzzle_and_get_next(profile, profile.active_puzzle_id, status, db, moves=moves)
+    return time.perf_counter() - started
+
+
+async def count_statements(user_id, solves: int):
+    before = dict(statements)
+    for _ in range(solves):
+        await solve_once(user_id)
+
+    print(
+        f"Sequential x{solves}: {(statements['count'] - before['count']) / solves:.1f} statements "
+        f"and {(statements['commits'] - before['commits']) / solves:.1f} commits per solve "
+        f"(incluye cargar el perfil)"
+    )
+
+
+async def solver(user_id, solves: int, samples: list[float]):
+    for _ in range(solves):
+        samples.append(await solve_once(user_id))
+
+
+async def main(solvers: int, solves: int):
+    async with AsyncSessionLocal() as db:
+        await puzzle_index.load(db)
+        result = await db.execute(select(Profile.user_id).limit(solvers))
+        user_ids = result.scalars().all()
+
+    if not user_ids:
+        print("No profiles found.")
+        return
+
+    # Primer solve de cada jugador fuera de la medición (carga el filtro de vistos y la cola)
+    await asyncio.gather(*(solve_once(user_id) for user_id in user_ids))
+    await asyncio.sleep(0.5)
+
+    await count_statements(user_ids[0], 20)
+
+    samples: list[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(solver(user_id, solves, samples) for user_id in user_ids))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{len(user_ids)} concurrent solvers x{solves}: {percentiles(samples)} "
+        f"({len(samples) / elapsed:.0f} solves/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Statements por solve y latencia con solvers concurrentes.")
+    parser.add_argument("--solvers", type=int, default=20)
+    parser.add_argument("--solves", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.solvers, args.solves))
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import time
+from uuid import UUID
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, desc, func, select
+
+from app.database.connection import AsyncSessionLocal
+from app.models.profile import Profile
+from app.models.puzzle import Puzzle
+from app.models.puzzle_solve import PuzzleSolve, PuzzleSolveStatus
+from app.models.puzzle_solve_stats import PuzzleSolveStats
+from app.services.puzzle_solve import get_solve_stats_by_profile_id, rebuild_solve_stats
+from scripts.bench_puzzle_selection import percentiles
+
+
+async def legacy_stats(profile_id: UUID, db) -> dict:
+    """
+    Las cuatro consultas que hacía get_solve_stats_by_profile_id antes de puzzle_solve_stats.
+    """
+    rated = [PuzzleSolve.profile_id == profile_id, PuzzleSolve.rating_delta != 0]
+
+    total = (await db.execute(select(func.count()).where(
+        *rated, PuzzleSolve.status.in_([PuzzleSolveStatus.SOLVED, PuzzleSolveStatus.FAILED])
+    ))).scalar() or 0
+    solved = (await db.execute(select(func.count()).where(
+        *rated, PuzzleSolve.status == PuzzleSolveStatus.SOLVED
+    ))).scalar() or 0
+    highest = (await db.execute(
+        select(Puzzle.rating)
+        .join(PuzzleSolve, Puzzle.id == PuzzleSolve.puzzle_id)
+        .where(*rated, PuzzleSolve.status == PuzzleSolveStatus.SOLVED)
+        .order_by(desc(Puzzle.rating))
+        .limit(1)
+    )).scalar()
+    await db.execute(select(Profile).where(Profile.id == profile_id))
+
+    return {"total": total, "solved": solved, "highest_solved_rating": highest}
+
+
+async def timed(label: str, runs: int, call):
+    samples = []
+    for _ in range(runs):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            result = await call(db)
+            samples.append(time.perf_counter() - started)
+    print(f"{label:<28} {percentiles(samples)}")
+    return result
+
+
+async def main(profile_id: UUID, runs: int):
+    async with AsyncSessionLocal() as db:
+        solves = (await db.execute(
+            select(func.count()).where(PuzzleSolve.profile_id == profile_id)
+        )).scalar()
+    print(f"Profile {profile_id}: {solves:,} solves")
+
+    legacy = await timed("Legacy (4 queries)", runs, lambda db: legacy_stats(profile_id, db))
+
+    async def rebuild(db):
+        await db.execute(delete(PuzzleSolveStats).where(PuzzleSolveStats.profile_id == profile_id))
+        return await rebuild_solve_stats(profile_id, db)
+
+    await timed("Rebuild (1 FILTER query)", runs, rebuild)
+    current = await timed("Stats row", runs, lambda db: get_solve_stats_by_profile_id(profile_id, None, db))
+
+    for key in legacy:
+        if legacy[key] != current[key]:
+            print(f"⚠️ {key} differs: legacy={legacy[key]} stats row={current[key]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latencia de las estadísticas de puzzles: consultas anteriores vs fila agregada.")
+    parser.add_argument("profile_id", type=UUID, help="Perfil con muchos solves (p. ej. 100k)")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.profile_id, args.runs))
@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.cache.puzzle_index import PuzzleIndex
+from scripts.bench_puzzle_selection import percentiles, synthetic_index
+
+
+def synthetic_themes(index: PuzzleIndex, themes: int, seed: int = 5):
+    """
+    Temas con una distribución parecida a la de Lichess: unos pocos en la mitad
+    de los puzzles (middlegame, short, crushing...) y una cola larga de temas raros.
+    """
+    rng = np.random.default_rng(seed)
+    frequencies = 0.5 / np.arange(1, themes + 1) ** 0.9
+
+    index.set_themes({
+        f"theme{t}": np.flatnonzero(rng.random(len(index)) < frequency).astype(np.int32)
+        for t, frequency in enumerate(frequencies)
+    })
+
+
+def bench(index: PuzzleIndex, queries: int, radius: float):
+    popular = sorted(index.themes, key=lambda t: len(index.themes[t]), reverse=True)[:20]
+
+    for combo_size in (1, 2, 3):
+        window_samples, pick_samples, sizes = [], [], []
+        for _ in range(queries):
+            themes = random.sample(popular, combo_size)
+            rating = random.uniform(800, 2200)
+
+            started = time.perf_counter()
+            positions = index.theme_window(themes, rating, radius)
+            window_samples.append(time.perf_counter() - started)
+            sizes.append(len(positions))
+
+            started = time.perf_counter()
+            index.pick_themed(themes, rating, lambda _: False)
+            pick_samples.append(time.perf_counter() - started)
+
+        print(
+            f"{combo_size} theme(s) within +-{radius:.0f}: intersect {percentiles(window_samples)}, "
+            f"pick {percentiles(pick_samples)}, median candidates {int(np.median(sizes)):,}"
+        )
+
+
+async def load_database_index() -> PuzzleIndex:
+    from app.database.connection import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        index = PuzzleIndex()
+        await index.load(db)
+        return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latencia del índice invertido por tema.")
+    parser.add_argument("--puzzles", type=int, default=4_000_000)
+    parser.add_argument("--themes", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--radius", type=float, default=100)
+    parser.add_argument("--database", action="store_true", help="Usar el set real cargado desde la base de datos")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.database:
+        index = asyncio.run(load_database_index())
+    else:
+        index = synthetic_index(args.puzzles)
+        synthetic_themes(index, args.themes)
+
+    postings = sum(len(p) for p in index.themes.values())
+    print(
+        f"Index: {len(index):,} puzzles, {len(index.themes)} themes, {postings:,} postings, "
+        f"{index.memory_bytes() / 1e6:.1f} MB, built in {time.perf_counter() - started:.1f}s"
+    )
+    bench(index, args.queries, args.radius)
@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+import argparse
+import random
+import time
+
+import chess
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.utils.puzzle_solution import PuzzleSolution
+
+
+def synthetic_puzzles(count: int, seed: int = 7) -> list[tuple[str, list[str]]]:
+    """
+    Puzzles sintéticos: una posición tras unas jugadas al azar y una línea legal de 2 a 8 jugadas,
+    con el mismo formato que Puzzle.fen / Puzzle.moves.
+    """
+    rng = random.Random(seed)
+    puzzles = []
+    while len(puzzles) < count:
+        board = chess.Board()
+        for _ in range(rng.randint(10, 40)):
+            legal = list(board.legal_moves)
+            if not legal:
+                break
+            board.push(rng.choice(legal))
+        fen = board.fen()
+
+        moves = []
+        for _ in range(rng.choice((2, 4, 6, 8))):
+            legal = list(board.legal_moves)
+            if not legal:
+                break
+            move = rng.choice(legal)
+            moves.append(move.uci())
+            board.push(move)
+
+        if len(moves) >= 2 and len(moves) % 2 == 0:
+            puzzles.append((fen, moves))
+    return puzzles
+
+
+def bench(puzzles: list[tuple[str, list[str]]], rounds: int):
+    # Lo que manda el cliente: sus jugadas (índices impares), sin las del rival
+    attempts = [moves[1::2] for _, moves in puzzles]
+    wrong = [answer[:-1] + ["a1a1"] for answer in attempts]
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for (fen, moves), answer in zip(puzzles, attempts):
+            PuzzleSolution(fen, moves).check(answer)
+    cold = rounds * len(puzzles) / (time.perf_counter() - started)
+
+    solutions = [PuzzleSolution(fen, moves) for fen, moves in puzzles]
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for solution, answer in zip(solutions, attempts):
+            assert solution.check(answer).solved
+    cached = rounds * len(puzzles) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for solution, answer in zip(solutions, wrong):
+            assert not solution.check(answer).valid
+    cached_wrong = rounds * len(puzzles) / (time.perf_counter() - started)
+
+    print(f"Parse + check (sin cache):      {cold:>10,.0f} validaciones/s")
+    print(f"Check con PuzzleSolution cache: {cached:>10,.0f} validaciones/s ({cached / cold:.1f}x)")
+    print(f"Jugada incorrecta (busca mate): {cached_wrong:>10,.0f} validaciones/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validaciones de puzzles por segundo con y sin cache de soluciones.")
+    parser.add_argument("--puzzles", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    bench(synthetic_puzzles(args.puzzles), args.rounds)
@@ -0,0 +1,128 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.database.connection import AsyncSessionLocal
+from app.models.explorer_move import ExplorerMove
+from app.models.game import Game, GameStatus
+from app.models.job_watermark import JobWatermark
+from app.services.explorer import LIVE_WATERMARK, result_counts, upsert_explorer_moves
+from app.utils.pgn import uci_moves
+from app.utils.zobrist import MAX_PLY, explorer_entries, position_keys
+
+# Carga explorer_moves con las partidas terminadas antes de que la API empezara a sumarlas en
+# handle_game_over (watermark "explorer_live"), así nunca cuenta dos veces la misma partida.
+# Es incremental: cada lote se escribe junto con el watermark "explorer_moves" (end_time, id)
+# de su última partida, y la próxima corrida retoma desde ahí en vez de recorrer todo `games`.
+# --rebuild vacía la tabla y mueve el corte a ahora: correrlo con la API apagada, si no se
+# pierden las partidas que la API sumó antes del borrado.
+
+WATERMARK = "explorer_moves"
+BATCH_SIZE = 5000  # partidas por lote
+UPSERT_BATCH_SIZE = 2000  # filas por INSERT (6 parámetros por fila, límite de Postgres 32767)
+
+
+async def save_watermark(session, name: str, last_at: datetime, last_id=None):
+    stmt = pg_insert(JobWatermark).values(
+        name=name, last_at=last_at, last_id=last_id, updated_at=datetime.now(timezone.utc)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobWatermark.name],
+        set_={"last_at": stmt.excluded.last_at, "last_id": stmt.excluded.last_id, "updated_at": stmt.excluded.updated_at}
+    )
+    await session.execute(stmt)
+
+
+async def flush(session, aggregated: dict, last: tuple) -> int:
+    rows = [
+        {"position_key": key, "move_uci": uci, "games": counts["games"],
+         "white_wins": counts["white_wins"], "draws": counts["draws"], "black_wins": counts["black_wins"]}
+        for (key, uci), counts in aggregated.items()
+    ]
+    rows.sort(key=lambda row: (row["position_key"], row["move_uci"]))
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        await upsert_explorer_moves(rows[i:i + UPSERT_BATCH_SIZE], session)
+    # Conteos y watermark juntos: un lote queda sumado entero o no queda
+    await save_watermark(session, WATERMARK, *last)
+    await session.commit()
+    aggregated.clear()
+    return len(rows)
+
+
+async def get_cutoff(session, rebuild: bool) -> datetime:
+    if rebuild:
+        await session.execute(delete(ExplorerMove))
+        await session.execute(delete(JobWatermark).where(JobWatermark.name == WATERMARK))
+        await save_watermark(session, LIVE_WATERMARK, datetime.now(timezone.utc))
+        await session.commit()
+
+    watermark = await session.get(JobWatermark, LIVE_WATERMARK)
+    if watermark:
+        return watermark.last_at
+    # La API todavía no arrancó con el registro en vivo: no suma nada, se cargan todas las terminadas hasta ahora
+    return datetime.now(timezone.utc)
+
+
+async def main(rebuild: bool):
+    async with AsyncSessionLocal() as session, AsyncSessionLocal() as writer:
+        cutoff = await get_cutoff(writer, rebuild)
+        print(f"Loading games finished before {cutoff.isoformat()}")
+
+        query = (
+            select(Game.id, Game.end_time, Game.pgn, Game.initial_fen, Game.result)
+            .where(
+                Game.status == GameStatus.completed,
+                Game.result.is_not(None),
+                Game.pgn.is_not(None),
+                Game.end_time <= cutoff
+            )
+            .order_by(Game.end_time, Game.id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        watermark = await writer.get(JobWatermark, WATERMARK)
+        if watermark:
+            query = query.where(tuple_(Game.end_time, Game.id) > tuple_(watermark.last_at, watermark.last_id))
+            print(f"Resuming after watermark {watermark.last_at.isoformat()}")
+        stream = await session.stream(query)
+
+        # Agregado en memoria por lote: una fila por (posición, jugada) en vez de una por partida
+        aggregated = defaultdict(lambda: {"games": 0, "white_wins": 0, "draws": 0, "black_wins": 0})
+        started = time.perf_counter()
+        games, rows = 0, 0
+        last = None
+        async for game_id, end_time, pgn, initial_fen, result in stream:
+            counts = result_counts(result)
+            moves = uci_moves(pgn, initial_fen, MAX_PLY)
+            for entry in explorer_entries(moves, position_keys(moves, initial_fen)):
+                row = aggregated[(entry.position_key, entry.move_uci)]
+                row["games"] += 1
+                for name, value in counts.items():
+                    row[name] += value
+
+            games += 1
+            last = (end_time, game_id)
+            if games % BATCH_SIZE == 0:
+                rows += await flush(writer, aggregated, last)
+                print(f"{games} games, {rows} rows written ({games / (time.perf_counter() - started):.0f} games/s)")
+
+        if aggregated:
+            rows += await flush(writer, aggregated, last)
+        print(f"Done: {games} games, {rows} rows upserted in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga el explorador de aperturas con las partidas terminadas.")
+    parser.add_argument("--rebuild", action="store_true", help="Vaciar explorer_moves y cargar desde la primera partida (con la API apagada)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rebuild))
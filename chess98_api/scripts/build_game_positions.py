@@ -0,0 +1,165 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import asyncpg
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import DATABASE_URL
+from app.utils.pgn import uci_moves
+from app.utils.zobrist import first_plies, position_keys
+
+# Carga game_positions con las partidas terminadas; las nuevas las agrega handle_game_over.
+# Reproducir las partidas con python-chess es CPU puro, así que lo hacen procesos worker
+# mientras el proceso principal lee la siguiente tanda y escribe con COPY las ya calculadas.
+# Es incremental: retoma desde el watermark "game_positions" (end_time, id) de job_watermarks.
+
+WATERMARK = "game_positions"
+BATCH_SIZE = 2000  # partidas por tarea de un worker
+WORKERS = os.cpu_count() or 4
+WRITERS = 2
+
+# Como en recalibrate_puzzle_ratings.py: las partidas de los últimos minutos quedan para la próxima corrida
+SAFETY_LAG = timedelta(minutes=5)
+
+COLUMNS = ("position_key", "ended_at", "game_id", "ply")
+
+GAMES_SQL = """
+    SELECT id, pgn, initial_fen, end_time FROM games
+    WHERE status = 'completed' AND pgn IS NOT NULL AND end_time IS NOT NULL
+      AND end_time < $1 AND (end_time, id) > ($2, $3)
+    ORDER BY end_time, id
+"""
+
+MERGE_SQL = f"""
+    INSERT INTO game_positions ({", ".join(COLUMNS)})
+    SELECT {", ".join(COLUMNS)} FROM game_positions_staging
+    ON CONFLICT DO NOTHING
+"""
+
+WATERMARK_SQL = """
+    INSERT INTO job_watermarks (name, last_at, last_id, updated_at) VALUES ($1, $2, $3, now())
+    ON CONFLICT (name) DO UPDATE SET last_at = EXCLUDED.last_at, last_id = EXCLUDED.last_id, updated_at = now()
+"""
+
+
+def replay_batch(games: list[tuple]) -> list[tuple]:
+    """
+    Corre en un proceso worker: (posición, ended_at, game_id, ply) de cada partida del batch.
+    """
+    rows = []
+    for game_id, pgn, initial_fen, ended_at in games:
+        keys = position_keys(uci_moves(pgn, initial_fen), initial_fen)
+        rows.extend((key, ended_at, game_id, ply) for key, ply in first_plies(keys).items())
+    return rows
+
+
+class WatermarkTracker:
+    """
+    Los batches terminan fuera de orden: el watermark solo avanza hasta el último batch contiguo escrito.
+    Volver a cargar un batch es idempotente (ON CONFLICT DO NOTHING), así que perder un avance no rompe nada.
+    """
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+        self.done: dict[int, tuple] = {}
+        self.next_batch = 0
+
+    async def complete(self, batch_no: int, last: tuple):
+        self.done[batch_no] = last
+        advanced = None
+        while self.next_batch in self.done:
+            advanced = self.done.pop(self.next_batch)
+            self.next_batch += 1
+        if advanced:
+            async with self.pool.acquire() as conn:
+                await conn.execute(WATERMARK_SQL, WATERMARK, *advanced)
+
+
+async def init_connection(conn: asyncpg.Connection):
+    await conn.execute(
+        "CREATE TEMP TABLE game_positions_staging (LIKE game_positions INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+
+
+async def write_rows(pool: asyncpg.Pool, rows: list[tuple]):
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.copy_records_to_table("game_positions_staging", records=rows, columns=COLUMNS)
+            await conn.execute(MERGE_SQL)
+
+
+async def read_batches(conn: asyncpg.Connection, until: datetime, last_at: datetime, last_id):
+    async with conn.transaction():
+        cursor = await conn.cursor(GAMES_SQL, until, last_at, last_id)
+        batch_no = 0
+        while records := await cursor.fetch(BATCH_SIZE):
+            yield batch_no, [tuple(record) for record in records]
+            batch_no += 1
+
+
+async def main(workers: int, rebuild: bool):
+    dsn = DATABASE_URL.replace("+asyncpg", "")
+    pool = await asyncpg.create_pool(dsn, min_size=WRITERS, max_size=WRITERS, init=init_connection)
+    reader = await asyncpg.connect(dsn)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    loop = asyncio.get_running_loop()
+
+    try:
+        if rebuild:
+            await reader.execute("TRUNCATE game_positions")
+            await reader.execute("DELETE FROM job_watermarks WHERE name = $1", WATERMARK)
+
+        watermark = await reader.fetchrow("SELECT last_at, last_id FROM job_watermarks WHERE name = $1", WATERMARK)
+        if watermark:
+            last_at, last_id = watermark["last_at"], watermark["last_id"]
+            print(f"Resuming after watermark {last_at.isoformat()}")
+        else:
+            last_at, last_id = datetime.min.replace(tzinfo=timezone.utc), UUID(int=0)
+
+        tracker = WatermarkTracker(pool)
+        stats = {"games": 0, "rows": 0, "started": time.perf_counter()}
+
+        async def process(batch_no: int, games: list[tuple]):
+            rows = await loop.run_in_executor(executor, replay_batch, games)
+            await write_rows(pool, rows)
+            await tracker.complete(batch_no, (games[-1][3], games[-1][0]))
+
+            stats["games"] += len(games)
+            stats["rows"] += len(rows)
+            elapsed = time.perf_counter() - stats["started"]
+            print(f"{stats['games']:,} games, {stats['rows']:,} positions ({stats['games'] / elapsed:,.0f} games/s)")
+
+        # Hasta 2 batches por worker en vuelo: los procesos nunca esperan a la lectura
+        pending = set()
+        until = datetime.now(timezone.utc) - SAFETY_LAG
+        async for batch_no, games in read_batches(reader, until, last_at, last_id):
+            pending.add(asyncio.create_task(process(batch_no, games)))
+            if len(pending) >= workers * 2:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()  # propaga el error y corta la carga
+        await asyncio.gather(*pending)
+
+        elapsed = time.perf_counter() - stats["started"]
+        print(f"Done: {stats['games']:,} games, {stats['rows']:,} positions in {elapsed:.1f}s.")
+    finally:
+        executor.shutdown(cancel_futures=True)
+        await reader.close()
+        await pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga el índice de posiciones (game_positions) de las partidas terminadas.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Procesos reproduciendo partidas en paralelo")
+    parser.add_argument("--rebuild", action="store_true", help="Vaciar game_positions y empezar desde la primera partida")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.workers, args.rebuild))
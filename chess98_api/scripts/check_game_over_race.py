@@ -0,0 +1,149 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func, select
+
+from app.constants.rating import DEFAULT_RATINGS
+from app.database.connection import AsyncSessionLocal
+from app.models.game import Game, GameResult, GameStatus, GameTermination
+from app.models.profile import Profile
+from app.models.profile_rating import ProfileRating
+from app.models.rating_history import RatingHistory
+from app.schemas.active_game import ActiveGame, PlayerColor
+from app.services.game import create_game, handle_game_over, map_result
+
+# Termina la misma partida desde dos tasks a la vez (p. ej. timeout + resign) y verifica el resultado
+# en la base: la partida queda con uno de los dos finales, cada perfil suma exactamente una partida
+# (estadísticas y ratings.games), el rating cambia una sola vez y hay un solo punto de historial por jugador.
+#
+# OJO: crea partidas y cambia ratings de verdad, usar solo contra una base de desarrollo.
+
+# Mate del pastor al revés (gana negras en 4 jugadas)
+MOVES_SAN = ["f3", "e5", "g4", "Qh4#"]
+MOVES_UCI = ["f2f3", "e7e5", "g2g4", "d8h4"]
+FINAL_FEN = "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3"
+CATEGORY = "blitz"
+
+async def snapshot(user_ids: list) -> dict:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(
+                Profile.user_id, Profile.total_games, Profile.wins, Profile.losses, Profile.draws,
+                ProfileRating.rating, ProfileRating.games
+            )
+            .outerjoin(ProfileRating, (ProfileRating.profile_id == Profile.id) & (ProfileRating.category == CATEGORY))
+            .where(Profile.user_id.in_(user_ids))
+        )
+        # Sin fila de rating en la categoría: apply_rating_delta la crea desde el rating por defecto
+        return {
+            row.user_id: {
+                "total_games": row.total_games, "wins": row.wins, "losses": row.losses, "draws": row.draws,
+                "rating": row.rating if row.rating is not None else DEFAULT_RATINGS[CATEGORY],
+                "games": row.games or 0,
+            }
+            for row in result.all()
+        }
+
+
+async def finish(active_game: ActiveGame, result: GameResult, termination: GameTermination):
+    async with AsyncSessionLocal() as db:
+        await handle_game_over(active_game.game_id, active_game, result, termination, db)
+
+
+async def race_once(white_id, black_id) -> list[str]:
+    before = await snapshot([white_id, black_id])
+    async with AsyncSessionLocal() as db:
+        game = await create_game(
+            db, white_id, black_id, "3+0", CATEGORY,
+            white_rating=before[white_id]["rating"],
+            black_rating=before[black_id]["rating"]
+        )
+
+    active_game = ActiveGame(
+        game_id=game.id,
+        white_id=white_id,
+        black_id=black_id,
+        current_fen=FINAL_FEN,
+        turn=PlayerColor.white,
+        initial_time=180,
+        increment=0,
+        time_control_str=CATEGORY,
+        white_time_remaining=0,
+        black_time_remaining=120,
+        moves_san=MOVES_SAN,
+        moves_uci=MOVES_UCI,
+        white_rating=game.white_rating,
+        black_rating=game.black_rating
+    )
+
+    # Dos finales distintos para la misma partida: el que gane el guard decide el resultado
+    endings = {
+        (GameResult.black_win, GameTermination.checkmate),
+        (GameResult.white_win, GameTermination.timeout),
+    }
+    await asyncio.gather(*(finish(active_game, result, termination) for result, termination in endings))
+
+    errors = []
+    after = await snapshot([white_id, black_id])
+    async with AsyncSessionLocal() as db:
+        game = await db.get(Game, game.id)
+        points = await db.execute(select(func.count()).select_from(RatingHistory).where(RatingHistory.game_id == game.id))
+        points = points.scalar_one()
+    if game.status != GameStatus.completed:
+        errors.append(f"game status is {game.status}")
+    if (game.result, game.termination) not in endings:
+        errors.append(f"game ended as {game.result} by {game.termination}")
+    if points != 2:
+        errors.append(f"{points} rating history points for the game, expected 2")
+
+    outcomes = {
+        white_id: (PlayerColor.white, game.white_rating_change),
+        black_id: (PlayerColor.black, game.black_rating_change),
+    }
+    for user_id, (color, rating_change) in outcomes.items():
+        outcome = map_result(game.result, color)
+        expected = {
+            "total_games": 1,
+            "wins": int(outcome == "win"),
+            "losses": int(outcome == "loss"),
+            "draws": int(outcome == "draw"),
+            "games": 1,
+            "rating": rating_change,
+        }
+        for field, delta in expected.items():
+            got = after[user_id][field] - before[user_id][field]
+            if got != delta:
+                errors.append(f"{color.value} {field} changed by {got}, expected {delta}")
+    return errors
+
+
+async def main(runs: int):
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.execute(select(Profile.user_id).limit(2))).scalars().all()
+    if len(user_ids) < 2:
+        print("Need at least two profiles.")
+        return
+
+    failures = 0
+    for run in range(runs):
+        errors = await race_once(*user_ids)
+        failures += bool(errors)
+        for error in errors:
+            print(f"Run {run + 1}: {error}")
+
+    print(f"{runs - failures}/{runs} runs finalized exactly once.")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Termina la misma partida desde dos tasks y verifica que se finaliza una sola vez.")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.runs))
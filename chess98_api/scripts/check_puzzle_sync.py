@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+import asyncio
+import csv
+import json
+import tempfile
+
+import asyncpg
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import DATABASE_URL
+from scripts.import_puzzles import BATCH_SIZE, init_connection, sync_puzzles
+
+# Importa un puzzle con --sync, lo vuelve a importar con otra solución (FEN, jugadas y partida distintas)
+# y verifica que las columnas cambiaron, no solo el row_hash. Al final borra el puzzle.
+#
+# OJO: escribe en la tabla puzzles, usar solo contra una base de desarrollo.
+
+PUZZLE_ID = "00sync"
+HEADER = ["PuzzleId", "FEN", "Moves", "Rating", "RatingDeviation", "Popularity", "NbPlays", "Themes", "GameUrl", "OpeningTags"]
+
+ORIGINAL = {
+    "FEN": "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+    "Moves": "e7e5 g1f3",
+    "GameUrl": "https://lichess.org/sync0001#1",
+}
+CHANGED = {
+    "FEN": "rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 1",
+    "Moves": "d7d5 c2c4",
+    "GameUrl": "https://lichess.org/sync0002#1",
+}
+
+
+def write_csv(path: Path, fields: dict):
+    row = {"PuzzleId": PUZZLE_ID, "Rating": "1500", "RatingDeviation": "80", "Popularity": "90",
+           "NbPlays": "10", "Themes": "opening short", "OpeningTags": "", **fields}
+    with open(path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(HEADER)
+        writer.writerow([row[name] for name in HEADER])
+
+
+async def stored(pool: asyncpg.Pool) -> dict:
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow("SELECT fen, moves, game_url, row_hash FROM puzzles WHERE id = $1", PUZZLE_ID)
+    moves = json.loads(row["moves"]) if isinstance(row["moves"], str) else row["moves"]
+    return {"FEN": row["fen"], "Moves": " ".join(moves), "GameUrl": row["game_url"], "row_hash": row["row_hash"]}
+
+
+async def main():
+    pool = await asyncpg.create_pool(DATABASE_URL.replace("+asyncpg", ""), min_size=1, max_size=1, init=init_connection)
+    async with pool.acquire() as conn:
+        exists = await conn.fetchval("SELECT 1 FROM puzzles WHERE id = $1", PUZZLE_ID)
+    if exists:
+        await pool.close()
+        raise SystemExit(f"Puzzle {PUZZLE_ID} already exists, refusing to overwrite it.")
+
+    errors = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "puzzles.csv"
+
+            write_csv(path, ORIGINAL)
+            await sync_puzzles(pool, path, 1, BATCH_SIZE, False)
+            before = await stored(pool)
+
+            write_csv(path, CHANGED)
+            await sync_puzzles(pool, path, 1, BATCH_SIZE, False)
+            after = await stored(pool)
+
+        for field, value in CHANGED.items():
+            if after[field] != value:
+                errors.append(f"{field} is {after[field]!r}, expected {value!r}")
+        if after["row_hash"] == before["row_hash"]:
+            errors.append("row_hash did not change")
+    finally:
+        async with pool.acquire() as conn:
+            await conn.execute("DELETE FROM puzzles WHERE id = $1", PUZZLE_ID)
+        await pool.close()
+
+    for error in errors:
+        print(error)
+    if errors:
+        sys.exit(1)
+    print("Re-import updated fen, moves and game_url.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
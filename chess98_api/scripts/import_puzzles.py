@@ -1,61 +1,343 @@
 import sys
 from pathlib import Path
-import csv
+import argparse
 import asyncio
+import csv
+import hashlib
+import io
+import json
+import time
+from typing import Optional
+
+import asyncpg
+import numpy as np
 
 # Agregar la raíz del proyecto al path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import insert
+from app.cache.puzzle_index import MARK_CHANGED_SQL, RELOAD_CHECK_INTERVAL
+from app.core.config import DATABASE_URL
+
+
+CSV_PATH = "puzzles.csv"  # o directamente lichess_db_puzzle.csv.zst (requiere `pip install zstandard`)
+BATCH_SIZE = 50000
+WORKERS = 4
+
+COLUMNS = (
+    "id", "fen", "moves", "rating", "rating_deviation", "popularity",
+    "times_played", "themes", "game_url", "row_hash", "retired"
+)
+ROW_HASH = COLUMNS.index("row_hash")
+
+# Campos del CSV que entran en row_hash (NbPlays cambia en cada dump y no lo usamos)
+HASHED_FIELDS = ("FEN", "Moves", "Rating", "RatingDeviation", "Popularity", "Themes", "GameUrl")
+
+# Cada batch se copia con COPY a una tabla temporal de la conexión y se mezcla con un upsert.
+# Un re-import actualiza todos los campos de HASHED_FIELDS (si no, el row_hash nuevo taparía una solución
+# vieja y --sync no la corregiría nunca); times_played es nuestro y no se toca.
+MERGE_SQL = f"""
+    INSERT INTO puzzles ({", ".join(COLUMNS)})
+    SELECT {", ".join(COLUMNS)} FROM puzzles_staging
+    ON CONFLICT (id) DO UPDATE SET
+        fen = EXCLUDED.fen,
+        moves = EXCLUDED.moves,
+        rating = EXCLUDED.rating,
+        rating_deviation = EXCLUDED.rating_deviation,
+        popularity = EXCLUDED.popularity,
+        themes = EXCLUDED.themes,
+        game_url = EXCLUDED.game_url,
+        row_hash = EXCLUDED.row_hash,
+        retired = false
+"""
+
+
+def open_csv(path: Path):
+    if path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("Para leer el .zst directamente hace falta zstandard: pip install zstandard")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+    return open(path, newline="", encoding="utf-8")
+
+
+def row_hash(row: list[str], col: dict[str, int]) -> int:
+    fields = "\x1f".join(row[col[name]] for name in HASHED_FIELDS)
+    return int.from_bytes(hashlib.blake2b(fields.encode(), digest_size=8).digest(), "little", signed=True)
+
+
+def parse_row(row: list[str], col: dict[str, int]) -> tuple:
+    return (
+        row[col["PuzzleId"]],
+        row[col["FEN"]],
+        json.dumps(row[col["Moves"]].split()),
+        float(row[col["Rating"]]),
+        float(row[col["RatingDeviation"]]),
+        float(row[col["Popularity"]]),
+        0,
+        json.dumps(row[col["Themes"]].split()),
+        row[col["GameUrl"]] or None,
+        row_hash(row, col),
+        False,
+    )
+
+
+def read_batches(path: Path, skip_rows: int, batch_size: int):
+    """
+    Lee el CSV en streaming y devuelve (número de batch, filas). Las primeras `skip_rows`
+    (ya importadas según el checkpoint) se saltan sin parsear.
+    """
+    with open_csv(path) as csvfile:
+        reader = csv.reader(csvfile)
+        col = {name: i for i, name in enumerate(next(reader))}
+
+        batch, batch_no = [], skip_rows // batch_size
+        for i, row in enumerate(reader):
+            if i < skip_rows:
+                continue
+            batch.append(parse_row(row, col))
+            if len(batch) >= batch_size:
+                yield batch_no, batch
+                batch, batch_no = [], batch_no + 1
+
+        if batch:
+            yield batch_no, batch
+
+
+class Checkpoint:
+    """
+    Guarda cuántas filas del archivo están importadas. Los batches terminan fuera de orden,
+    así que solo avanza hasta el último batch contiguo completado. Re-importar un batch es
+    idempotente (upsert), así que perder el último checkpoint no rompe nada.
+    """
+    def __init__(self, path: Path, batch_size: int, restart: bool):
+        self.path = path
+        self.batch_size = batch_size
+        self.done: dict[int, int] = {}
+
+        self.rows = 0
+        if path.exists() and not restart:
+            self.rows = json.loads(path.read_text())["rows"]
+        self.next_batch = self.rows // batch_size
+
+    def complete(self, batch_no: int, rows: int):
+        self.done[batch_no] = rows
+        while self.next_batch in self.done:
+            self.rows += self.done.pop(self.next_batch)
+            self.next_batch += 1
+        self.path.write_text(json.dumps({"rows": self.rows}))
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+async def init_connection(conn: asyncpg.Connection):
+    await conn.execute(
+        "CREATE TEMP TABLE puzzles_staging (LIKE puzzles INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+
+
+async def load_batch(pool: asyncpg.Pool, rows: list[tuple]):
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.copy_records_to_table("puzzles_staging", records=rows, columns=COLUMNS)
+            await conn.execute(MERGE_SQL)
+
 
-from app.database.connection import AsyncSessionLocal
-from app.models.puzzle import Puzzle
+class PuzzleHashes:
+    """
+    row_hash de todos los puzzles de la base en arrays de NumPy ordenados por id (~13 bytes por puzzle),
+    para decidir en bloque qué filas del dump cambiaron sin consultar la base por cada una.
+    """
+    def __init__(self, ids: np.ndarray, hashes: np.ndarray, retired: np.ndarray):
+        order = np.argsort(ids)
+        self.ids = ids[order]
+        self.hashes = hashes[order]
+        self.retired = retired[order]
+        self.seen = np.zeros(len(ids), dtype=bool)
 
+    @classmethod
+    async def load(cls, pool: asyncpg.Pool) -> "PuzzleHashes":
+        ids, hashes, retired = [np.array([], dtype="S1")], [np.array([], dtype=np.int64)], [np.array([], dtype=bool)]
 
-CSV_PATH = "puzzles.csv"
-BATCH_SIZE = 1000
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                cursor = await conn.cursor("SELECT id, row_hash, retired FROM puzzles")
+                while records := await cursor.fetch(BATCH_SIZE):
+                    ids.append(np.array([record[0].encode() for record in records]))
+                    # Los retirados cuentan como distintos para que el merge los reactive si vuelven al dump
+                    hashes.append(np.array([0 if record[2] else record[1] or 0 for record in records], dtype=np.int64))
+                    retired.append(np.array([record[2] for record in records], dtype=bool))
 
-def parse_row(row: dict) -> dict:
-    return {
-        "id": row["PuzzleId"],
-        "fen": row["FEN"],
-        "moves": row["Moves"].split(),
-        "rating": float(row["Rating"]),
-        "rating_deviation": float(row["RatingDeviation"]),
-        "popularity": float(row["Popularity"]),
-        "times_played": 0,
-        "themes": row["Themes"].split(),
-        "game_url": row["GameUrl"] or None,
-    }
+        return cls(np.concatenate(ids), np.concatenate(hashes), np.concatenate(retired))
 
+    def __len__(self) -> int:
+        return len(self.ids)
 
-async def insert_batch(session: AsyncSession, batch: list[dict]):
-    await session.execute(insert(Puzzle), batch)
-    await session.commit()
+    def changed(self, rows: list[tuple]) -> list[tuple]:
+        if not len(self.ids):
+            return rows
 
+        ids = np.array([row[0].encode() for row in rows])
+        hashes = np.array([row[ROW_HASH] for row in rows], dtype=np.int64)
 
-async def bulk_insert_puzzles():
-    async with AsyncSessionLocal() as session:
-        with open(CSV_PATH, newline="", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
+        pos = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+        found = self.ids[pos] == ids
+        self.seen[pos[found]] = True
 
-            batch = []
-            count = 0
+        unchanged = found & (self.hashes[pos] == hashes)
+        return [row for row, skip in zip(rows, unchanged) if not skip]
 
-            for row in reader:
-                batch.append(parse_row(row))
-                if len(batch) >= BATCH_SIZE:
-                    await insert_batch(session, batch)
-                    count += len(batch)
-                    print(f"Inserted {count} puzzles...")
-                    batch.clear()
+    def missing(self) -> list[str]:
+        return [puzzle_id.decode() for puzzle_id in self.ids[~self.seen & ~self.retired]]
 
-            if batch:
-                await insert_batch(session, batch)
-                count += len(batch)
-                print(f"Inserted final batch. Total: {count} puzzles.")
+
+def changed_batches(path: Path, hashes: PuzzleHashes, batch_size: int, stats: dict):
+    """
+    Solo las filas nuevas o con row_hash distinto, reagrupadas en batches de `batch_size`.
+    """
+    pending, batch_no = [], 0
+    for _, rows in read_batches(path, 0, batch_size):
+        stats["read"] += len(rows)
+        pending.extend(hashes.changed(rows))
+        if len(pending) >= batch_size:
+            yield batch_no, pending[:batch_size]
+            pending, batch_no = pending[batch_size:], batch_no + 1
+
+    if pending:
+        yield batch_no, pending
+
+
+async def retire_missing(pool: asyncpg.Pool, puzzle_ids: list[str]):
+    async with pool.acquire() as conn:
+        for i in range(0, len(puzzle_ids), BATCH_SIZE):
+            await conn.execute(
+                "UPDATE puzzles SET retired = true WHERE id = ANY($1::varchar[]) AND NOT retired",
+                puzzle_ids[i:i + BATCH_SIZE]
+            )
+
+
+async def worker(pool: asyncpg.Pool, queue: asyncio.Queue, checkpoint: Optional[Checkpoint], progress: dict):
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+
+        batch_no, rows = item
+        if progress["error"]:
+            continue  # solo vaciar la cola, el import se corta
+
+        try:
+            await load_batch(pool, rows)
+        except Exception as e:
+            progress["error"] = e
+            continue
+        if checkpoint:
+            checkpoint.complete(batch_no, len(rows))
+
+        progress["rows"] += len(rows)
+        elapsed = time.perf_counter() - progress["started"]
+        print(
+            f"Batch {batch_no}: {progress['rows']:,} puzzles in {elapsed:.0f}s "
+            f"({progress['rows'] / elapsed:,.0f} rows/s)"
+            + (f", checkpoint at {checkpoint.rows:,}" if checkpoint else "")
+        )
+
+
+async def load_batches(pool: asyncpg.Pool, batches, workers: int, checkpoint: Optional[Checkpoint]) -> dict:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    progress = {"rows": 0, "started": time.perf_counter(), "error": None}
+    tasks = [asyncio.create_task(worker(pool, queue, checkpoint, progress)) for _ in range(workers)]
+
+    try:
+        for batch in batches:
+            if progress["error"]:
+                break
+            await queue.put(batch)
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    progress["elapsed"] = time.perf_counter() - progress["started"]
+    return progress
+
+
+async def import_puzzles(pool: asyncpg.Pool, path: Path, workers: int, batch_size: int, restart: bool):
+    checkpoint = Checkpoint(path.with_name(path.name + ".checkpoint"), batch_size, restart)
+    if checkpoint.rows:
+        print(f"Resuming from checkpoint: skipping {checkpoint.rows:,} rows already imported")
+
+    progress = await load_batches(pool, read_batches(path, checkpoint.rows, batch_size), workers, checkpoint)
+    if progress["error"]:
+        raise SystemExit(
+            f"Import failed: {progress['error']!r}. Checkpoint at {checkpoint.rows:,} rows, re-run to resume."
+        )
+
+    checkpoint.clear()
+    print(f"Done. {progress['rows']:,} puzzles in {progress['elapsed']:.0f}s ({progress['rows'] / max(progress['elapsed'], 1e-9):,.0f} rows/s).")
+
+
+async def sync_puzzles(pool: asyncpg.Pool, path: Path, workers: int, batch_size: int, retire: bool):
+    """
+    Aplica solo lo que cambió respecto a la base: sin checkpoint, re-ejecutarlo saltea lo ya aplicado.
+    """
+    started = time.perf_counter()
+    hashes = await PuzzleHashes.load(pool)
+    print(f"Loaded {len(hashes):,} row hashes in {time.perf_counter() - started:.0f}s")
+
+    stats = {"read": 0}
+    progress = await load_batches(pool, changed_batches(path, hashes, batch_size, stats), workers, None)
+    if progress["error"]:
+        raise SystemExit(f"Sync failed: {progress['error']!r}. Re-run to continue, applied rows are skipped.")
+
+    print(f"Synced. {stats['read']:,} rows read, {progress['rows']:,} new or changed applied in {progress['elapsed']:.0f}s.")
+
+    missing = hashes.missing()
+    if retire:
+        await retire_missing(pool, missing)
+        print(f"Retired {len(missing):,} puzzles no longer in the dump.")
+    elif missing:
+        print(f"{len(missing):,} puzzles are no longer in the dump. Use --retire-missing to retire them.")
+
+
+async def main(args):
+    pool = await asyncpg.create_pool(
+        DATABASE_URL.replace("+asyncpg", ""),
+        min_size=args.workers,
+        max_size=args.workers,
+        init=init_connection
+    )
+    try:
+        path = Path(args.path)
+        if args.sync:
+            await sync_puzzles(pool, path, args.workers, args.batch_size, args.retire_missing)
+        else:
+            await import_puzzles(pool, path, args.workers, args.batch_size, args.restart)
+
+        async with pool.acquire() as conn:
+            await conn.execute(MARK_CHANGED_SQL)
+    finally:
+        await pool.close()
+
+    print(f"La API recarga el índice de puzzles en memoria en menos de {RELOAD_CHECK_INTERVAL}s.")
 
 
 if __name__ == "__main__":
-    asyncio.run(bulk_insert_puzzles())
+    parser = argparse.ArgumentParser(description="Importa (o actualiza) la base de puzzles de Lichess con COPY.")
+    parser.add_argument("path", nargs="?", default=CSV_PATH, help="CSV o .csv.zst de https://database.lichess.org/#puzzles")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Conexiones cargando batches en paralelo")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Ignorar el checkpoint y empezar desde el principio")
+    parser.add_argument("--sync", action="store_true", help="Aplicar solo puzzles nuevos o con cambios (compara row_hash)")
+    parser.add_argument("--retire-missing", action="store_true", help="Con --sync, retirar los puzzles que ya no están en el dump")
+    args = parser.parse_args()
+
+    if args.retire_missing and not args.sync:
+        parser.error("--retire-missing requires --sync")
+
+    asyncio.run(main(args))
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+import asyncio
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.database.connection import AsyncSessionLocal
+from app.services.rating_histogram import rebuild_rating_histograms
+
+
+async def main():
+    async with AsyncSessionLocal() as session:
+        buckets = await rebuild_rating_histograms(session)
+        print(f"Rating histograms rebuilt. {buckets} buckets.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,235 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import Float, String, column, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.cache.puzzle_index import mark_puzzles_changed
+from app.constants.rating import DEFAULT_VOLATILITY
+from app.database.connection import AsyncSessionLocal
+from app.models.job_watermark import JobWatermark
+from app.models.puzzle import Puzzle
+from app.models.puzzle_solve import PuzzleSolve, PuzzleSolveStatus
+from app.utils.glicko2 import rate_period_batch
+
+# Recalcula rating, RD y volatilidad de los puzzles con Glicko-2 a partir de puzzle_solves.
+# Cada intento es una partida del puzzle contra el jugador (el puzzle gana si el jugador falla).
+# Es incremental: solo procesa los solves posteriores al watermark "puzzle_ratings" y lo avanza
+# en la misma transacción en la que escribe los ratings.
+#
+# - Solo cuentan los solves rateados (rating_delta != 0): ni SKIPPED ni puzzle rush.
+# - Un re-import / --sync de Lichess vuelve a pisar el rating de los puzzles que cambiaron en el dump.
+# - Marca el índice de puzzles como cambiado: la API rearma PuzzleIndex con los ratings nuevos sola.
+
+WATERMARK = "puzzle_ratings"
+BATCH_SIZE = 10000
+UPDATE_BATCH_SIZE = 5000  # filas por UPDATE (límite de parámetros de Postgres)
+
+# El RD del jugador no queda guardado en el solve: se usa uno fijo, típico de un jugador activo
+PLAYER_RD = 80.0
+
+# Los solves de los últimos minutos pueden seguir en transacciones sin commitear con un solved_at
+# anterior al último visible: se dejan para la próxima corrida para no saltarlos.
+SAFETY_LAG = timedelta(minutes=5)
+
+
+class PuzzleRatings:
+    """
+    Ratings de los puzzles tocados por la corrida en arrays de NumPy, con índice denso por id.
+    Se cargan a medida que aparecen en los solves, así una corrida incremental no lee toda la tabla.
+    """
+    def __init__(self):
+        self.index: dict[str, int] = {}
+        self.ids: list[str] = []
+        self.ratings = np.empty(0)
+        self.rds = np.empty(0)
+        self.volatilities = np.empty(0)
+        self.touched = np.empty(0, dtype=bool)
+
+    async def load_missing(self, session, puzzle_ids: set[str]):
+        missing = [puzzle_id for puzzle_id in puzzle_ids if puzzle_id not in self.index]
+        if not missing:
+            return
+
+        rows = []
+        for i in range(0, len(missing), BATCH_SIZE):
+            result = await session.execute(
+                select(Puzzle.id, Puzzle.rating, Puzzle.rating_deviation, Puzzle.volatility)
+                .where(Puzzle.id.in_(missing[i:i + BATCH_SIZE]))
+            )
+            rows.extend(result.all())
+
+        if not rows:
+            return
+
+        for puzzle_id, *_ in rows:
+            self.index[puzzle_id] = len(self.ids)
+            self.ids.append(puzzle_id)
+
+        ratings, rds, volatilities = (np.array(col, dtype=np.float64) for col in zip(*rows))
+        self.ratings = np.concatenate([self.ratings, ratings])
+        self.rds = np.concatenate([self.rds, rds])
+        self.volatilities = np.concatenate([self.volatilities, volatilities])
+        self.touched = np.concatenate([self.touched, np.zeros(len(rows), dtype=bool)])
+
+    def rate_period(self, puzzle_idx: np.ndarray, player_ratings: np.ndarray, scores: np.ndarray):
+        """
+        Un período de rating: cada intento es una partida del puzzle contra un "jugador" propio con
+        el rating que tenía el usuario en ese momento. Solo se re-ratean los puzzles con intentos.
+        """
+        active, local_idx = np.unique(puzzle_idx, return_inverse=True)
+        n, m = len(active), len(player_ratings)
+
+        ratings, rds, volatilities = rate_period_batch(
+            np.concatenate([self.ratings[active], player_ratings]),
+            np.concatenate([self.rds[active], np.full(m, PLAYER_RD)]),
+            np.concatenate([self.volatilities[active], np.full(m, DEFAULT_VOLATILITY)]),
+            local_idx,
+            n + np.arange(m),
+            scores
+        )
+
+        self.ratings[active] = ratings[:n]
+        self.rds[active] = rds[:n]
+        self.volatilities[active] = volatilities[:n]
+        self.touched[active] = True
+
+    def updated_rows(self) -> list[tuple[str, float, float, float]]:
+        return [
+            (self.ids[i], float(self.ratings[i]), float(self.rds[i]), float(self.volatilities[i]))
+            for i in np.flatnonzero(self.touched)
+        ]
+
+
+async def write_ratings(session, rows: list[tuple[str, float, float, float]]):
+    for i in range(0, len(rows), UPDATE_BATCH_SIZE):
+        new = values(
+            column("id", String), column("rating", Float), column("rd", Float), column("volatility", Float),
+            name="new_ratings"
+        ).data(rows[i:i + UPDATE_BATCH_SIZE])
+
+        await session.execute(
+            update(Puzzle)
+            .where(Puzzle.id == new.c.id)
+            .values(rating=new.c.rating, rating_deviation=new.c.rd, volatility=new.c.volatility)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def save_watermark(session, last_at: datetime, last_id):
+    stmt = pg_insert(JobWatermark).values(
+        name=WATERMARK, last_at=last_at, last_id=last_id, updated_at=datetime.now(timezone.utc)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobWatermark.name],
+        set_={"last_at": stmt.excluded.last_at, "last_id": stmt.excluded.last_id, "updated_at": stmt.excluded.updated_at}
+    )
+    await session.execute(stmt)
+
+
+async def main(period_hours: int, apply: bool):
+    period_seconds = period_hours * 3600
+    until = datetime.now(timezone.utc) - SAFETY_LAG
+
+    # `lookup` lee los ratings de los puzzles mientras `session` tiene abierto el stream de solves
+    async with AsyncSessionLocal() as session, AsyncSessionLocal() as lookup:
+        watermark = await session.get(JobWatermark, WATERMARK)
+
+        query = (
+            select(PuzzleSolve.id, PuzzleSolve.puzzle_id, PuzzleSolve.solved_at, PuzzleSolve.status, PuzzleSolve.rating_before)
+            .where(
+                PuzzleSolve.rating_delta != 0,
+                PuzzleSolve.rating_before.is_not(None),
+                PuzzleSolve.status != PuzzleSolveStatus.SKIPPED,
+                PuzzleSolve.solved_at < until,
+            )
+            .order_by(PuzzleSolve.solved_at, PuzzleSolve.id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        if watermark:
+            query = query.where(
+                tuple_(PuzzleSolve.solved_at, PuzzleSolve.id) > tuple_(watermark.last_at, watermark.last_id)
+            )
+            print(f"Resuming after watermark {watermark.last_at.isoformat()}")
+
+        puzzles = PuzzleRatings()
+        period = {"number": None, "puzzles": [], "players": [], "scores": []}
+        stats = {"solves": 0, "periods": 0, "rating_seconds": 0.0}
+        last = None
+
+        async def close_period():
+            if not period["puzzles"]:
+                return
+            await puzzles.load_missing(lookup, set(period["puzzles"]))
+
+            started = time.perf_counter()
+            # Puzzles borrados desde el solve: no tienen rating que actualizar
+            known = [i for i, puzzle_id in enumerate(period["puzzles"]) if puzzle_id in puzzles.index]
+            if not known:
+                period["puzzles"], period["players"], period["scores"] = [], [], []
+                return
+            puzzles.rate_period(
+                np.array([puzzles.index[period["puzzles"][i]] for i in known], dtype=np.int64),
+                np.array(period["players"], dtype=np.float64)[known],
+                np.array(period["scores"], dtype=np.float64)[known]
+            )
+            stats["rating_seconds"] += time.perf_counter() - started
+            stats["periods"] += 1
+
+            period["puzzles"], period["players"], period["scores"] = [], [], []
+
+        started = time.perf_counter()
+        stream = await session.stream(query)
+        async for solve in stream:
+            number = int(solve.solved_at.timestamp()) // period_seconds
+            if number != period["number"]:
+                await close_period()
+                period["number"] = number
+
+            period["puzzles"].append(solve.puzzle_id)
+            period["players"].append(solve.rating_before)
+            period["scores"].append(1.0 if solve.status == PuzzleSolveStatus.FAILED else 0.0)
+            stats["solves"] += 1
+            last = solve
+        await close_period()
+
+        if last is None:
+            print("No new rated solves since the last run.")
+            return
+
+        rows = puzzles.updated_rows()
+        elapsed = time.perf_counter() - started
+        print(
+            f"{stats['solves']} solves in {stats['periods']} periods -> {len(rows)} puzzles "
+            f"in {elapsed:.1f}s ({stats['solves'] / elapsed:.0f} solves/s, "
+            f"Glicko-2 {stats['rating_seconds']:.2f}s)"
+        )
+
+        if not apply:
+            print(f"Dry run: {len(rows)} puzzle ratings would be updated. Use --apply to write them.")
+            return
+
+        # Ratings y watermark en la misma transacción: si algo falla la próxima corrida repite todo el tramo
+        await write_ratings(session, rows)
+        await save_watermark(session, last.solved_at, last.id)
+        await mark_puzzles_changed(session)
+        await session.commit()
+        print(f"Updated {len(rows)} puzzles. Watermark at {last.solved_at.isoformat()}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalibra los ratings de los puzzles con Glicko-2 desde puzzle_solves (incremental).")
+    parser.add_argument("--period-hours", type=int, default=24, help="Duración de cada período de rating en horas")
+    parser.add_argument("--apply", action="store_true", help="Escribir los ratings y avanzar el watermark")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.period_hours, args.apply))
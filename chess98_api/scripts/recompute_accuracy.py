@@ -0,0 +1,105 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import time
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import Float, Integer, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from app.database.connection import AsyncSessionLocal
+from app.models.analysis_job import AnalysisJob, AnalysisJobStatus
+from app.models.game import Game
+from app.models.move import Move, MoveColor
+from app.services.analysis import accuracy_values
+from app.utils.accuracy import PlayerAccuracy
+
+# Recalcula el resumen de precisión (precisión, ACPL y errores) de las partidas ya analizadas
+# desde las evaluaciones guardadas en `moves`. Sin --all solo completa las que no lo tienen
+# (analizadas antes de que existiera el resumen); --all rehace todas, p. ej. si cambian las fórmulas.
+#
+# La evaluación de la posición inicial no se guarda: se usa INITIAL_EVAL, así que la primera jugada
+# puede diferir apenas de lo que calculó el worker.
+
+BATCH_SIZE = 20000  # jugadas por lote del stream
+UPDATE_BATCH_SIZE = 2000  # partidas por UPDATE (11 parámetros por fila, límite de Postgres 32767)
+
+SUMMARY_COLUMNS = [f"{color}_{field}" for color in ("white", "black") for field in PlayerAccuracy._fields]
+
+
+async def write_summaries(session, rows: list[tuple]):
+    types = {"accuracy": Float}
+    summaries = values(
+        column("id", PG_UUID(as_uuid=True)),
+        *(column(name, types.get(name.split("_", 1)[1], Integer)) for name in SUMMARY_COLUMNS),
+        name="summaries"
+    ).data(rows)
+
+    await session.execute(
+        update(Game)
+        .where(Game.id == summaries.c.id)
+        .values({name: summaries.c[name] for name in SUMMARY_COLUMNS})
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def main(recompute_all: bool):
+    async with AsyncSessionLocal() as session, AsyncSessionLocal() as writer:
+        analyzed = select(AnalysisJob.game_id).where(AnalysisJob.status == AnalysisJobStatus.DONE)
+        if not recompute_all:
+            analyzed = analyzed.join(Game, Game.id == AnalysisJob.game_id).where(Game.white_accuracy.is_(None))
+
+        stream = await session.stream(
+            select(Move.game_id, Move.color, Move.evaluation)
+            .where(Move.game_id.in_(analyzed))
+            .order_by(Move.game_id, Move.move_number)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+
+        started = time.perf_counter()
+        stats = {"games": 0, "skipped": 0}
+        pending = []
+
+        async def close_game(moves: list):
+            evaluations = [move.evaluation for move in moves]
+            if any(evaluation is None for evaluation in evaluations):
+                stats["skipped"] += 1  # análisis a medias: lo completa el worker
+                return
+
+            summary = accuracy_values(evaluations, moves[0].color == MoveColor.white)
+            pending.append((moves[0].game_id, *(summary[name] for name in SUMMARY_COLUMNS)))
+            stats["games"] += 1
+
+            if len(pending) >= UPDATE_BATCH_SIZE:
+                await write_summaries(writer, pending)
+                await writer.commit()
+                pending.clear()
+                print(f"{stats['games']} games ({stats['games'] / (time.perf_counter() - started):.0f} games/s)")
+
+        # Las jugadas llegan ordenadas por partida: se cierra cada una cuando cambia el game_id
+        moves = []
+        async for move in stream:
+            if moves and move.game_id != moves[0].game_id:
+                await close_game(moves)
+                moves = []
+            moves.append(move)
+        if moves:
+            await close_game(moves)
+
+        if pending:
+            await write_summaries(writer, pending)
+            await writer.commit()
+
+        elapsed = time.perf_counter() - started
+        print(f"Done: {stats['games']} games updated, {stats['skipped']} skipped (incomplete evaluations) in {elapsed:.1f}s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcula precisión, ACPL y errores de las partidas analizadas.")
+    parser.add_argument("--all", action="store_true", help="Recalcular también las partidas que ya tienen resumen")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.all))
@@ -0,0 +1,153 @@
+import sys
+from pathlib import Path
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Agregar la raíz del proyecto al path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert, select, text, update
+
+from app.constants.rating import DEFAULT_RATINGS, DEFAULT_RATING_DEVIATION, DEFAULT_VOLATILITY
+from app.database.connection import AsyncSessionLocal
+from app.models.game import Game, GameStatus, GameResult
+from app.models.profile import Profile
+from app.models.profile_rating import ProfileRating
+from app.models.rating_history import RatingHistory
+from app.services.rating_histogram import rebuild_rating_histograms
+from app.services.rating_history import rebuild_daily_rating_history
+from app.utils.glicko2 import rate_history
+
+# Con --apply cada rating que cambia deja un punto de corrección (delta = nuevo - anterior) en rating_history
+# y se rearma rating_history_daily en la misma transacción, así el gráfico termina en el rating actual.
+# Las tablas quedan bloqueadas hasta el commit: las partidas que terminan mientras tanto esperan.
+
+BATCH_SIZE = 10000
+SCORES = {
+    GameResult.white_win: 1.0,
+    GameResult.black_win: 0.0,
+    GameResult.draw: 0.5,
+}
+
+
+async def load_games(session, period_seconds: int) -> dict[str, dict]:
+    """
+    Carga las partidas terminadas agrupadas por categoría: índices densos de jugadores,
+    score de blancas y número de período de cada partida.
+    """
+    stream = await session.stream(
+        select(Game.white_id, Game.black_id, Game.result, Game.time_control_str, Game.end_time)
+        .where(Game.status == GameStatus.completed, Game.result.is_not(None))
+        .order_by(Game.end_time)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+
+    categories: dict[str, dict] = {}
+    async for game in stream:
+        data = categories.setdefault(
+            game.time_control_str,
+            {"players": {}, "white": [], "black": [], "score": [], "period": []}
+        )
+        players = data["players"]
+        data["white"].append(players.setdefault(game.white_id, len(players)))
+        data["black"].append(players.setdefault(game.black_id, len(players)))
+        data["score"].append(SCORES[game.result])
+        data["period"].append(int(game.end_time.timestamp()) // period_seconds)
+
+    return categories
+
+
+def recompute_category(category: str, data: dict) -> tuple[list, np.ndarray, np.ndarray, np.ndarray]:
+    users = list(data["players"])  # el orden de inserción es el índice denso
+
+    ratings, rds, volatilities = rate_history(
+        len(users),
+        np.array(data["white"], dtype=np.int64),
+        np.array(data["black"], dtype=np.int64),
+        np.array(data["score"], dtype=np.float64),
+        np.array(data["period"], dtype=np.int64),
+        initial_rating=DEFAULT_RATINGS.get(category, 1200),
+        initial_rd=DEFAULT_RATING_DEVIATION,
+        initial_volatility=DEFAULT_VOLATILITY
+    )
+    return users, ratings, rds, volatilities
+
+
+async def main(period_days: int, apply: bool):
+    async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        categories = await load_games(session, period_days * 86400)
+        print(f"Loaded games in {time.perf_counter() - started:.1f}s")
+
+        result = await session.execute(select(Profile.user_id, Profile.id))
+        profile_ids = dict(result.all())
+
+        updates = []
+        for category, data in categories.items():
+            started = time.perf_counter()
+            users, ratings, rds, volatilities = recompute_category(category, data)
+            print(
+                f"{category}: {len(data['white'])} games, {len(users)} players "
+                f"recomputed in {time.perf_counter() - started:.2f}s"
+            )
+
+            for user_id, rating, rd, volatility in zip(users, ratings, rds, volatilities):
+                if user_id in profile_ids:
+                    updates.append({
+                        "profile_id": profile_ids[user_id],
+                        "category": category,
+                        "rating": round(float(rating)),
+                        "rating_deviation": float(rd),
+                        "volatility": float(volatility),
+                    })
+
+        if not apply:
+            print(f"Dry run: {len(updates)} ratings would be updated. Use --apply to write them.")
+            return
+
+        # profile_ratings primero, en el mismo orden que apply_rating_delta → record_rating_point, para no
+        # trabarse con una partida que ya actualizó su rating y espera para escribir el historial
+        await session.execute(text(
+            "LOCK TABLE profile_ratings, rating_history, rating_history_daily IN SHARE ROW EXCLUSIVE MODE"
+        ))
+        result = await session.execute(select(ProfileRating.profile_id, ProfileRating.category, ProfileRating.rating))
+        previous = {(row.profile_id, row.category): row.rating for row in result.all()}
+
+        for i in range(0, len(updates), BATCH_SIZE):
+            # UPDATE por primary key (profile_id, category) en bloque
+            await session.execute(update(ProfileRating), updates[i:i + BATCH_SIZE])
+
+        now = datetime.now(timezone.utc)
+        points = [
+            {
+                "profile_id": row["profile_id"],
+                "category": row["category"],
+                "rating": row["rating"],
+                "rating_delta": row["rating"] - previous[(row["profile_id"], row["category"])],
+                "ts": now,
+                "game_id": None,
+            }
+            for row in updates
+            if previous.get((row["profile_id"], row["category"]), row["rating"]) != row["rating"]
+        ]
+        for i in range(0, len(points), BATCH_SIZE):
+            await session.execute(insert(RatingHistory), points[i:i + BATCH_SIZE])
+        await rebuild_daily_rating_history(session)
+        await session.commit()
+        print(f"Updated {len(updates)} ratings, {len(points)} rating history corrections.")
+
+        buckets = await rebuild_rating_histograms(session)
+        print(f"Rating histograms rebuilt. {buckets} buckets.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcula todos los ratings Glicko-2 desde el historial de partidas.")
+    parser.add_argument("--period-days", type=int, default=1, help="Duración de cada período de rating en días")
+    parser.add_argument("--apply", action="store_true", help="Escribir los ratings en la base de datos")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.period_days, args.apply))
@@ -41,6 +41,8 @@ export default function ExercisesPage() {
 
   const boardRef = useRef<Chess98BoardHandle>(null)
   const hasLoadedRef = useRef(false)
+  // Jugadas del usuario (UCI, sin las del rival): el backend valida con ellas el resultado
+  const playerMovesRef = useRef<string[]>([])
 
   const [moveFeedback, setMoveFeedback] = useState<"correct" | "wrong" | null>(null)
   const [isPuzzleComplete, setIsPuzzleComplete] = useState(false)
@@ -115,6 +117,7 @@ export default function ExercisesPage() {
     if (!move || !puzzle || !profile) return;
 
     const expectedMove = moveSequence[moveIndex];
+    playerMovesRef.current.push(move.uci);
 
     if (move.uci === expectedMove) {
       // ✅ Jugada correcta
@@ -138,6 +141,7 @@ export default function ExercisesPage() {
         const result = await puzzleService.solvePuzzle(puzzle.id, {
           user_id: profile.user_id,
           status: PuzzleSolveStatus.SOLVED,
+          moves: playerMovesRef.current,
         });
 
         setRatingChange(result.rating_delta);
@@ -156,6 +160,7 @@ export default function ExercisesPage() {
       const result = await puzzleService.solvePuzzle(puzzle.id, {
         user_id: profile.user_id,
         status: PuzzleSolveStatus.FAILED,
+        moves: playerMovesRef.current,
       });
 
       setRatingChange(result.rating_delta);
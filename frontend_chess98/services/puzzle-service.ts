@@ -14,7 +14,7 @@ class PuzzleService extends ApiService {
   /**
    * Solve puzzle and get next
    */
-  async solvePuzzle(puzzleId: string, data: { user_id: string; status: PuzzleSolveStatus }): Promise<PuzzleSolveResult> {
+  async solvePuzzle(puzzleId: string, data: { user_id: string; status: PuzzleSolveStatus; moves?: string[] }): Promise<PuzzleSolveResult> {
     const endpoint = replacePathParams(ENDPOINTS.SOLVE_PUZZLE, { puzzle_id: puzzleId })
     return this.fetchPublic<PuzzleSolveResult>(endpoint, {
       method: "POST",